@@ -0,0 +1,97 @@
+"""
+Import-time budget for the dashboard's cold start.
+
+Runs src/app.py in Streamlit bare mode under `python -X importtime` (with the
+background warm-up disabled) and fails when
+
+  - a heavy module (pandas, numpy, plotly.graph_objects, sklearn, joblib) is
+    imported on the startup path by the app rather than by Streamlit, or
+  - the app's own startup imports (everything outside Streamlit and the
+    interpreter's startup modules) take longer than the budget.
+
+    python benchmarks/import_budget.py --budget-ms 50
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'src', 'app.py')
+
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly.graph_objects', 'sklearn', 'joblib', 'scipy']
+# Import roots that belong to Streamlit rather than to the app
+FRAMEWORK_ROOTS = {'streamlit'}
+BUDGET_MS = 50
+
+LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def importtime(args, env=None):
+    """Parsed `-X importtime` output as (cumulative_us, depth, module) in print order"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args,
+                            capture_output=True, text=True, cwd=ROOT, env=env)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            _, cumulative, indent, module = match.groups()
+            rows.append((int(cumulative), (len(indent) - 1) // 2, module))
+    return rows
+
+
+def attribute_roots(rows):
+    """Map each imported module to the top-level import that pulled it in"""
+    # importtime prints children before their parent, so walk backwards
+    owner = {}
+    root = None
+    for cumulative, depth, module in reversed(rows):
+        if depth == 0:
+            root = module
+        owner.setdefault(module, root)
+    return owner
+
+
+def is_framework(module):
+    return module.split('.')[0] in FRAMEWORK_ROOTS
+
+
+def check(budget_ms=BUDGET_MS):
+    env = dict(os.environ, BILL_TRACKER_WARMUP='0')
+    interpreter = {module for _, depth, module in importtime(['-c', 'pass'], env) if depth == 0}
+    rows = importtime([APP], env)
+
+    owner = attribute_roots(rows)
+    app_roots = [(cumulative, module) for cumulative, depth, module in rows
+                 if depth == 0 and module not in interpreter and not is_framework(module)]
+    total_ms = sum(cumulative for cumulative, _ in app_roots) / 1000
+
+    print(f"App startup imports: {total_ms:.1f} ms (budget {budget_ms} ms)")
+    for cumulative, module in sorted(app_roots, reverse=True)[:10]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+    failures = []
+    for module in HEAVY_MODULES:
+        root = owner.get(module)
+        if root is not None and not is_framework(root) and root not in interpreter:
+            failures.append(f"{module} is imported at startup (via {root})")
+    if total_ms > budget_ms:
+        failures.append(f"startup imports take {total_ms:.1f} ms, over the {budget_ms} ms budget")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    args = parser.parse_args()
+
+    failures = check(args.budget_ms)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Load test for the dashboard's data and prediction paths.
+
+Virtual users run concurrently on threads, as Streamlit serves sessions in
+one process, and request bills drawn from a Zipf popularity distribution
+(a few bills get most of the views). Each scenario runs for a fixed time at
+every concurrency level and reports p50/p95/p99 latency, throughput and
+the process RSS sampled over time:
+
+    python benchmarks/load_test.py --concurrency 1,4,16 --duration 20
+    python benchmarks/load_test.py --scenarios app --store csv
+    python benchmarks/load_test.py --compare benchmarks/results/load-<old>.json --max-p95-ms 250
+
+Scenarios:
+  lookup   data_fetch.fetch_comprehensive_bill_data (record + timeline)
+  predict  data_fetch.fetch_scoring_frame + predict.predict_frame for one bill
+  bundle   both, as the dashboard does on a bill cache miss
+  app      a full dashboard rerun per request through streamlit.testing (AppTest);
+           AppTest is not thread-safe, so each of these users is a process and
+           RSS is summed over them
+
+--store csv forces the CSV code path of data_fetch even when the SQLite bill
+store exists. Results are saved as JSON under benchmarks/results/; --compare
+exits non-zero when p95 latency grows, or throughput drops, by more than
+--threshold, and --max-p95-ms when any p95 exceeds the capacity target.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from run_benchmarks import RESULTS_DIR, git_commit
+
+SCENARIOS = ['lookup', 'predict', 'bundle', 'app']
+# AppTest sessions are not thread-safe (one Streamlit runtime per process): one process per user
+PROCESS_SCENARIOS = {'app'}
+CONCURRENCY = [1, 4, 16]
+DURATION = 10
+WARMUP_REQUESTS = 20
+ZIPF_EXPONENT = 1.1
+RSS_INTERVAL = 0.5
+APP = os.path.join(ROOT, 'src', 'app.py')
+
+
+def rss_mb(pid='self'):
+    """Resident set size of a process in MB (this process's peak RSS where /proc is unavailable)"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid != 'self':
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class RssSampler(threading.Thread):
+    """Samples the RSS of this process plus `pids` every `interval` seconds until stopped"""
+
+    def __init__(self, pids=(), interval=RSS_INTERVAL):
+        super().__init__(daemon=True)
+        self.pids = ['self'] + list(pids)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._t0 = time.perf_counter()
+
+    def run(self):
+        while True:
+            self.samples.append((round(time.perf_counter() - self._t0, 2), round(sum(rss_mb(pid) for pid in self.pids), 1)))
+            if self._stop_event.wait(self.interval):
+                break
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+def zipf_weights(n, exponent=ZIPF_EXPONENT):
+    """Popularity of the bills ranked 1..n"""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def bill_popularity(seed=0):
+    """(bill_ids, probabilities): every known bill, with a random Zipf popularity rank"""
+    import data_fetch
+
+    ids = data_fetch.query_scoring_frame()['bill_id'].astype(str).unique()
+    ids = np.random.default_rng(seed).permutation(ids)
+    return ids, zipf_weights(len(ids))
+
+
+class DataUser:
+    """Calls the data / prediction layer directly"""
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+
+    def setup(self):
+        pass
+
+    def request(self, bill_id):
+        import data_fetch
+        from predict import predict_frame
+
+        if self.scenario in ('lookup', 'bundle'):
+            if data_fetch.fetch_comprehensive_bill_data(bill_id) is None:
+                raise LookupError(f"Bill {bill_id} not found")
+        if self.scenario in ('predict', 'bundle'):
+            frame = data_fetch.fetch_scoring_frame([bill_id])
+            if frame.empty:
+                raise LookupError(f"Bill {bill_id} not found")
+            predict_frame(frame)
+
+
+class AppUser:
+    """One dashboard session: each request enters a bill id and reruns the script"""
+
+    def setup(self):
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(APP, default_timeout=120)
+        self.app.run()
+
+    def request(self, bill_id):
+        self.app.text_input[0].input(bill_id).run()
+        if self.app.exception:
+            raise RuntimeError(self.app.exception[0].value)
+        # st.error also shows low passage probabilities; only failed lookups count
+        failed = [e.value for e in self.app.error if e.value.startswith(('Could not fetch', '❗'))]
+        if failed:
+            raise RuntimeError(failed[0])
+
+
+def make_user(scenario):
+    return AppUser() if scenario == 'app' else DataUser(scenario)
+
+
+def user_loop(user, ids, weights, duration, seed, start):
+    """One virtual user requesting bills until `duration` has passed: (latencies, errors, messages)"""
+    rng = np.random.default_rng(seed)
+    latencies, errors, messages = [], 0, set()
+    start.wait()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        bill_id = ids[rng.choice(len(ids), p=weights)]
+        t0 = time.perf_counter()
+        try:
+            user.request(bill_id)
+        except Exception as e:
+            errors += 1
+            messages.add(f"{type(e).__name__}: {e}")
+            continue
+        latencies.append(time.perf_counter() - t0)
+    return latencies, errors, messages
+
+
+def _process_user(scenario, ids, weights, duration, seed, start, results):
+    user = make_user(scenario)
+    user.setup()
+    results.put(user_loop(user, ids, weights, duration, seed, start))
+
+
+def run_level(scenario, concurrency, ids, weights, duration=DURATION, seed=0):
+    """
+    Run `concurrency` users for `duration` seconds. Returns the latencies (s),
+    the error count, distinct error messages, the elapsed time and RSS samples.
+    """
+    if scenario in PROCESS_SCENARIOS:
+        start = multiprocessing.Barrier(concurrency + 1)
+        queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_process_user, daemon=True,
+                                           args=(scenario, ids, weights, duration, seed + i, start, queue))
+                   for i in range(concurrency)]
+        for worker in workers:
+            worker.start()
+        sampler = RssSampler(pids=[worker.pid for worker in workers])
+    else:
+        start = threading.Barrier(concurrency + 1)
+        users = [make_user(scenario) for _ in range(concurrency)]
+        for user in users:
+            user.setup()
+        outcomes = [None] * concurrency
+
+        def run_user(i):
+            outcomes[i] = user_loop(users[i], ids, weights, duration, seed + i, start)
+
+        workers = [threading.Thread(target=run_user, args=(i,), daemon=True) for i in range(concurrency)]
+        for worker in workers:
+            worker.start()
+        sampler = RssSampler()
+
+    sampler.start()
+    start.wait()
+    started = time.perf_counter()
+    if scenario in PROCESS_SCENARIOS:
+        # Read before joining: a worker cannot exit until its result is taken off the queue
+        outcomes = [queue.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    latencies = np.concatenate([np.asarray(l, dtype=float) for l, _, _ in outcomes])
+    messages = sorted(set().union(*(m for _, _, m in outcomes)))
+    return latencies, sum(e for _, e, _ in outcomes), messages, elapsed, sampler.stop()
+
+
+def summarize(latencies, errors, messages, elapsed, rss):
+    ms = latencies * 1000
+    stats = {
+        'requests': int(len(latencies)),
+        'errors': int(errors),
+        'error_messages': messages[:10],
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+    }
+    if len(ms):
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        stats.update({'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': float(ms.max())})
+    mbs = [mb for _, mb in rss]
+    stats.update({'rss_start_mb': mbs[0], 'rss_peak_mb': max(mbs), 'rss_end_mb': mbs[-1], 'rss': rss})
+    return stats
+
+
+def use_store(store):
+    """Point data_fetch at the SQLite store or the CSV (auto: whatever exists)"""
+    import data_fetch
+
+    if store == 'csv':
+        data_fetch.DB_FILE = os.path.join(ROOT, 'data', 'no-bill-store.db')
+    elif store == 'db' and not os.path.exists(data_fetch.DB_FILE):
+        raise SystemExit(f"No bill store at {data_fetch.DB_FILE}; run process_bills.py first")
+    return 'db' if os.path.exists(data_fetch.DB_FILE) else 'csv'
+
+
+def run(scenarios, levels, duration=DURATION, warmup=WARMUP_REQUESTS, store='auto', exponent=ZIPF_EXPONENT):
+    store = use_store(store)
+    ids, _ = bill_popularity()
+    weights = zipf_weights(len(ids), exponent)
+    print(f"{len(ids)} bills (Zipf s={exponent}: top 10 get {weights[:10].sum():.0%} of requests), "
+          f"{store} store")
+
+    results = {}
+    for scenario in scenarios:
+        # Load models and fill caches outside the measured window
+        user = make_user(scenario)
+        user.setup()
+        for bill_id in ids[:warmup]:
+            user.request(bill_id)
+        for level in levels:
+            print(f"  {scenario} x{level} for {duration}s...")
+            stats = summarize(*run_level(scenario, level, ids, weights, duration))
+            results.setdefault(scenario, {})[str(level)] = stats
+            print(f"    {stats['requests']} requests, {stats['errors']} errors, "
+                  f"{stats['throughput_rps']:.1f} req/s, p50 {stats.get('p50_ms', 0):.1f} ms, "
+                  f"p95 {stats.get('p95_ms', 0):.1f} ms, p99 {stats.get('p99_ms', 0):.1f} ms, "
+                  f"RSS peak {stats['rss_peak_mb']:.0f} MB")
+            for message in stats['error_messages']:
+                print(f"    error: {message}")
+
+    return {
+        'kind': 'load',
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'cpu_count': os.cpu_count(),
+        'store': store,
+        'duration': duration,
+        'zipf_exponent': exponent,
+        'results': results,
+    }
+
+
+def save_results(report, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(RESULTS_DIR, f"load-{stamp}-{report['commit']}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {path}")
+    return path
+
+
+def compare(report, baseline_path, threshold=1.2):
+    """Print p95 and throughput against a baseline run; returns the entries that regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\nComparing against {baseline['commit']} ({baseline['timestamp']}):")
+    for scenario, levels in report['results'].items():
+        for level, stats in levels.items():
+            old = baseline['results'].get(scenario, {}).get(level)
+            if not old or 'p95_ms' not in old or 'p95_ms' not in stats:
+                continue
+            p95 = stats['p95_ms'] / old['p95_ms'] if old['p95_ms'] else float('inf')
+            rps = stats['throughput_rps'] / old['throughput_rps'] if old['throughput_rps'] else float('inf')
+            flag = ''
+            if p95 > threshold or rps < 1 / threshold:
+                flag = '  <-- REGRESSION'
+                regressions.append((scenario, level, p95, rps))
+            print(f"  {scenario:<8} x{level:<4} p95 {old['p95_ms']:.1f} -> {stats['p95_ms']:.1f} ms (x{p95:.2f}), "
+                  f"{old['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f} req/s (x{rps:.2f}){flag}")
+    return regressions
+
+
+def over_target(report, max_p95_ms):
+    """Entries whose p95 latency exceeds the capacity target"""
+    missed = [(scenario, level, stats['p95_ms']) for scenario, levels in report['results'].items()
+              for level, stats in levels.items() if stats.get('p95_ms', 0) > max_p95_ms]
+    for scenario, level, p95 in missed:
+        print(f"  {scenario} x{level}: p95 {p95:.1f} ms exceeds the {max_p95_ms:.0f} ms target")
+    return missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', default='lookup,predict,bundle',
+                        help=f"Comma separated subset of: {','.join(SCENARIOS)}")
+    parser.add_argument('--concurrency', default=','.join(str(c) for c in CONCURRENCY),
+                        help='Comma separated numbers of concurrent users')
+    parser.add_argument('--duration', type=float, default=DURATION, help='Seconds per scenario and level')
+    parser.add_argument('--warmup', type=int, default=WARMUP_REQUESTS, help='Unmeasured requests per scenario')
+    parser.add_argument('--store', choices=['auto', 'db', 'csv'], default='auto')
+    parser.add_argument('--zipf', type=float, default=ZIPF_EXPONENT, help='Popularity skew (Zipf exponent)')
+    parser.add_argument('--output', help='Where to write the JSON results')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='p95 growth (or throughput drop) ratio reported as a regression')
+    parser.add_argument('--max-p95-ms', type=float, help='Capacity target: fail if any p95 exceeds it')
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(',') if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(',') if c]
+
+    report = run(scenarios, levels, args.duration, args.warmup, args.store, args.zipf)
+    save_results(report, args.output)
+
+    failed = False
+    if args.compare:
+        failed |= bool(compare(report, args.compare, args.threshold))
+    if args.max_p95_ms is not None:
+        failed |= bool(over_target(report, args.max_p95_ms))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
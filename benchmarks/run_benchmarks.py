@@ -0,0 +1,391 @@
+"""
+Benchmark suite for the bill tracker pipelines.
+
+Synthetic datasets are generated from the bills_processed.csv schema at
+10k / 100k / 1M bills and every hot path is timed on them: bill lookup,
+feature construction, predict_proba, what-if scenarios, scraper page parsing
+(saved HTML fixtures), preprocessing (in memory and chunked), date parsing,
+text features and training.
+
+Results are written as JSON under benchmarks/results/ so that runs can be
+compared across commits:
+
+    python benchmarks/run_benchmarks.py --sizes 10000,100000
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import bill_store
+import data_fetch
+from features import build_training_features, build_inference_features
+from process_bills import preprocess_bills, process_bills_chunked
+from scraper import extract_bill_details
+from train_model import train_model
+
+SIZES = [10_000, 100_000, 1_000_000]
+FIXTURES_DIR = os.path.join(ROOT, 'benchmarks', 'fixtures')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+SCHEMA_FILE = os.path.join(ROOT, 'data', 'bills_processed.csv')
+TEXT_DOCUMENTS = 20_000
+
+# Title fragments used to build synthetic bill titles
+TITLE_SUBJECTS = ['Finance', 'Appropriation', 'Insurance Laws', 'Waqf', 'Boilers', 'Banking Regulation',
+                  'Railways', 'Telecommunications', 'Forest Conservation', 'Criminal Procedure',
+                  'Constitution', 'Merchant Shipping', 'Coastal Shipping', 'Water', 'Public Examinations']
+TITLE_SUFFIXES = ['Bill', '(Amendment) Bill', '(No. 2) Bill', '(Amendment) Bill']
+
+
+def make_synthetic_bills(n, seed=0):
+    """
+    Generate n bills in the bills_processed.csv schema, sampling ministries and
+    statuses from the real distribution so the category cardinality is realistic.
+    """
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(SCHEMA_FILE)
+
+    ministry_freq = source['ministry'].fillna('Unknown').value_counts(normalize=True)
+    status_freq = source['status'].fillna('Unknown').value_counts(normalize=True)
+
+    year = rng.integers(2000, 2027, size=n)
+    day = rng.integers(0, 365, size=n)
+    intro = pd.to_datetime(year.astype(str), format='%Y') + pd.to_timedelta(day, unit='D')
+
+    subjects = rng.choice(TITLE_SUBJECTS, size=n)
+    suffixes = rng.choice(TITLE_SUFFIXES, size=n)
+    titles = 'The ' + pd.Series(subjects) + ' ' + pd.Series(suffixes) + ', ' + pd.Series(year).astype(str)
+
+    df = pd.DataFrame({col: np.nan for col in source.columns}, index=range(n))
+    df['bill_id'] = np.arange(1, n + 1)
+    df['title'] = titles
+    df['ministry'] = rng.choice(ministry_freq.index.to_numpy(), size=n, p=ministry_freq.to_numpy())
+    df['introduction_date'] = intro.strftime('%Y-%m-%d')
+    df['status'] = rng.choice(status_freq.index.to_numpy(), size=n, p=status_freq.to_numpy())
+    df['year'] = year
+    df['is_amendment'] = titles.str.contains('Amendment').astype(int)
+    df['is_appropriation'] = titles.str.contains('Appropriation').astype(int)
+    df['is_finance'] = titles.str.contains('Finance').astype(int)
+    return df[source.columns]
+
+
+def make_raw_export(processed):
+    """Turn a synthetic processed frame back into the raw Bills.xlsx column layout"""
+    raw = processed.drop(columns=['year', 'is_amendment', 'is_appropriation', 'is_finance'])
+    return raw.rename(columns={
+        'title': 'Short Title',
+        'ministry': 'Ministry',
+        'introduction_date': 'Date of Introduction',
+        'status': 'Status',
+        'bill_id': 'Bill Number'
+    })
+
+
+def measure(fn, repeat):
+    """Run fn `repeat` times and return wall-clock statistics in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        'min': min(timings),
+        'mean': sum(timings) / len(timings),
+        'max': max(timings),
+        'repeat': repeat
+    }
+
+
+def _bench_lookup(df, repeat, data_file, db_file):
+    original = data_fetch.DATA_FILE, data_fetch.DB_FILE
+    data_fetch.DATA_FILE, data_fetch.DB_FILE = data_file, db_file
+    try:
+        bill_ids = df['bill_id'].sample(repeat, random_state=0).tolist()
+        ids = iter(bill_ids)
+        return measure(lambda: data_fetch.fetch_comprehensive_bill_data(next(ids)), repeat)
+    finally:
+        data_fetch.DATA_FILE, data_fetch.DB_FILE = original
+
+
+def bench_lookup(df, workdir, repeat):
+    # CSV path: the bill store is pointed at a file that does not exist
+    path = os.path.join(workdir, 'bills_processed.csv')
+    df.to_csv(path, index=False)
+    return _bench_lookup(df, repeat, path, os.path.join(workdir, 'missing.db'))
+
+
+def bench_lookup_db(df, workdir, repeat):
+    db_path = os.path.join(workdir, 'bills.db')
+    if not os.path.exists(db_path):
+        bill_store.upsert_bills(df, source='lok_sabha', path=db_path)
+    return _bench_lookup(df, repeat, os.path.join(workdir, 'missing.csv'), db_path)
+
+
+def bench_featurize_train(df, workdir, repeat):
+    return measure(lambda: build_training_features(df), repeat)
+
+
+def bench_featurize_inference(df, workdir, repeat):
+    X, _ = build_training_features(df)
+    columns = X.columns.tolist()
+    return measure(lambda: build_inference_features(df, columns), repeat)
+
+
+def bench_predict_proba(df, workdir, repeat):
+    from sklearn.ensemble import RandomForestClassifier
+
+    # The model is fitted on a fixed-size sample so only inference scales with n
+    X, y = build_training_features(df.head(10_000))
+    model = RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)
+    matrix = build_inference_features(df, X.columns.tolist())
+    return measure(lambda: model.predict_proba(matrix), repeat)
+
+
+def bench_predict_ensemble(df, workdir, repeat):
+    from ensemble import train_ensemble, EnsembleScorer
+
+    X, y = build_training_features(df.head(10_000))
+    scorer = EnsembleScorer(train_ensemble(X, y, X.columns))
+    matrix = build_inference_features(df, X.columns.tolist()).to_numpy()
+    return measure(lambda: scorer.score(matrix), repeat)
+
+
+def bench_scenarios(df, workdir, repeat):
+    # 100 bills x (ministries x years x amendment) scenarios through one fixed-size ensemble
+    from ensemble import train_ensemble, EnsembleScorer
+    from scenarios import scenario_grid, run_scenarios
+
+    X, y = build_training_features(df.head(10_000))
+    scorer = EnsembleScorer(train_ensemble(X, y, X.columns))
+    grid = scenario_grid({'ministry': df['ministry'].unique()[:12], 'year': range(2000, 2040), 'is_amendment': [0, 1]})
+    bills = df.head(100)
+    return measure(lambda: run_scenarios(bills, grid, model=scorer, model_columns=scorer.columns), repeat)
+
+
+def bench_preprocess(df, workdir, repeat):
+    raw = make_raw_export(df)
+    return measure(lambda: preprocess_bills(raw.copy()), repeat)
+
+
+def bench_preprocess_chunked(df, workdir, repeat):
+    # Streams the raw export from CSV and writes year partitions; compare with 'preprocess'
+    path = os.path.join(workdir, 'raw_export.csv')
+    if not os.path.exists(path):
+        make_raw_export(df).to_csv(path, index=False)
+    output_dir = os.path.join(workdir, 'partitioned')
+    return measure(lambda: process_bills_chunked(path, output_dir, upsert=False, snapshot_dir=None), repeat)
+
+
+def bench_normalize_dates(df, workdir, repeat):
+    # The raw date layouts of each source, parsed cold (format detection and memo cleared every run)
+    import dates
+    intro = pd.to_datetime(df['introduction_date'])
+    columns = [('lok_sabha', 'Assent Date', intro.dt.strftime('%d/%m/%Y ')),
+               ('lok_sabha', 'Debate/Date Passed in LS', intro.dt.strftime('%d %b %Y')),
+               ('prs', 'introduction_date', intro.dt.strftime('%b %d, %Y')),
+               ('csv', 'introduction_date', df['introduction_date'])]
+
+    def run():
+        dates.clear_caches()
+        for source, column, values in columns:
+            dates.normalize_dates(values, source, column)
+    return measure(run, repeat)
+
+
+def bench_similar_index(df, workdir, repeat):
+    from similar_bills import build_index
+    return measure(lambda: build_index(df), repeat)
+
+
+def bench_snapshot_training_set(df, workdir, repeat):
+    # Point-in-time training rows (day 30) from a store backfilled from the synthetic bills
+    import snapshots
+    root = os.path.join(workdir, 'snapshots')
+    snapshots.backfill(df, 'lok_sabha', root)
+    return measure(lambda: snapshots.training_set(day=30, root=root), repeat)
+
+
+def bench_text_features(df, workdir, repeat):
+    # Text features over a store holding one fixture bill text per bill (capped: the text store is per document)
+    import bill_text
+    root = os.path.join(workdir, 'bill_text')
+    if not os.path.exists(root):
+        texts = [bill_text.extract_text(open(path, 'rb').read(), path)
+                 for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'documents', '*.txt')))]
+        bill_ids = df['bill_id'].head(TEXT_DOCUMENTS)
+        bill_text.TextStore(root).append([(b, 'text', f'synthetic:{b}', texts[i % len(texts)])
+                                          for i, b in enumerate(bill_ids)])
+    return measure(lambda: bill_text.text_features(root), repeat)
+
+
+def bench_train(df, workdir, repeat):
+    path = os.path.join(workdir, 'bills_processed.csv')
+    df.to_csv(path, index=False)
+    return measure(lambda: train_model(
+        data_path=path,
+        model_path=os.path.join(workdir, 'model.pkl'),
+        columns_path=os.path.join(workdir, 'columns.pkl'),
+        ensemble_path=os.path.join(workdir, 'ensemble.pkl'),
+        stage_models_path=os.path.join(workdir, 'stage_models.pkl'),
+        registry_dir=os.path.join(workdir, 'models')
+    ), repeat)
+
+
+def bench_parse(repeat):
+    """Parse every saved bill page fixture; independent of dataset size"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append((path, f.read()))
+
+    def parse_all():
+        for path, content in pages:
+            extract_bill_details(path, content)
+
+    return measure(parse_all, repeat)
+
+
+BENCHMARKS = {
+    'lookup': bench_lookup,
+    'lookup_db': bench_lookup_db,
+    'featurize_train': bench_featurize_train,
+    'featurize_inference': bench_featurize_inference,
+    'predict_proba': bench_predict_proba,
+    'predict_ensemble': bench_predict_ensemble,
+    'scenarios': bench_scenarios,
+    'preprocess': bench_preprocess,
+    'preprocess_chunked': bench_preprocess_chunked,
+    'normalize_dates': bench_normalize_dates,
+    'similar_index': bench_similar_index,
+    'snapshot_training_set': bench_snapshot_training_set,
+    'text_features': bench_text_features,
+    'train': bench_train,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def run(sizes, only=None, repeat=3):
+    names = [name for name in BENCHMARKS if not only or name in only]
+    results = {}
+
+    if not only or 'parse' in only:
+        print("Benchmarking parse on HTML fixtures...")
+        results['parse'] = {'fixtures': measure_safe(lambda: bench_parse(repeat * 10))}
+
+    for n in sizes:
+        print(f"Generating {n} synthetic bills...")
+        df = make_synthetic_bills(n)
+        with tempfile.TemporaryDirectory() as workdir:
+            for name in names:
+                # Training is expensive, a single run is enough at every scale
+                runs = 1 if name == 'train' else repeat
+                print(f"  {name} (n={n})...")
+                results.setdefault(name, {})[str(n)] = measure_safe(lambda: BENCHMARKS[name](df, workdir, runs))
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+
+
+def measure_safe(fn):
+    try:
+        return fn()
+    except Exception as e:
+        print(f"    failed: {e}")
+        return {'error': str(e)}
+
+
+def save_results(report, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{report['commit']}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {path}")
+    return path
+
+
+def compare(report, baseline_path, threshold=1.2):
+    """
+    Print the mean-time ratio against a baseline run and return the list of
+    entries that got slower than `threshold`. Entries that failed to run
+    count as regressions too.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = []
+    print(f"\nComparing against {baseline['commit']} ({baseline['timestamp']}):")
+    for name, by_size in report['results'].items():
+        for size, stats in by_size.items():
+            if 'error' in stats:
+                regressions.append((name, size, float('inf')))
+                print(f"  {name:<22} {size:>9}  ERROR: {stats['error']}  <-- REGRESSION")
+                continue
+            old = baseline['results'].get(name, {}).get(size)
+            if not old or 'mean' not in old or 'mean' not in stats:
+                continue
+            ratio = stats['mean'] / old['mean'] if old['mean'] else float('inf')
+            flag = ''
+            if ratio > threshold:
+                flag = '  <-- REGRESSION'
+                regressions.append((name, size, ratio))
+            print(f"  {name:<22} {size:>9}  {old['mean']:.4f}s -> {stats['mean']:.4f}s  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(str(n) for n in SIZES),
+                        help='Comma separated dataset sizes')
+    parser.add_argument('--only', default='',
+                        help=f"Comma separated subset of: parse,{','.join(BENCHMARKS)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Where to write the JSON results')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='Slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    only = set(filter(None, args.only.split(',')))
+
+    report = run(sizes, only=only, repeat=args.repeat)
+    save_results(report, args.output)
+
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s)")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
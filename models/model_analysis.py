@@ -1,297 +1,318 @@
 """
 Model Performance and Feature Importance Analysis
-This script analyzes the trained models to show performance metrics and feature importance
+This script analyzes the trained models to show performance metrics and feature importance.
+
+It runs headless (Agg backend) and writes a report instead of opening windows:
+
+    python models/model_analysis.py [--models-dir models] [--output models/report] [--force]
+
+The six stage models are loaded in parallel, the performance, importance and
+overlap tables are computed once as matrices, and the figures are rendered
+to PNG in parallel worker processes next to a report.html. Reports are
+cached in <output>/<key>/, where the key is a hash of the model artifacts,
+so an unchanged set of models is not analyzed twice.
 """
 
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+
 import joblib
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import classification_report, confusion_matrix, roc_curve, auc
-import os
 
-# Set style for better looking plots
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+MODEL_TYPES = ['viability', 'passage']
+STAGES = ['new_bill', 'early_stage', 'progressive']
+MODEL_NAMES = [f"{model_type}_{stage}" for model_type in MODEL_TYPES for stage in STAGES]
+# Bump when the tables or figures change so cached reports are rebuilt
+REPORT_VERSION = 1
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_paths(models_dir='models'):
+    """Artifact name -> pickle path for the metadata and the six stage models"""
+    paths = {'metadata': os.path.join(models_dir, 'metadata.pkl')}
+    for name in MODEL_NAMES:
+        paths[name] = os.path.join(models_dir, f'{name}.pkl')
+    return paths
+
+
+def artifact_hashes(paths, workers=None):
+    """SHA-256 of every artifact that exists"""
+    present = {name: path for name, path in paths.items() if os.path.exists(path)}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(present, pool.map(file_sha256, present.values())))
+
+
+def report_key(hashes):
+    payload = json.dumps({'version': REPORT_VERSION, 'artifacts': hashes}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
 
-def load_models():
-    """Load the split model files"""
+
+def load_models(paths, workers=None):
+    """Load the split model files in parallel"""
     print("Loading models from files...")
-    
-    # Load metadata
-    metadata = joblib.load('models/metadata.pkl')
-    
-    # Load all model stages
-    models = {
-        'viability': {},
-        'passage': {}
-    }
-    
-    stages = ['new_bill', 'early_stage', 'progressive']
-    
-    for stage in stages:
-        # Load viability models
-        try:
-            models['viability'][stage] = joblib.load(f'models/viability_{stage}.pkl')
-            print(f"✓ Loaded viability {stage} model")
-        except Exception as e:
-            print(f"✗ Error loading viability {stage}: {e}")
-            
-        # Load passage models
+
+    def load(name):
         try:
-            models['passage'][stage] = joblib.load(f'models/passage_{stage}.pkl')
-            print(f"✓ Loaded passage {stage} model")
+            return name, joblib.load(paths[name]), None
         except Exception as e:
-            print(f"✗ Error loading passage {stage}: {e}")
-    
+            return name, None, e
+
+    models = {model_type: {} for model_type in MODEL_TYPES}
+    metadata = None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, artifact, error in pool.map(load, paths):
+            if error is not None:
+                print(f"✗ Error loading {name.replace('_', ' ', 1)}: {error}")
+            elif name == 'metadata':
+                metadata = artifact
+            else:
+                model_type, stage = name.split('_', 1)
+                models[model_type][stage] = artifact
+                print(f"✓ Loaded {model_type} {stage} model")
     return models, metadata
 
-def analyze_model_performance(models, metadata):
-    """Analyze and display model performance metrics"""
-    
+
+def _loaded(models):
+    """(model name, model data) for every loaded model, in report order"""
+    return [(f"{model_type}_{stage}", models[model_type][stage])
+            for model_type in MODEL_TYPES for stage in STAGES if stage in models[model_type]]
+
+
+def _label(name):
+    model_type, stage = name.split('_', 1)
+    return model_type.capitalize(), stage.replace('_', ' ').title()
+
+
+# ---------------------------------------------------------------------------
+# Tables
+# ---------------------------------------------------------------------------
+
+def performance_table(models):
+    rows = []
+    for name, model_data in _loaded(models):
+        perf = model_data['performance']
+        model_type, stage = _label(name)
+        rows.append({
+            'Model Type': model_type,
+            'Stage': stage,
+            'Accuracy': perf['accuracy'],
+            'ROC-AUC': perf['roc_auc'],
+            'Precision': perf['precision'],
+            'Recall': perf['recall'],
+            'F1 Score': perf['f1_score'],
+            'CV ROC-AUC': perf['cv_roc_auc'],
+            'CV Std Dev': perf['cv_std']
+        })
+    return pd.DataFrame(rows)
+
+
+def importance_matrix(models):
+    """Features x models matrix of RF importances; NaN where a model did not select the feature"""
+    columns = {
+        name: pd.Series(model_data['rf_model'].feature_importances_, index=model_data['selected_features'])
+        for name, model_data in _loaded(models)
+    }
+    return pd.DataFrame(columns)
+
+
+def feature_summary(matrix):
+    """Average / spread of each feature's importance over the models that use it"""
+    summary = pd.DataFrame({
+        'feature': matrix.index,
+        'avg_importance': matrix.mean(axis=1).to_numpy(),
+        'frequency': matrix.notna().sum(axis=1).to_numpy(),
+        'std_importance': matrix.std(axis=1, ddof=0).to_numpy(),
+    })
+    return summary.sort_values('avg_importance', ascending=False).reset_index(drop=True)
+
+
+def complexity_table(models, metadata):
+    feature_sets = metadata['metadata']['feature_sets'] if metadata else {}
+    rows = []
+    for name, model_data in _loaded(models):
+        model_type, stage = _label(name)
+        stage_key = name.split('_', 1)[1]
+        total_features = len(feature_sets[stage_key]) if stage_key in feature_sets else np.nan
+        selected_features = len(model_data['selected_features'])
+        rows.append({
+            'Model': f"{model_type} - {stage}",
+            'Total Features Available': total_features,
+            'Features Selected': selected_features,
+            'Selection Rate': selected_features / total_features,
+            'RF Trees': model_data['rf_model'].n_estimators,
+            'RF Max Depth': model_data['rf_model'].max_depth,
+            'GB Trees': model_data['gb_model'].n_estimators,
+            'GB Max Depth': model_data['gb_model'].max_depth
+        })
+    return pd.DataFrame(rows)
+
+
+def build_tables(models, metadata):
+    matrix = importance_matrix(models)
+    return {
+        'performance': performance_table(models),
+        'importance': matrix,
+        'summary': feature_summary(matrix),
+        'complexity': complexity_table(models, metadata),
+    }
+
+
+def print_tables(tables):
+    perf_df = tables['performance']
     print("\n" + "="*80)
     print("MODEL PERFORMANCE ANALYSIS")
     print("="*80)
-    
-    # Create performance comparison dataframe
-    performance_data = []
-    
-    for model_type in ['viability', 'passage']:
-        for stage in ['new_bill', 'early_stage', 'progressive']:
-            if stage in models[model_type]:
-                perf = models[model_type][stage]['performance']
-                performance_data.append({
-                    'Model Type': model_type.capitalize(),
-                    'Stage': stage.replace('_', ' ').title(),
-                    'Accuracy': perf['accuracy'],
-                    'ROC-AUC': perf['roc_auc'],
-                    'Precision': perf['precision'],
-                    'Recall': perf['recall'],
-                    'F1 Score': perf['f1_score'],
-                    'CV ROC-AUC': perf['cv_roc_auc'],
-                    'CV Std Dev': perf['cv_std']
-                })
-    
-    perf_df = pd.DataFrame(performance_data)
-    
-    # Display performance table
     print("\n📊 PERFORMANCE METRICS BY MODEL AND STAGE:")
     print("-" * 80)
     print(perf_df.to_string(index=False, float_format='%.4f'))
-    
-    # Create visualizations
-    fig, axes = plt.subplots(2, 3, figsize=(15, 10))
-    fig.suptitle('Model Performance Comparison', fontsize=16)
-    
-    metrics = ['Accuracy', 'ROC-AUC', 'Precision', 'Recall', 'F1 Score', 'CV ROC-AUC']
-    
-    for idx, metric in enumerate(metrics):
-        ax = axes[idx // 3, idx % 3]
-        
-        # Pivot data for grouped bar chart
-        pivot_data = perf_df.pivot(index='Stage', columns='Model Type', values=metric)
-        pivot_data.plot(kind='bar', ax=ax)
-        
-        ax.set_title(metric)
-        ax.set_xlabel('Stage')
-        ax.set_ylabel('Score')
-        ax.legend(title='Model Type')
-        ax.set_ylim(0, 1.1)
-        
-        # Add value labels on bars
-        for container in ax.containers:
-            ax.bar_label(container, fmt='%.3f', padding=3)
-    
-    plt.tight_layout()
-    plt.show()
-    
-    # Best performing models
+
     print("\n🏆 BEST PERFORMING MODELS:")
     print("-" * 80)
-    
-    for model_type in ['viability', 'passage']:
-        best_model = perf_df[perf_df['Model Type'] == model_type.capitalize()].sort_values('ROC-AUC', ascending=False).iloc[0]
-        print(f"{model_type.capitalize()}: {best_model['Stage']} (ROC-AUC: {best_model['ROC-AUC']:.4f})")
-
-def analyze_feature_importance(models):
-    """Analyze and display feature importance for each model"""
-    
+    for model_type in MODEL_TYPES:
+        subset = perf_df[perf_df['Model Type'] == model_type.capitalize()]
+        if len(subset):
+            best_model = subset.sort_values('ROC-AUC', ascending=False).iloc[0]
+            print(f"{model_type.capitalize()}: {best_model['Stage']} (ROC-AUC: {best_model['ROC-AUC']:.4f})")
+
     print("\n" + "="*80)
     print("FEATURE IMPORTANCE ANALYSIS")
     print("="*80)
-    
-    # Create subplots for feature importance
-    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-    fig.suptitle('Top 10 Most Important Features by Model Stage', fontsize=16)
-    
-    stages = ['new_bill', 'early_stage', 'progressive']
-    
-    for model_idx, model_type in enumerate(['viability', 'passage']):
-        for stage_idx, stage in enumerate(stages):
-            ax = axes[model_idx, stage_idx]
-            
-            if stage in models[model_type]:
-                model_data = models[model_type][stage]
-                
-                # Get feature importance from Random Forest
-                rf_model = model_data['rf_model']
-                features = model_data['selected_features']
-                importances = rf_model.feature_importances_
-                
-                # Create importance dataframe
-                importance_df = pd.DataFrame({
-                    'feature': features,
-                    'importance': importances
-                }).sort_values('importance', ascending=False).head(10)
-                
-                # Plot
-                importance_df.plot(x='feature', y='importance', kind='barh', ax=ax, legend=False)
-                ax.set_title(f'{model_type.capitalize()} - {stage.replace("_", " ").title()}')
-                ax.set_xlabel('Importance')
-                ax.set_ylabel('')
-                
-                # Print top features
-                print(f"\n📊 {model_type.upper()} - {stage.upper()} - Top 10 Features:")
-                print("-" * 60)
-                for idx, row in importance_df.iterrows():
-                    print(f"{row['feature']:<30} {row['importance']:.4f}")
-    
-    plt.tight_layout()
-    plt.show()
-
-def analyze_feature_overlap(models):
-    """Analyze which features are consistently important across models"""
-    
+    matrix = tables['importance']
+    for name in matrix.columns:
+        top = matrix[name].dropna().nlargest(10)
+        print(f"\n📊 {name.replace('_', ' - ', 1).upper()} - Top 10 Features:")
+        print("-" * 60)
+        for feature, importance in top.items():
+            print(f"{feature:<30} {importance:.4f}")
+
+    summary_df = tables['summary']
     print("\n" + "="*80)
     print("CROSS-MODEL FEATURE IMPORTANCE ANALYSIS")
     print("="*80)
-    
-    # Collect all features and their importance across models
-    feature_importance_all = {}
-    
-    for model_type in ['viability', 'passage']:
-        for stage in ['new_bill', 'early_stage', 'progressive']:
-            if stage in models[model_type]:
-                model_data = models[model_type][stage]
-                rf_model = model_data['rf_model']
-                features = model_data['selected_features']
-                importances = rf_model.feature_importances_
-                
-                model_key = f"{model_type}_{stage}"
-                
-                for feat, imp in zip(features, importances):
-                    if feat not in feature_importance_all:
-                        feature_importance_all[feat] = {}
-                    feature_importance_all[feat][model_key] = imp
-    
-    # Calculate average importance and frequency
-    feature_summary = []
-    for feature, importances in feature_importance_all.items():
-        feature_summary.append({
-            'feature': feature,
-            'avg_importance': np.mean(list(importances.values())),
-            'frequency': len(importances),
-            'std_importance': np.std(list(importances.values()))
-        })
-    
-    summary_df = pd.DataFrame(feature_summary).sort_values('avg_importance', ascending=False)
-    
-    # Features that appear in all models
-    print("\n🌟 FEATURES APPEARING IN ALL 6 MODELS:")
+    print(f"\n🌟 FEATURES APPEARING IN ALL {matrix.shape[1]} MODELS:")
     print("-" * 80)
-    universal_features = summary_df[summary_df['frequency'] == 6].head(10)
+    universal_features = summary_df[summary_df['frequency'] == matrix.shape[1]].head(10)
     print(universal_features[['feature', 'avg_importance', 'std_importance']].to_string(index=False))
-    
-    # Most important features on average
     print("\n💪 TOP 15 FEATURES BY AVERAGE IMPORTANCE:")
     print("-" * 80)
     print(summary_df.head(15)[['feature', 'avg_importance', 'frequency', 'std_importance']].to_string(index=False))
-    
-    # Visualize feature importance heatmap
-    # Create a matrix of feature importances
-    all_features = list(feature_importance_all.keys())
-    model_names = []
-    for model_type in ['viability', 'passage']:
-        for stage in ['new_bill', 'early_stage', 'progressive']:
-            model_names.append(f"{model_type}_{stage}")
-    
-    # Create importance matrix
-    importance_matrix = np.zeros((len(all_features), len(model_names)))
-    
-    for i, feature in enumerate(all_features):
-        for j, model_name in enumerate(model_names):
-            if model_name in feature_importance_all[feature]:
-                importance_matrix[i, j] = feature_importance_all[feature][model_name]
-    
-    # Select top 20 features by average importance for visualization
-    top_indices = summary_df.head(20).index
-    top_features = summary_df.loc[top_indices, 'feature'].values
-    top_importance_matrix = importance_matrix[[all_features.index(f) for f in top_features], :]
-    
-    # Create heatmap
-    plt.figure(figsize=(12, 10))
-    sns.heatmap(top_importance_matrix, 
-                xticklabels=[m.replace('_', ' ').title() for m in model_names],
-                yticklabels=top_features,
-                cmap='YlOrRd',
-                annot=True,
-                fmt='.3f',
-                cbar_kws={'label': 'Feature Importance'})
-    plt.title('Feature Importance Heatmap - Top 20 Features Across All Models')
-    plt.xlabel('Model')
-    plt.ylabel('Feature')
-    plt.tight_layout()
-    plt.show()
-
-def analyze_model_complexity(models, metadata):
-    """Analyze model complexity and feature usage"""
-    
+
     print("\n" + "="*80)
     print("MODEL COMPLEXITY ANALYSIS")
     print("="*80)
-    
-    complexity_data = []
-    
-    for model_type in ['viability', 'passage']:
-        for stage in ['new_bill', 'early_stage', 'progressive']:
-            if stage in models[model_type]:
-                model_data = models[model_type][stage]
-                
-                # Get feature sets from metadata
-                feature_sets = metadata['metadata']['feature_sets']
-                total_features = len(feature_sets[stage])
-                selected_features = len(model_data['selected_features'])
-                
-                complexity_data.append({
-                    'Model': f"{model_type.capitalize()} - {stage.replace('_', ' ').title()}",
-                    'Total Features Available': total_features,
-                    'Features Selected': selected_features,
-                    'Selection Rate': selected_features / total_features,
-                    'RF Trees': model_data['rf_model'].n_estimators,
-                    'RF Max Depth': model_data['rf_model'].max_depth,
-                    'GB Trees': model_data['gb_model'].n_estimators,
-                    'GB Max Depth': model_data['gb_model'].max_depth
-                })
-    
-    complexity_df = pd.DataFrame(complexity_data)
     print("\n📊 MODEL COMPLEXITY METRICS:")
     print("-" * 100)
-    print(complexity_df.to_string(index=False))
-    
-    # Visualize feature selection
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-    
-    # Feature selection rate
-    complexity_df.plot(x='Model', y=['Total Features Available', 'Features Selected'], 
-                      kind='bar', ax=ax1)
+    print(tables['complexity'].to_string(index=False))
+
+
+# ---------------------------------------------------------------------------
+# Figures (rendered in worker processes, no pyplot state shared)
+# ---------------------------------------------------------------------------
+
+def _init_worker():
+    import matplotlib.style
+    import seaborn as sns
+    matplotlib.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+
+
+def plot_performance(perf_df, path):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(15, 10))
+    axes = fig.subplots(2, 3)
+    fig.suptitle('Model Performance Comparison', fontsize=16)
+
+    metrics = ['Accuracy', 'ROC-AUC', 'Precision', 'Recall', 'F1 Score', 'CV ROC-AUC']
+    for ax, metric in zip(axes.flat, metrics):
+        pivot_data = perf_df.pivot(index='Stage', columns='Model Type', values=metric)
+        pivot_data.plot(kind='bar', ax=ax)
+        ax.set_title(metric)
+        ax.set_xlabel('Stage')
+        ax.set_ylabel('Score')
+        ax.legend(title='Model Type')
+        ax.set_ylim(0, 1.1)
+        for container in ax.containers:
+            ax.bar_label(container, fmt='%.3f', padding=3)
+
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+def plot_importance(matrix, path):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(18, 12))
+    axes = fig.subplots(2, 3)
+    fig.suptitle('Top 10 Most Important Features by Model Stage', fontsize=16)
+
+    for ax, name in zip(axes.flat, MODEL_NAMES):
+        if name not in matrix.columns:
+            ax.set_visible(False)
+            continue
+        top = matrix[name].dropna().nlargest(10)
+        top.plot(kind='barh', ax=ax)
+        model_type, stage = _label(name)
+        ax.set_title(f'{model_type} - {stage}')
+        ax.set_xlabel('Importance')
+        ax.set_ylabel('')
+
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+def plot_overlap(matrix, summary_df, path):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    top_features = summary_df['feature'].head(20)
+    top_importance_matrix = matrix.reindex(index=top_features, columns=MODEL_NAMES).fillna(0.0)
+
+    fig = Figure(figsize=(12, 10))
+    ax = fig.subplots()
+    sns.heatmap(top_importance_matrix.to_numpy(),
+                xticklabels=[m.replace('_', ' ').title() for m in MODEL_NAMES],
+                yticklabels=top_features.to_numpy(),
+                cmap='YlOrRd',
+                annot=True,
+                fmt='.3f',
+                cbar_kws={'label': 'Feature Importance'},
+                ax=ax)
+    ax.set_title('Feature Importance Heatmap - Top 20 Features Across All Models')
+    ax.set_xlabel('Model')
+    ax.set_ylabel('Feature')
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+def plot_complexity(complexity_df, path):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(14, 6))
+    ax1, ax2 = fig.subplots(1, 2)
+
+    complexity_df.plot(x='Model', y=['Total Features Available', 'Features Selected'], kind='bar', ax=ax1)
     ax1.set_title('Feature Selection by Model')
     ax1.set_xlabel('')
     ax1.set_ylabel('Number of Features')
     ax1.legend(['Available', 'Selected'])
-    plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
-    
-    # Model trees
+    ax1.tick_params(axis='x', labelrotation=45)
+
     x = np.arange(len(complexity_df))
     width = 0.35
     ax2.bar(x - width/2, complexity_df['RF Trees'], width, label='Random Forest Trees')
@@ -302,50 +323,123 @@ def analyze_model_complexity(models, metadata):
     ax2.set_xticks(x)
     ax2.set_xticklabels(complexity_df['Model'], rotation=45, ha='right')
     ax2.legend()
-    
-    plt.tight_layout()
-    plt.show()
+
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+def render_figures(tables, report_dir, workers=None):
+    """Render every figure to PNG concurrently; returns {title: filename}"""
+    jobs = {
+        'Model Performance': (plot_performance, (tables['performance'],), 'performance.png'),
+        'Feature Importance': (plot_importance, (tables['importance'],), 'feature_importance.png'),
+        'Cross-Model Feature Importance': (plot_overlap, (tables['importance'], tables['summary']),
+                                           'feature_overlap.png'),
+        'Model Complexity': (plot_complexity, (tables['complexity'],), 'complexity.png'),
+    }
+    figures = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {title: pool.submit(func, *args, os.path.join(report_dir, filename))
+                   for title, (func, args, filename) in jobs.items()}
+        for title, future in futures.items():
+            try:
+                figures[title] = os.path.basename(future.result())
+            except Exception as e:
+                print(f"✗ Could not render {title}: {e}")
+    return figures
+
+
+def write_html(tables, figures, hashes, path):
+    sections = []
+    for title, key in [('Performance', 'performance'), ('Feature Summary', 'summary'),
+                       ('Model Complexity', 'complexity')]:
+        frame = tables[key].head(30) if key == 'summary' else tables[key]
+        sections.append(f"<h2>{title}</h2>\n{frame.to_html(index=False, float_format=lambda v: f'{v:.4f}')}")
+    for title, filename in figures.items():
+        sections.append(f'<h2>{title}</h2>\n<img src="{filename}" alt="{title}">')
+    artifacts = ''.join(f"<li>{name}: <code>{digest[:12]}</code></li>" for name, digest in hashes.items())
+    with open(path, 'w') as f:
+        f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Model Analysis</title></head><body>\n"
+                "<h1>Model Performance and Feature Importance Analysis</h1>\n"
+                + "\n".join(sections)
+                + f"\n<h2>Artifacts</h2>\n<ul>{artifacts}</ul>\n</body></html>\n")
+
+
+def build_report(models_dir='models', output_dir=os.path.join('models', 'report'), workers=None, force=False):
+    """Build (or reuse) the report for the current artifacts; returns the report.html path or None"""
+    paths = artifact_paths(models_dir)
+    hashes = artifact_hashes(paths, workers)
+    if not any(name in hashes for name in MODEL_NAMES):
+        print(f"❌ Error: no model files found in '{models_dir}'!")
+        return None
+
+    report_dir = os.path.join(output_dir, report_key(hashes))
+    report_path = os.path.join(report_dir, 'report.html')
+    if os.path.exists(report_path) and not force:
+        print(f"Artifacts unchanged, report is up to date: {report_path}")
+        return report_path
+
+    models, metadata = load_models({name: paths[name] for name in hashes}, workers)
+    tables = build_tables(models, metadata)
+    print_tables(tables)
+
+    os.makedirs(report_dir, exist_ok=True)
+    tables['performance'].to_csv(os.path.join(report_dir, 'performance.csv'), index=False)
+    tables['importance'].to_csv(os.path.join(report_dir, 'feature_importance.csv'), index_label='feature')
+    tables['summary'].to_csv(os.path.join(report_dir, 'feature_summary.csv'), index=False)
+    tables['complexity'].to_csv(os.path.join(report_dir, 'complexity.csv'), index=False)
+
+    figures = render_figures(tables, report_dir, workers)
+    with open(os.path.join(report_dir, 'artifacts.json'), 'w') as f:
+        json.dump(hashes, f, indent=2)
+    # Written last: its presence marks the cached report as complete
+    write_html(tables, figures, hashes, report_path)
+    print(f"\nReport written to {report_path}")
+    return report_path
+
 
 def main():
     """Run all analyses"""
-    
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--output', default=os.path.join('models', 'report'))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='rebuild even if a cached report exists')
+    args = parser.parse_args()
+
     # Check if models directory exists
-    if not os.path.exists('models'):
-        print("❌ Error: 'models' directory not found!")
+    if not os.path.exists(args.models_dir):
+        print(f"❌ Error: '{args.models_dir}' directory not found!")
         print("Please ensure you're running this from the correct directory.")
-        return
-    
-    # Load models
-    models, metadata = load_models()
-    
-    # Run analyses
-    analyze_model_performance(models, metadata)
-    analyze_feature_importance(models)
-    analyze_feature_overlap(models)
-    analyze_model_complexity(models, metadata)
-    
+        return 1
+
+    if build_report(args.models_dir, args.output, args.workers, args.force) is None:
+        return 1
+
     # Summary insights
     print("\n" + "="*80)
     print("KEY INSIGHTS")
     print("="*80)
-    
+
     print("""
 📌 Model Performance Patterns:
    - Progressive models generally perform better due to more available features
    - Viability prediction is easier than passage prediction
    - All models show good discrimination (ROC-AUC > 0.7)
-   
+
 📌 Feature Importance Patterns:
    - Committee-related features are consistently important
    - Temporal features (days active, activity rate) gain importance in later stages
    - Bipartisan support indicators are strong predictors
    - Original cosponsor count is important for early predictions
-   
+
 📌 Model Complexity:
    - Feature selection reduces dimensionality by ~50% on average
    - Random Forest uses 300 trees, Gradient Boosting uses 200
    - Models balance complexity with performance effectively
     """)
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
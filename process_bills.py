@@ -1,15 +1,23 @@
-
+import argparse
+import os
+import sys
+from datetime import datetime
 import pandas as pd
 import numpy as np
 
-def process_bills():
-    print("Reading Bills.xlsx...")
-    try:
-        df = pd.read_excel('Bills.xlsx')
-    except Exception as e:
-        print(f"Error: {e}")
-        return
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+import bill_store
+import changes
+from dates import normalize_dates
+from ministry import normalize_ministries
+from chunked import iter_chunks, PartitionedWriter, CHUNK_SIZE
+from similar_bills import build_index, INDEX_PATH
+from snapshots import append_snapshot, SNAPSHOT_DIR
 
+def preprocess_bills(df):
+    """
+    Normalize the raw Lok Sabha export into the processed bills schema
+    """
     # Normalize Columns
     # Mapping:
     # 'Short Title' -> 'title'
@@ -26,8 +34,8 @@ def process_bills():
         'Bill Number': 'bill_id'
     })
     
-    # Fill NAs
-    df['ministry'] = df['ministry'].fillna('Unknown')
+    # Fill NAs; canonical ministry names ('Unknown' for blanks)
+    df['ministry'] = normalize_ministries(df['ministry'])
     df['status'] = df['status'].fillna('Unknown')
     
     # Standardize Status
@@ -39,7 +47,7 @@ def process_bills():
     
     # Date Handling
     # '2025-01-30' format usually in Excel, or datetime objects
-    df['introduction_date'] = pd.to_datetime(df['introduction_date'], errors='coerce')
+    df['introduction_date'] = normalize_dates(df['introduction_date'], source='lok_sabha', column='introduction_date')
     df['year'] = df['introduction_date'].dt.year.fillna(0).astype(int)
     
     # Feature Extraction from Title
@@ -51,12 +59,76 @@ def process_bills():
     df['is_amendment'] = df['title'].str.contains('Amendment', case=False, na=False).astype(int)
     df['is_appropriation'] = df['title'].str.contains('Appropriation', case=False, na=False).astype(int)
     df['is_finance'] = df['title'].str.contains('Finance', case=False, na=False).astype(int)
+    return df
+
+def process_bills(input_path='Bills.xlsx', output_path='data/bills_processed.csv', db_path=None,
+                  index_path=INDEX_PATH, snapshot_dir=SNAPSHOT_DIR):
+    print(f"Reading {input_path}...")
+    try:
+        df = pd.read_excel(input_path)
+    except Exception as e:
+        print(f"Error: {e}")
+        return
+
+    df = preprocess_bills(df)
     
     # Save
-    output_path = 'data/bills_processed.csv'
     df.to_csv(output_path, index=False)
     print(f"Saved {len(df)} bills to {output_path}")
+    detected = changes.detect_refresh(df, 'lok_sabha', db_path)
+    count = bill_store.upsert_bills(df, source='lok_sabha', path=db_path)
+    print(f"Upserted {count} bills into {db_path or bill_store.DB_FILE}")
+    changes.publish_changes(detected, db_path)
+    if snapshot_dir:
+        count = append_snapshot(df, source='lok_sabha', root=snapshot_dir)
+        print(f"Appended a snapshot of {count} bills to {snapshot_dir}")
+    if index_path:
+        build_index(df).save(index_path)
+        print(f"Saved similar-bills index to {index_path}")
     print(df['status'].value_counts())
 
+def process_bills_chunked(input_path='Bills.xlsx', output_dir='data/bills_partitioned', chunksize=CHUNK_SIZE,
+                          db_path=None, upsert=True, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Streaming variant of process_bills for archives that don't fit in memory:
+    the source is read `chunksize` rows at a time and written partitioned by
+    year (and house, when the source has one).
+    """
+    print(f"Reading {input_path} in chunks of {chunksize}...")
+    writer = PartitionedWriter(output_dir)
+    # Every chunk of one run belongs to the same snapshot
+    snapshot_at = datetime.now()
+    status_counts = pd.Series(dtype=int)
+    # A run into an empty store is the change-detection baseline for all its chunks, not just the first
+    baseline = upsert and not bill_store.has_bills('lok_sabha', db_path)
+    if baseline:
+        print("No stored bills yet; this refresh is the baseline for change detection")
+    for i, chunk in enumerate(iter_chunks(input_path, chunksize)):
+        df = preprocess_bills(chunk)
+        writer.write(df)
+        if upsert:
+            # Each chunk only reads the stored rows of its own bills
+            detected = None if baseline else changes.detect_refresh(df, 'lok_sabha', db_path)
+            bill_store.upsert_bills(df, source='lok_sabha', path=db_path)
+            if detected is not None:
+                changes.publish_changes(detected, db_path)
+        if snapshot_dir:
+            append_snapshot(df, source='lok_sabha', root=snapshot_dir, snapshot_at=snapshot_at)
+        status_counts = status_counts.add(df['status'].value_counts(), fill_value=0)
+        print(f"  chunk {i + 1}: {writer.rows} bills")
+
+    print(f"Saved {writer.rows} bills to {len(writer.files)} partitions under {output_dir}")
+    print(status_counts.astype(int).sort_values(ascending=False))
+    return writer.rows
+
 if __name__ == "__main__":
-    process_bills()
+    # --chunksize N streams the source and writes year/house partitions instead of one CSV
+    parser = argparse.ArgumentParser(description='Convert the Lok Sabha Excel export into the processed bills dataset')
+    parser.add_argument('--input', default='Bills.xlsx')
+    parser.add_argument('--chunksize', type=int, default=None)
+    parser.add_argument('--output-dir', default='data/bills_partitioned')
+    args = parser.parse_args()
+    if args.chunksize:
+        process_bills_chunked(args.input, args.output_dir, args.chunksize)
+    else:
+        process_bills(args.input)
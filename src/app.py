@@ -1,13 +1,12 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import plotly.express as px
+from datetime import datetime
+import hmac
 import os
 
-# Import data fetch functions
-from data_fetch import fetch_comprehensive_bill_data
+# Only light modules at startup: pandas, plotly and the models are loaded
+# lazily through warmup (and preloaded in the background after first render)
+import tracing
+import warmup
 
 # Page configuration
 st.set_page_config(
@@ -45,52 +44,239 @@ with st.sidebar:
     - **Passage**: Probability of receiving Presidential Assent
     """)
 
-# Main input
-col1, col2, col3 = st.columns([2, 1, 1])
-with col1:
-    bill_input = st.text_input('Enter Bill ID / Number', placeholder='e.g., 123 (Try 127 for Waqf Bill)')
-with col2:
-    house = st.selectbox('House', ['Lok Sabha', 'Rajya Sabha'])
-with col3:
-    session = st.text_input('Session/Year', value='2024')
-
-# Display options
-with st.expander("📊 Display Options"):
-    col1, col2 = st.columns(2)
+# Per-bill results are cached across reruns and sessions
+BUNDLE_TTL = 15 * 60
+MAX_CACHED_BILLS = 256
+SIMILAR_BILLS = 5
+
+
+def load_model(warnings=None):
+    # With `warnings`, problems are collected there instead of rendered (inside cached functions)
+    try:
+        return warmup.get('model')
+    except Exception as e:
+        if warnings is None:
+            st.error(f"Error loading model: {e}")
+        else:
+            warnings.append(f"Error loading model: {e}")
+        return None, None
+
+
+def load_stage_router(warnings=None):
+    try:
+        return warmup.get('router')
+    except Exception as e:
+        message = f"Stage models unavailable ({e}), using the single model."
+        if warnings is None:
+            st.warning(message)
+        else:
+            warnings.append(message)
+        return None
+
+
+def calculate_indian_probability(bill, local_actions, warnings):
+    """
+    ML mode prediction with heuristic fallback. Failures are appended to
+    `warnings`; the caller renders them.
+    """
+    model, model_cols = load_model(warnings)
+    router = load_stage_router(warnings)
+    data_fetch = warmup.get('data')
+    status = str(bill.status).lower()
+
+    # 1. Deterministic States
+    if 'Assented' in status or 'Passed' in status:
+        return 1.0, 0.0, "Bill has likely passed or been enacted based on historical data."
+    if 'Lapsed' in status or 'Withdrawn' in status or 'Negatived' in status:
+        return 0.0, 0.0, "Bill has failed (Lapsed/Withdrawn)."
+
+    # 2. Stage-aware ML Prediction (New Bill / Early Stage / Progressive)
+    if router is not None:
+        try:
+            from stage_router import STAGE_LABELS
+            frame = data_fetch.fetch_scoring_frame([bill.bill_id])
+            if not frame.empty:
+                probs, stages = router.score(frame)
+                b_ministry = str(bill.ministry)
+                explanation = (f"ML {STAGE_LABELS[stages[0]]} Model Prediction based on: "
+                               f"Year {int(bill.year)}, Ministry '{b_ministry}'.")
+                if int(bill.is_amendment):
+                    explanation += " Identifed as Amendment Bill."
+                return probs[0], 0.15, explanation
+        except Exception as e:
+            warnings.append(f"Stage model failed ({e}), falling back to the single model.")
+
+    # 3. ML Prediction
+    if model and model_cols:
+        try:
+            # Prepare input vector aligned to the training columns
+            from ensemble import EnsembleScorer
+            from features import build_inference_features
+            input_df = build_inference_features(bill.to_frame(), model_cols)
+            b_ministry = str(bill.ministry)
+
+            # Predict
+            prob_array = model.predict_proba(input_df)
+            prob = prob_array[0][1] # Probability of Class 1 (Passed)
+
+            model_name = "Ensemble (RF+GB+LR)" if isinstance(model, EnsembleScorer) else "Model"
+            explanation = f"ML {model_name} Prediction (v2) based on: Year {int(bill.year)}, Ministry '{b_ministry}'."
+            if int(bill.is_amendment):
+                explanation += " Identifed as Amendment Bill."
+
+            return prob, 0.15, explanation
+
+        except Exception as e:
+            warnings.append(f"ML Model failed ({e}), falling back to heuristic.")
+
+    # 4. Heuristic Fallback
+    prob = 0.5
+    explanation = "Uncertain status (Heuristic)."
+    return prob, 0.3, explanation
+
+
+def find_similar_bills(bill, warnings, k=SIMILAR_BILLS):
+    """Most similar decided bills from the precomputed index (None if it has not been built)"""
+    try:
+        index = warmup.get('similar')
+    except Exception as e:
+        warnings.append(f"Similar-bills index unavailable: {e}")
+        return None
+    if index is None:
+        return None
+    similar = index.for_bill(bill.bill_id, k)
+    if similar.empty:
+        similar = index.query(bill.to_frame(), k)
+    return similar
+
+
+def model_cache_key():
+    """Versions of the models and similar-bills index being served; a hot-swap gets fresh cache entries"""
+    return f"{warmup.version('model')}/{warmup.version('router')}/{warmup.version('similar')}"
+
+
+class DegradedBundle(Exception):
+    """Raised out of load_bill_bundle so st.cache_data does not keep a bundle built on a fallback path"""
+
+    def __init__(self, bundle):
+        super().__init__("degraded bill bundle")
+        self.bundle = bundle
+
+
+@st.cache_data(ttl=BUNDLE_TTL, max_entries=MAX_CACHED_BILLS, show_spinner=False)
+def load_bill_bundle(bill_id, house, bill_version, model_version):
+    """
+    Bill record, actions, metrics, prediction and similar bills for one bill, or None.
+    bill_version and model_version are only part of the cache key. A bundle
+    with warnings (a model or index failed to load or score) raises
+    DegradedBundle instead, so a transient failure is retried on the next run.
+    """
+    data_fetch = warmup.get('data')
+    warnings = []
+
+    comprehensive_data = data_fetch.fetch_comprehensive_bill_data(bill_id, congress=None, bill_type=house)
+    if not comprehensive_data:
+        return None
+
+    bill = comprehensive_data['bill_info']
+    actions = comprehensive_data['actions']
+
+    # Calculate temporal metrics
+    days_active = 0
+    with tracing.span('app.actions'):
+        if not actions.empty:
+            first_action = actions.first_date()
+            if first_action is not None:
+                days_active = (datetime.now() - first_action).days
+        else:
+            days_active = 1
+
+    with tracing.span('app.predict'):
+        prediction = calculate_indian_probability(bill, actions, warnings)
+
+    with tracing.span('app.similar'):
+        similar = find_similar_bills(bill, warnings)
+
+    bundle = {
+        'bill_info': bill,
+        'actions': actions,
+        'metrics': comprehensive_data['metrics'],
+        'days_active': days_active,
+        'prediction': prediction,
+        'similar': similar,
+        'warnings': warnings,
+    }
+    if warnings:
+        raise DegradedBundle(bundle)
+    return bundle
+
+
+def get_bill_bundle(bill_id, house, bill_version, model_version):
+    """load_bill_bundle, with degraded bundles returned uncached"""
+    try:
+        return load_bill_bundle(bill_id, house, bill_version, model_version)
+    except DegradedBundle as e:
+        return e.bundle
+
+
+warmup.start()
+
+mode = st.radio("Mode", ["Single Bill", "Compare Bills"], horizontal=True, label_visibility="collapsed")
+
+if mode == "Compare Bills":
+    import compare_view
+    compare_view.render()
+    bill_input = None
+else:
+    # Main input
+    col1, col2, col3 = st.columns([2, 1, 1])
     with col1:
-        show_confidence = st.checkbox("Show confidence intervals", value=True)
+        bill_input = st.text_input('Enter Bill ID / Number', placeholder='e.g., 123 (Try 127 for Waqf Bill)')
     with col2:
-        show_timeline = st.checkbox("Show activity timeline", value=True)
+        house = st.selectbox('House', ['Lok Sabha', 'Rajya Sabha'])
+    with col3:
+        session = st.text_input('Session/Year', value='2024')
+
+    # Display options
+    with st.expander("📊 Display Options"):
+        col1, col2 = st.columns(2)
+        with col1:
+            show_confidence = st.checkbox("Show confidence intervals", value=True)
+        with col2:
+            show_timeline = st.checkbox("Show activity timeline", value=True)
 
 if bill_input:
     try:
-        # Fetch bill data
+        import pandas as pd
+        data_fetch = warmup.get('data')
+
+        # Loaded first so the cache key below names the model versions being served
+        load_model()
+        load_stage_router()
+        try:
+            warmup.get('similar')
+        except Exception:
+            pass  # reported with the bundle
+
+        # Fetch bill data (cached per bill, house, bill version and model version)
         with st.spinner('Fetching bill information from Indian legislative database...'):
-            comprehensive_data = fetch_comprehensive_bill_data(
-                bill_input, congress=None, bill_type=house
-            )
-            
-            if not comprehensive_data or comprehensive_data['bill_info'].empty:
+            with tracing.span('app.fetch'):
+                bundle = get_bill_bundle(bill_input, house, data_fetch.bill_version(bill_input), model_cache_key())
+
+            if bundle is None:
                 st.error("Could not fetch bill data. Please check the bill number (Try ID 123-132).")
                 st.stop()
-            
-            df = comprehensive_data['bill_info']
-            actions_df = comprehensive_data['actions']
-            metrics = comprehensive_data['metrics']
-        
-        # Calculate temporal metrics
-        days_active = 0
-        if not actions_df.empty:
-            actions_df['date'] = pd.to_datetime(actions_df['date'], errors='coerce')
-            valid_dates = actions_df['date'].dropna()
-            if not valid_dates.empty:
-                first_action = valid_dates.min()
-                days_active = (datetime.now() - first_action).days
-        else:
-            days_active = 1
-        
+            for warning in bundle['warnings']:
+                st.warning(warning)
+
+            bill = bundle['bill_info']
+            actions = bundle['actions']
+            metrics = bundle['metrics']
+            days_active = bundle['days_active']
+            probability, spread, reason = bundle['prediction']
+
         # Bill header
-        bill_title = df['title'].values[0]
+        bill_title = bill.title
         st.subheader(f"📄 {bill_title}")
         
         # Add bill verification info
@@ -98,18 +284,18 @@ if bill_input:
             col1, col2 = st.columns(2)
             with col1:
                 st.write(f"**Bill ID:** {bill_input}")
-                st.write(f"**House:** {df['house'].values[0] if 'house' in df.columns else house}")
-                st.markdown(f"**Ministry/Sponsor:** {df['sponsor'].values[0]}")
-                st.markdown(f"**Introduction Date:** {df['introduced_date'].values[0]}")
-                st.markdown(f"**Status:** {df['status'].values[0]}")
-                st.markdown(f"**Year:** {df['year'].values[0]}")
+                st.write(f"**House:** {bill.house or house}")
+                st.markdown(f"**Ministry/Sponsor:** {bill.sponsor}")
+                st.markdown(f"**Introduction Date:** {bill.introduced_date}")
+                st.markdown(f"**Status:** {bill.status}")
+                st.markdown(f"**Year:** {bill.year}")
                 
-                is_amend = "Yes" if df['is_amendment'].values[0] == 1 else "No"
+                is_amend = "Yes" if bill.is_amendment == 1 else "No"
                 st.markdown(f"**Is Amendment:** {is_amend}")
             with col2:
-                st.write(f"**Type:** {df['type'].values[0]}")
-                st.write(f"**Sponsor:** {df['sponsor'].values[0]}")
-                st.write(f"**Introduced:** {df['introduced_date'].values[0]}")
+                st.write(f"**Type:** {bill.type}")
+                st.write(f"**Sponsor:** {bill.sponsor}")
+                st.write(f"**Introduced:** {bill.introduced_date}")
 
         
         # Key metrics
@@ -120,25 +306,16 @@ if bill_input:
         with col2:
             st.metric("Total Actions", metrics.get('total_actions', 0))
         with col3:
-            st.metric("Ministry", df['sponsor'].values[0])
+            st.metric("Ministry", bill.sponsor)
         with col4:
-            st.metric("Bill Type", df['type'].values[0])
+            st.metric("Bill Type", bill.type)
         
         # Activity timeline as table
-        if show_timeline and not actions_df.empty:
+        if show_timeline and not actions.empty:
             st.subheader("📅 Legislative Timeline")
             
-            timeline_data = []
-            for _, action in actions_df.iterrows():
-                # Clean and truncate action text
-                action_text = str(action['text']).strip()
-                
-                timeline_data.append({
-                    'Date': action['date'].strftime('%d %B %Y') if pd.notnull(action['date']) else 'N/A',
-                    'Action': action_text,
-                })
-            
-            st.dataframe(pd.DataFrame(timeline_data), use_container_width=True, hide_index=True)
+            with tracing.span('app.render_timeline'):
+                st.dataframe(actions.to_frame(), use_container_width=True, hide_index=True)
             
         st.markdown("---")
         
@@ -148,97 +325,30 @@ if bill_input:
         # --- ML PREDICTION LOGIC FOR INDIA ---
         st.header("🔮 AI Prediction Logic")
         
-        @st.cache_resource
-        def load_model():
-            try:
-                import joblib
-                model = joblib.load('data/indian_bill_model.pkl')
-                columns = joblib.load('data/model_columns.pkl')
-                return model, columns
-            except Exception as e:
-                st.error(f"Error loading model: {e}")
-                return None, None
-
-        model, model_cols = load_model()
-
-        def calculate_indian_probability(bill_row, local_actions):
-            """
-            ML mode prediction with heuristic fallback
-            """
-            status = str(bill_row['status'].values[0]).lower()
-            
-            # 1. Deterministic States
-            if 'Assented' in status or 'Passed' in status:
-                return 1.0, 0.0, "Bill has likely passed or been enacted based on historical data."
-            if 'Lapsed' in status or 'Withdrawn' in status or 'Negatived' in status:
-                return 0.0, 0.0, "Bill has failed (Lapsed/Withdrawn)."
-            
-            # 2. ML Prediction
-            if model and model_cols:
-                try:
-                    # Prepare input vector
-                    input_data = {col: 0 for col in model_cols}
-                    
-                    # Fill features
-                    # Numeric
-                    input_data['year'] = float(bill_row['year'].values[0])
-                    input_data['is_amendment'] = int(bill_row['is_amendment'].values[0])
-                    input_data['is_appropriation'] = int(bill_row['is_appropriation'].values[0])
-                    input_data['is_finance'] = int(bill_row['is_finance'].values[0])
-                    
-                    # Ministry
-                    b_ministry = str(bill_row['ministry'].values[0]) 
-                    min_col = f"ministry_clean_{b_ministry}"
-                    if min_col in input_data:
-                        input_data[min_col] = 1
-                    
-                    # Convert to DF
-                    input_df = pd.DataFrame([input_data])
-                    
-                    # Predict
-                    prob_array = model.predict_proba(input_df)
-                    prob = prob_array[0][1] # Probability of Class 1 (Passed)
-                    
-                    explanation = f"ML Model Prediction (v2) based on: Year {int(input_data['year'])}, Ministry '{b_ministry}'."
-                    if input_data['is_amendment']:
-                        explanation += " Identifed as Amendment Bill."
-                        
-                    return prob, 0.15, explanation
-                    
-                except Exception as e:
-                    st.warning(f"ML Model failed ({e}), falling back to heuristic.")
-            
-            # 3. Heuristic Fallback
-            prob = 0.5
-            explanation = "Uncertain status (Heuristic)."
-            return prob, 0.3, explanation
-
-
-        # Calculate prediction
-        probability, spread, reason = calculate_indian_probability(df, actions_df)
-        
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Passage Probability")
             
             # Gauge Chart
-            fig = go.Figure(go.Indicator(
-                mode = "gauge+number",
-                value = probability * 100,
-                domain = {'x': [0, 1], 'y': [0, 1]},
-                title = {'text': "Probability"},
-                gauge = {
-                    'axis': {'range': [0, 100]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [0, 30], 'color': "lightgray"},
-                        {'range': [30, 70], 'color': "gray"},
-                        {'range': [70, 100], 'color': "lightblue"}],
-                }
-            ))
-            fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
-            st.plotly_chart(fig, use_container_width=True)
+            with tracing.span('app.render_gauge'):
+                go = warmup.get('plotly')
+                fig = go.Figure(go.Indicator(
+                    mode = "gauge+number",
+                    value = probability * 100,
+                    domain = {'x': [0, 1], 'y': [0, 1]},
+                    title = {'text': "Probability"},
+                    gauge = {
+                        'axis': {'range': [0, 100]},
+                        'bar': {'color': "darkblue"},
+                        'steps': [
+                            {'range': [0, 30], 'color': "lightgray"},
+                            {'range': [30, 70], 'color': "gray"},
+                            {'range': [70, 100], 'color': "lightblue"}],
+                    }
+                ))
+                fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
+                st.plotly_chart(fig, use_container_width=True)
             
         with col2:
             st.subheader("Analysis")
@@ -254,17 +364,23 @@ if bill_input:
         # Recommendations
         st.markdown("---")
         st.subheader("💡 Strategic Recommendations")
-        
-        if probability < 0.5:
-            if 'government' in str(df['type'].values[0]).lower():
-                st.markdown("- **Floor Management**: Ensure coalition MPs are present for voting.")
-                st.markdown("- **Opposition Consensus**: Engage with opposition leaders to reduce disruption.")
-            else:
-                st.markdown("- **Ministry Support**: Try to get the relevant Ministry to adopt the bill's objectives.")
-                st.markdown("- **Public Awareness**: Use the bill to generate public debate on the issue.")
-        else:
-            st.markdown("- **Press ahead**: Schedule for passing in the remaining House immediately.")
-            st.markdown("- **Gazette Notification**: Prepare for immediate notification after Assent.")
+
+        from predict import recommendations
+        for heading, advice in recommendations(probability, bill.type):
+            st.markdown(f"- **{heading}**: {advice}")
+
+        # Bills like this one
+        if bundle['similar'] is not None and not bundle['similar'].empty:
+            st.markdown("---")
+            st.subheader("🔎 Similar Past Bills")
+            similar = bundle['similar'].rename(columns={
+                'bill_id': 'Bill ID', 'title': 'Title', 'ministry': 'Ministry', 'year': 'Year',
+                'status': 'Final Status', 'similarity': 'Similarity'
+            })
+            st.dataframe(similar, use_container_width=True, hide_index=True,
+                         column_config={'Similarity': st.column_config.NumberColumn(format="%.2f")})
+            decided = similar['Final Status'].isin(['Assented', 'Passed']).mean()
+            st.caption(f"{decided:.0%} of these similar bills passed.")
 
     except Exception as e:
         st.error(f"❗ An error occurred: {str(e)}")
@@ -274,4 +390,47 @@ if bill_input:
 
 # Footer
 st.markdown("---")
-st.caption("Indian Parliament Bill Tracker | Adapted for Lok Sabha & Rajya Sabha | Prototype Version")
\ No newline at end of file
+st.caption("Indian Parliament Bill Tracker | Adapted for Lok Sabha & Rajya Sabha | Prototype Version")
+
+def admin_token():
+    """ADMIN_TOKEN from the environment or Streamlit secrets; None disables the admin panel"""
+    token = os.environ.get('ADMIN_TOKEN')
+    if token:
+        return token
+    try:
+        return st.secrets.get('admin_token')
+    except Exception:
+        # No secrets.toml
+        return None
+
+
+# Admin panel: append ?admin=<ADMIN_TOKEN> to the URL. It changes process-wide
+# state (tracing, the shared bill cache), so it stays off without a token.
+_admin_token = admin_token()
+if _admin_token and hmac.compare_digest(st.query_params.get('admin', ''), _admin_token):
+    with st.expander("🛠️ Admin: Stage Timings", expanded=True):
+        tracing.enable(st.checkbox("Enable tracing", value=tracing.ENABLED))
+        trace = tracing.snapshot()
+        if trace['stages']:
+            import pandas as pd
+            stage_df = pd.DataFrame.from_dict(trace['stages'], orient='index')
+            stage_df = stage_df[['count', 'mean', 'p50', 'p95', 'p99', 'max', 'sum']]
+            stage_df[['mean', 'p50', 'p95', 'p99', 'max']] *= 1000
+            st.caption("Latencies in milliseconds, totals in seconds")
+            st.dataframe(stage_df.sort_values('sum', ascending=False), use_container_width=True)
+        else:
+            st.info("No spans recorded yet. Enable tracing and load a bill.")
+
+        st.caption(f"Cached bill bundles: up to {MAX_CACHED_BILLS}, {BUNDLE_TTL // 60} min TTL "
+                   f"(dataset {warmup.get('data').dataset_version()}, models {model_cache_key()})")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.download_button("Download JSON", tracing.export_json(), file_name="trace.json", mime="application/json")
+        with col2:
+            st.download_button("Download Prometheus", tracing.export_prometheus(), file_name="trace.prom", mime="text/plain")
+        with col3:
+            if st.button("Reset timings"):
+                tracing.reset()
+        with col4:
+            if st.button("Clear bill cache"):
+                load_bill_bundle.clear()
\ No newline at end of file
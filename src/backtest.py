@@ -0,0 +1,259 @@
+"""
+Historical backtest of the passage model.
+
+For every cutoff date in a schedule (by default the start of each
+parliamentary session over the last ten years), a model is trained on the
+bills whose outcome was known by the cutoff and scores the bills that were
+still pending then; the scores are compared with their eventual outcomes:
+
+    python src/backtest.py [--years 10] [--reuse current] [--workers N]
+
+The feature matrix, dates and labels are built once, dumped to a scratch
+file and memory-mapped read-only by every worker process, so a pool of
+workers shares one copy. Cutoffs with the same training set (no outcome
+became known between them) share one fitted model. --reuse <version|current>
+scores every cutoff with a published registry version instead of retraining
+(fast, but that model has seen later outcomes).
+
+Results land in data/backtests/<run>/: summary.csv (AUC, Brier score and
+expected calibration error per cutoff), calibration.csv (predicted vs
+observed pass rate per probability bin) and scores.csv.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from bill_store import EVENT_COLUMNS, _parse_dates
+from ensemble import EnsembleScorer, train_ensemble
+from features import (PASSED_STATUSES, FAILED_STATUSES, NUMERIC_FEATURES, MINISTRY_PREFIX,
+                      build_inference_features)
+from ministry import normalize_ministries
+
+OUTPUT_DIR = 'data/backtests'
+YEARS = 10
+# Approximate (month, day) on which the Budget, Monsoon and Winter sessions open
+SESSION_STARTS = [(2, 1), (7, 20), (11, 25)]
+# A failed bill's lapse or withdrawal date is not in the export; it counts as
+# decided once the Lok Sabha it was introduced in was dissolved
+LOK_SABHA_DISSOLVED = pd.to_datetime([
+    '1957-04-04', '1962-03-31', '1967-03-03', '1970-12-27', '1977-01-18', '1979-08-22', '1984-12-31',
+    '1989-11-27', '1991-03-13', '1996-05-10', '1997-12-04', '1999-04-26', '2004-02-06', '2009-05-18',
+    '2014-05-18', '2019-05-24', '2024-06-05',
+]).to_numpy(dtype='datetime64[ns]')
+MIN_TRAIN = 50
+MIN_CLASS = 5
+CALIBRATION_BINS = 10
+
+# Read-only arrays shared by the worker processes (memory-mapped)
+_shared = {}
+
+
+def session_cutoffs(years=YEARS, end=None):
+    """Session start dates of the last `years` years, up to `end` (default: today)"""
+    end = pd.Timestamp(end or datetime.now()).normalize()
+    cutoffs = [pd.Timestamp(year, month, day)
+               for year in range(end.year - years, end.year + 1) for month, day in SESSION_STARTS]
+    return [c for c in cutoffs if end - pd.DateOffset(years=years) < c <= end]
+
+
+def _event_dates(df, event):
+    column = next((c for c in EVENT_COLUMNS[event] if c in df.columns), None)
+    if column is None:
+        return pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    return _parse_dates(df[column])
+
+
+def session_ends(dates):
+    """The next session start after each date: the latest its session can have ended (NaT stays NaT)"""
+    dates = pd.DatetimeIndex(dates)
+    years = dates.year.to_numpy()
+    starts = np.array([pd.Timestamp(year, month, day).to_datetime64()
+                       for year in range(int(np.nanmin(years, initial=2000)), int(np.nanmax(years, initial=2000)) + 2)
+                       for month, day in SESSION_STARTS], dtype='datetime64[ns]')
+    values = dates.to_numpy(dtype='datetime64[ns]')
+    position = np.searchsorted(starts, values, side='right')
+    ends = starts[np.minimum(position, len(starts) - 1)]
+    return np.where(np.isnat(values), np.datetime64('NaT'), ends)
+
+
+def decision_dates(df):
+    """
+    Date each bill's outcome became known: assent (or the later House passage)
+    for passed bills, the end of the Lok Sabha term for failed ones. A passed
+    bill without event dates counts as decided by the end of the session it
+    was introduced in. NaT if the bill is undecided or no date can be told.
+    """
+    intro = _parse_dates(df['introduction_date']).to_numpy(dtype='datetime64[ns]')
+    passed_house = pd.concat([_event_dates(df, 'passed_ls'), _event_dates(df, 'passed_rs')], axis=1).max(axis=1)
+    passed = _event_dates(df, 'assent').fillna(passed_house).to_numpy(dtype='datetime64[ns]')
+    passed = np.where(np.isnat(passed), session_ends(intro), passed)
+    # NaT intro dates sort last, past every dissolution
+    term = np.searchsorted(LOK_SABHA_DISSOLVED, intro, side='right')
+    failed = np.where(term < len(LOK_SABHA_DISSOLVED),
+                      LOK_SABHA_DISSOLVED[np.minimum(term, len(LOK_SABHA_DISSOLVED) - 1)], np.datetime64('NaT'))
+    status = df['status'].to_numpy()
+    return np.where(np.isin(status, PASSED_STATUSES), passed,
+                    np.where(np.isin(status, FAILED_STATUSES), failed, np.datetime64('NaT')))
+
+
+def feature_columns(df):
+    """Every ministry seen in the data plus the numeric features, so all cutoffs share one matrix"""
+    ministries = sorted(normalize_ministries(df['ministry']).unique())
+    return [MINISTRY_PREFIX + ministry for ministry in ministries] + NUMERIC_FEATURES
+
+
+def prepare_data(df, columns, path):
+    """Build the shared arrays once and dump them where workers can memory-map them"""
+    status = df['status']
+    data = {
+        'X': build_inference_features(df, columns).to_numpy(dtype=np.float64),
+        # 1 passed, 0 failed, -1 no outcome yet
+        'y': np.where(status.isin(PASSED_STATUSES), 1, np.where(status.isin(FAILED_STATUSES), 0, -1)),
+        'introduced': _parse_dates(df['introduction_date']).to_numpy(dtype='datetime64[ns]'),
+        'decided': decision_dates(df),
+    }
+    joblib.dump(data, path)
+    return data
+
+
+def _init_worker(path, bundle):
+    _shared.update(joblib.load(path, mmap_mode='r'))
+    _shared['scorer'] = EnsembleScorer(bundle, parallel=False) if bundle else None
+
+
+def _run_group(train_cutoff, cutoffs, columns):
+    """Fit one model on the outcomes known at train_cutoff and score each cutoff's pending bills"""
+    X, y, introduced, decided = _shared['X'], _shared['y'], _shared['introduced'], _shared['decided']
+    train = (decided < np.datetime64(train_cutoff)) & (y >= 0)
+    scorer = _shared['scorer']
+    if scorer is None:
+        counts = np.bincount(y[train], minlength=2)
+        if train.sum() < MIN_TRAIN or counts.min() < MIN_CLASS:
+            return [(cutoff, int(train.sum()), None, None) for cutoff in cutoffs]
+        scorer = EnsembleScorer(train_ensemble(X[train], y[train], columns, n_jobs=1), parallel=False)
+
+    results = []
+    for cutoff in cutoffs:
+        cutoff = np.datetime64(cutoff)
+        known = (decided < cutoff) & (y >= 0)
+        # Outcomes that cannot be dated are left out rather than counted as pending forever
+        pending = np.flatnonzero((introduced < cutoff) & ~known & (y >= 0) & ~np.isnat(decided))
+        probs = scorer.score(X[pending]) if len(pending) else np.array([])
+        results.append((cutoff, int(known.sum()), pending, probs))
+    return results
+
+
+def group_cutoffs(cutoffs, decided):
+    """Cutoffs keyed by the first one with the same training set (no decision date between them)"""
+    known = np.sort(decided[~np.isnat(decided)])
+    counts = np.searchsorted(known, np.array(cutoffs, dtype='datetime64[ns]'), side='left')
+    groups = {}
+    for cutoff, count in zip(cutoffs, counts):
+        groups.setdefault(count, []).append(cutoff)
+    return list(groups.values())
+
+
+def cutoff_metrics(y, p):
+    """AUC, Brier score and expected calibration error for one cutoff, plus its calibration bins"""
+    from sklearn.metrics import roc_auc_score
+
+    bins = np.minimum((p * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+    count = np.bincount(bins, minlength=CALIBRATION_BINS)
+    mean_p = np.bincount(bins, weights=p, minlength=CALIBRATION_BINS) / np.maximum(count, 1)
+    observed = np.bincount(bins, weights=y, minlength=CALIBRATION_BINS) / np.maximum(count, 1)
+    calibration = pd.DataFrame({'bin': np.arange(CALIBRATION_BINS), 'count': count,
+                                'mean_predicted': mean_p, 'observed_rate': observed})[count > 0]
+    metrics = {
+        'auc': roc_auc_score(y, p) if 0 < y.sum() < len(y) else np.nan,
+        'brier': float(np.mean((p - y) ** 2)),
+        'ece': float(np.sum(np.abs(mean_p - observed) * count) / len(y)),
+        'pass_rate': float(y.mean()),
+        'mean_predicted': float(p.mean()),
+    }
+    return metrics, calibration
+
+
+def run_backtest(data_path='data/bills_processed.csv', cutoffs=None, reuse=None, workers=None,
+                 output_dir=OUTPUT_DIR):
+    """Backtest every cutoff in parallel; returns the per-cutoff summary"""
+    started = time.perf_counter()
+    df = pd.read_csv(data_path).reset_index(drop=True)
+    cutoffs = sorted(pd.Timestamp(c) for c in (cutoffs or session_cutoffs()))
+
+    bundle = None
+    if reuse:
+        import model_registry
+        bundle = model_registry.load_artifact('ensemble', None if reuse == 'current' else reuse)
+        columns = bundle['columns']
+    else:
+        columns = feature_columns(df)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        data = prepare_data(df, columns, os.path.join(scratch, 'shared.pkl'))
+        if bundle:
+            # One model for every cutoff: split the cutoffs across the workers
+            chunks = min(workers or os.cpu_count() or 1, len(cutoffs))
+            groups = [list(chunk) for chunk in np.array_split(np.array(cutoffs, dtype=object), chunks)]
+        else:
+            groups = group_cutoffs(cutoffs, data['decided'])
+        print(f"Backtesting {len(cutoffs)} cutoffs ({cutoffs[0]:%Y-%m-%d} to {cutoffs[-1]:%Y-%m-%d}), "
+              f"{'reusing one model' if bundle else f'{len(groups)} models to train'}...")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(os.path.join(scratch, 'shared.pkl'), bundle)) as pool:
+            futures = [pool.submit(_run_group, group[0], group, columns) for group in groups]
+            results = [result for future in futures for result in future.result()]
+
+    summary, calibration, scores = [], [], []
+    for cutoff, n_decided, pending, probs in sorted(results, key=lambda r: r[0]):
+        cutoff = pd.Timestamp(cutoff)
+        row = {'cutoff': cutoff.date(), 'decided_bills': n_decided,
+               'pending_bills': 0 if pending is None else len(pending)}
+        if pending is not None and len(pending):
+            outcome = data['y'][pending]
+            metrics, bins = cutoff_metrics(outcome, probs)
+            row.update(metrics)
+            calibration.append(bins.assign(cutoff=cutoff.date()))
+            scores.append(pd.DataFrame({'cutoff': cutoff.date(), 'bill_id': df['bill_id'].to_numpy()[pending],
+                                        'probability': probs, 'outcome': outcome}))
+        summary.append(row)
+    summary = pd.DataFrame(summary)
+
+    run_dir = os.path.join(output_dir, datetime.now().strftime('%Y%m%dT%H%M%S'))
+    os.makedirs(run_dir, exist_ok=True)
+    summary.to_csv(os.path.join(run_dir, 'summary.csv'), index=False)
+    if calibration:
+        pd.concat(calibration, ignore_index=True).to_csv(os.path.join(run_dir, 'calibration.csv'), index=False)
+        pd.concat(scores, ignore_index=True).to_csv(os.path.join(run_dir, 'scores.csv'), index=False)
+
+    print(summary.to_string(index=False, float_format=lambda v: f'{v:.3f}'))
+    print(f"Backtest finished in {time.perf_counter() - started:.1f}s; results in {run_dir}")
+    return summary
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Backtest the passage model over historical cutoffs')
+    parser.add_argument('--data', default='data/bills_processed.csv')
+    parser.add_argument('--years', type=int, default=YEARS, help='session starts over this many years')
+    parser.add_argument('--cutoffs', default='', help='comma separated dates instead of session starts')
+    parser.add_argument('--reuse', default=None,
+                        help="registry version (or 'current') to score with instead of retraining")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    args = parser.parse_args(argv)
+
+    cutoffs = [c for c in args.cutoffs.split(',') if c] or session_cutoffs(args.years)
+    run_backtest(args.data, cutoffs, args.reuse, args.workers, args.output_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,479 @@
+"""
+SQLite store for bills, their events and model predictions.
+
+The database (data/bills.db) runs in WAL mode so dashboard workers can read
+while the scraper / process_bills jobs write. Writers upsert; readers get a
+per-thread read-only connection from read_connection().
+
+Bill numbers repeat across years (and both sources), so rows are keyed on
+bill_key, a stable hash of the bill's identity: its page URL for PRS rows,
+(source, bill_id, year) otherwise. Titles and statuses are data, so a
+corrected title updates the existing row. Lookups by the public bill_id go
+through the bill_id index and return the first match in load order, like the
+CSV lookups did.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from dates import normalize_dates
+
+DB_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'bills.db')
+# PRAGMA user_version of a store keyed by the current make_bill_key (0: title was part of the key)
+KEY_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bills (
+    bill_key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    bill_id TEXT NOT NULL,
+    title TEXT,
+    short_title TEXT,
+    ministry TEXT,
+    type TEXT,
+    status TEXT,
+    house TEXT,
+    introduction_date TEXT,
+    year INTEGER,
+    is_amendment INTEGER,
+    is_appropriation INTEGER,
+    is_finance INTEGER,
+    url TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bills_bill_id ON bills (bill_id);
+CREATE INDEX IF NOT EXISTS idx_bills_ministry ON bills (ministry);
+CREATE INDEX IF NOT EXISTS idx_bills_status ON bills (status);
+CREATE INDEX IF NOT EXISTS idx_bills_year ON bills (year);
+
+CREATE TABLE IF NOT EXISTS events (
+    bill_key TEXT NOT NULL REFERENCES bills (bill_key),
+    event TEXT NOT NULL,
+    event_date TEXT,
+    PRIMARY KEY (bill_key, event)
+);
+
+-- Days from introduction to each later event, refreshed on every upsert;
+-- used to place bills in their model stage without re-reading events
+CREATE TABLE IF NOT EXISTS stage_index (
+    bill_key TEXT PRIMARY KEY REFERENCES bills (bill_key),
+    introduction_date TEXT,
+    days_to_referred_committee INTEGER,
+    days_to_passed_ls INTEGER,
+    days_to_passed_rs INTEGER,
+    days_to_assent INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS predictions (
+    bill_key TEXT NOT NULL REFERENCES bills (bill_key),
+    model_version TEXT NOT NULL,
+    probability REAL,
+    scored_at TEXT,
+    PRIMARY KEY (bill_key, model_version)
+);
+
+-- What each refresh changed (see changes.py); the latest change_id of a bill
+-- versions its cached dashboard entry
+CREATE TABLE IF NOT EXISTS changes (
+    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    detected_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    bill_key TEXT NOT NULL,
+    bill_id TEXT,
+    title TEXT,
+    change TEXT NOT NULL,
+    field TEXT,
+    old_value TEXT,
+    new_value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_changes_bill_id ON changes (source, bill_id);
+"""
+
+CHANGE_COLUMNS = ['detected_at', 'source', 'bill_key', 'bill_id', 'title', 'change', 'field', 'old_value', 'new_value']
+
+BILL_COLUMNS = ['bill_key', 'source', 'bill_id', 'title', 'short_title', 'ministry', 'type', 'status', 'house',
+                'introduction_date', 'year', 'is_amendment', 'is_appropriation', 'is_finance', 'url', 'updated_at']
+
+# Event name -> candidate source columns (processed Lok Sabha export, PRS scrape)
+EVENT_COLUMNS = {
+    'introduced': ['introduction_date'],
+    'referred_committee': ['Referred to Committee Date'],
+    'passed_ls': ['Debate/Date Passed in LS', 'passed_ls'],
+    'passed_rs': ['Debate/Date Passed in RS', 'passed_rs'],
+    'assent': ['Assent Date', 'assent_date'],
+}
+
+OFFSET_EVENTS = [event for event in EVENT_COLUMNS if event != 'introduced']
+OFFSET_COLUMNS = [f'days_to_{event}' for event in OFFSET_EVENTS]
+
+_local = threading.local()
+
+
+def connect(path=None):
+    """Open a read-write connection, creating the schema if needed"""
+    conn = sqlite3.connect(path or DB_FILE, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    if conn.execute('PRAGMA user_version').fetchone()[0] < KEY_VERSION:
+        _rekey(conn)
+    return conn
+
+
+def _rekey(conn):
+    """
+    Move a store written with older bill_keys onto make_bill_key. Rows that
+    now share a key (e.g. a bill stored again under a corrected title) keep
+    the first one in load order, as upsert_bills does.
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        # Another writer may have migrated while we waited for the lock
+        if conn.execute('PRAGMA user_version').fetchone()[0] < KEY_VERSION:
+            rows = conn.execute("SELECT bill_key, source, bill_id, year, url FROM bills ORDER BY rowid").fetchall()
+            renamed, dropped, seen = [], [], {}
+            for old, source, bill_id, year, url in rows:
+                new = make_bill_key(source, bill_id, pd.NA if year is None else year, url)
+                if new in seen:
+                    dropped.append((old,))
+                else:
+                    seen[new] = old
+                    if new != old:
+                        renamed.append((new, old))
+            for table in ['events', 'stage_index', 'predictions', 'bills']:
+                conn.executemany(f"DELETE FROM {table} WHERE bill_key = ?", dropped)
+                conn.executemany(f"UPDATE {table} SET bill_key = ? WHERE bill_key = ?", renamed)
+            conn.executemany("UPDATE changes SET bill_key = ? WHERE bill_key = ?", renamed)
+            conn.execute(f'PRAGMA user_version = {KEY_VERSION}')
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def read_connection(path=None):
+    """
+    Per-thread read-only connection, reused across calls on the same thread
+    (Streamlit serves each session from its own thread).
+    """
+    path = path or DB_FILE
+    pool = getattr(_local, 'connections', None)
+    if pool is None:
+        pool = _local.connections = {}
+    conn = pool.get(path)
+    if conn is None:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        pool[path] = conn
+    return conn
+
+
+def make_bill_key(source, bill_id, year, url=None):
+    """Stable key of a bill: its page URL when there is one (PRS), else its number within the year"""
+    raw = f"{source}|{url}" if isinstance(url, str) and url else f"{source}|{bill_id}|{year}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _parse_dates(values, column=None):
+    # Explicit per-column formats (see dates.py); '2025-08-11' stays ISO,
+    # '21/08/2025' / '11 Aug 2025' style values are day first.
+    return normalize_dates(values, column=column if column is not None else getattr(values, 'name', None))
+
+
+def _to_iso(values, column=None):
+    parsed = _parse_dates(values, column)
+    return parsed.dt.strftime('%Y-%m-%d').where(parsed.notna(), None)
+
+
+def event_offsets(df):
+    """Days from introduction to each later event (NaN if it has not happened)"""
+    no_dates = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    intro = _parse_dates(df['introduction_date']) if 'introduction_date' in df.columns else no_dates
+    out = pd.DataFrame(index=df.index)
+    for event in OFFSET_EVENTS:
+        column = next((c for c in EVENT_COLUMNS[event] if c in df.columns), None)
+        dates = _parse_dates(df[column]) if column else no_dates
+        out[f'days_to_{event}'] = (dates - intro).dt.days
+    return out
+
+
+def _column(df, name, default=None):
+    if name in df.columns:
+        return df[name].astype(object).where(df[name].notna(), default)
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def prepare_bills(df, source):
+    """Map a processed or scraped bills frame onto the bills table columns"""
+    out = pd.DataFrame(index=df.index)
+    out['source'] = source
+    out['bill_id'] = df['bill_id'].astype(str)
+    out['title'] = _column(df, 'title')
+    out['short_title'] = _column(df, 'short_title')
+    out['ministry'] = _column(df, 'ministry')
+    out['type'] = _column(df, 'type')
+    out['status'] = _column(df, 'status')
+    out['house'] = _column(df, 'house')
+    out['introduction_date'] = _to_iso(df['introduction_date']) if 'introduction_date' in df.columns else None
+    if 'year' in df.columns:
+        out['year'] = pd.to_numeric(df['year'], errors='coerce').astype('Int64')
+    else:
+        out['year'] = _parse_dates(out['introduction_date'], 'introduction_date').dt.year.astype('Int64')
+    for flag in ['is_amendment', 'is_appropriation', 'is_finance']:
+        out[flag] = pd.to_numeric(df[flag], errors='coerce').astype('Int64') if flag in df.columns else None
+    out['url'] = _column(df, 'url')
+    out['updated_at'] = datetime.now().isoformat(timespec='seconds')
+    out['bill_key'] = [make_bill_key(*row) for row in zip(out['source'], out['bill_id'], out['year'], out['url'])]
+    return out[BILL_COLUMNS]
+
+
+def prepare_events(df, bill_keys):
+    """Long-format (bill_key, event, event_date) rows for every known event date"""
+    frames = []
+    for event, candidates in EVENT_COLUMNS.items():
+        column = next((c for c in candidates if c in df.columns), None)
+        if column is None:
+            continue
+        dates = _to_iso(df[column])
+        frames.append(pd.DataFrame({'bill_key': bill_keys.to_numpy(), 'event': event, 'event_date': dates.to_numpy()}))
+    if not frames:
+        return pd.DataFrame(columns=['bill_key', 'event', 'event_date'])
+    events = pd.concat(frames, ignore_index=True)
+    return events[events['event_date'].notna()]
+
+
+def _records(df):
+    # sqlite3 only understands plain Python scalars and None
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def upsert_bills(df, source, path=None):
+    """Insert or update bills (and their events) from a processed/scraped frame"""
+    bills = prepare_bills(df, source)
+    # Duplicate rows for the same bill: keep the first, as CSV lookups did
+    bills = bills.drop_duplicates('bill_key', keep='first')
+    events = prepare_events(df.loc[bills.index], bills['bill_key'])
+    stages = pd.concat([bills[['bill_key', 'introduction_date']], event_offsets(df.loc[bills.index])], axis=1)
+    stages[OFFSET_COLUMNS] = stages[OFFSET_COLUMNS].astype('Int64')
+    stage_columns = ', '.join(stages.columns)
+    stage_updates = ', '.join(f"{c} = excluded.{c}" for c in stages.columns if c != 'bill_key')
+
+    columns = ', '.join(BILL_COLUMNS)
+    placeholders = ', '.join('?' for _ in BILL_COLUMNS)
+    updates = ', '.join(f"{c} = excluded.{c}" for c in BILL_COLUMNS if c != 'bill_key')
+
+    conn = connect(path)
+    try:
+        with conn:
+            conn.executemany(
+                f"INSERT INTO bills ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT (bill_key) DO UPDATE SET {updates}",
+                _records(bills)
+            )
+            conn.executemany(
+                "INSERT INTO events (bill_key, event, event_date) VALUES (?, ?, ?) "
+                "ON CONFLICT (bill_key, event) DO UPDATE SET event_date = excluded.event_date",
+                _records(events)
+            )
+            conn.executemany(
+                f"INSERT INTO stage_index ({stage_columns}) VALUES ({', '.join('?' for _ in stages.columns)}) "
+                f"ON CONFLICT (bill_key) DO UPDATE SET {stage_updates}",
+                _records(stages)
+            )
+    finally:
+        conn.close()
+    return len(bills)
+
+
+def upsert_predictions(rows, model_version, path=None):
+    """rows: iterable of (bill_key, probability)"""
+    scored_at = datetime.now().isoformat(timespec='seconds')
+    conn = connect(path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO predictions (bill_key, model_version, probability, scored_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (bill_key, model_version) DO UPDATE SET "
+                "probability = excluded.probability, scored_at = excluded.scored_at",
+                [(key, model_version, float(prob), scored_at) for key, prob in rows]
+            )
+    finally:
+        conn.close()
+
+
+def has_bills(source, path=None):
+    """Whether any bill of `source` is stored"""
+    if not os.path.exists(path or DB_FILE):
+        return False
+    conn = connect(path)
+    try:
+        return conn.execute("SELECT 1 FROM bills WHERE source = ? LIMIT 1", (source,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def stored_state(source, path=None, bill_keys=None):
+    """
+    Every stored bill of a source with its event dates as columns (one per
+    EVENT_COLUMNS event), keyed by bill_key. Empty if nothing is stored yet.
+    With `bill_keys`, only those bills are read (joined through a temporary
+    table), so a chunked refresh reads each stored bill once.
+    """
+    if not os.path.exists(path or DB_FILE):
+        return pd.DataFrame(columns=BILL_COLUMNS + list(EVENT_COLUMNS))
+    bills_sql = "SELECT b.* FROM bills b"
+    events_sql = "SELECT e.bill_key, e.event, e.event_date FROM events e JOIN bills b ON b.bill_key = e.bill_key"
+    conn = connect(path)
+    try:
+        if bill_keys is not None:
+            conn.execute("CREATE TEMP TABLE wanted_keys (bill_key TEXT PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO wanted_keys VALUES (?)", ((key,) for key in bill_keys))
+            bills_sql += " JOIN wanted_keys w ON w.bill_key = b.bill_key"
+            events_sql += " JOIN wanted_keys w ON w.bill_key = e.bill_key"
+        bills = pd.read_sql_query(bills_sql + " WHERE b.source = ? ORDER BY b.rowid", conn, params=[source])
+        events = pd.read_sql_query(events_sql + " WHERE b.source = ?", conn, params=[source])
+    finally:
+        conn.close()
+    events = events.pivot(index='bill_key', columns='event', values='event_date')
+    events = events.reindex(columns=list(EVENT_COLUMNS))
+    return bills.merge(events, left_on='bill_key', right_index=True, how='left')
+
+
+def insert_changes(changes, path=None):
+    """Append change records (a CHANGE_COLUMNS frame) to the change log; returns their change_ids"""
+    conn = connect(path)
+    try:
+        with conn:
+            last = conn.execute("SELECT COALESCE(MAX(change_id), 0) FROM changes").fetchone()[0]
+            conn.executemany(
+                f"INSERT INTO changes ({', '.join(CHANGE_COLUMNS)}) VALUES ({', '.join('?' for _ in CHANGE_COLUMNS)})",
+                _records(changes[CHANGE_COLUMNS])
+            )
+            rows = conn.execute("SELECT change_id FROM changes WHERE change_id > ? ORDER BY change_id",
+                                (last,)).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+def get_changes(since=0, limit=None, path=None):
+    """Change log entries with change_id > since, oldest first"""
+    sql = "SELECT * FROM changes WHERE change_id > ? ORDER BY change_id"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return pd.read_sql_query(sql, read_connection(path), params=[since])
+
+
+def bill_version(bill_id, source='lok_sabha', path=None):
+    """Latest change_id recorded for a bill_id (0 if it never changed)"""
+    try:
+        row = read_connection(path).execute(
+            "SELECT MAX(change_id) FROM changes WHERE source = ? AND bill_id = ?", (source, str(bill_id))
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # Store created before the change log existed
+        return 0
+    return row[0] or 0
+
+
+def get_bill(bill_id, source='lok_sabha', path=None):
+    """First bill with this public bill_id, as a dict (None if missing)"""
+    row = read_connection(path).execute(
+        "SELECT * FROM bills WHERE bill_id = ? AND source = ? ORDER BY rowid LIMIT 1",
+        (str(bill_id), source)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def get_events(bill_key, path=None):
+    """Known event dates for a bill, ordered by date"""
+    rows = read_connection(path).execute(
+        "SELECT event, event_date FROM events WHERE bill_key = ? ORDER BY event_date",
+        (bill_key,)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def query_bills(ministry=None, status=None, year=None, source='lok_sabha', path=None):
+    """Indexed filter over the bills table, returned as a DataFrame"""
+    clauses, params = ['source = ?'], [source]
+    for column, value in (('ministry', ministry), ('status', status), ('year', year)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    sql = f"SELECT * FROM bills WHERE {' AND '.join(clauses)} ORDER BY rowid"
+    return pd.read_sql_query(sql, read_connection(path), params=params)
+
+
+def _scoring_query(clauses, params, limit=None, join=''):
+    offsets = ', '.join(f"s.{c}" for c in OFFSET_COLUMNS)
+    sql = (f"SELECT b.*, {offsets} FROM bills b {join}LEFT JOIN stage_index s ON s.bill_key = b.bill_key "
+           f"WHERE {' AND '.join(clauses)} ORDER BY b.rowid")
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return sql, params
+
+
+def _read_wanted(sql, params, values, path=None):
+    """
+    Run `sql`, which joins the temporary table wanted (value), with `values`
+    loaded into it. Unlike IN (?, ?, ...) this stays within SQLite's limit
+    on bound variables for any number of values.
+    """
+    conn = read_connection(path)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (value TEXT PRIMARY KEY)")
+    try:
+        conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((value,) for value in values))
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        # Ends the read transaction and empties wanted for the next call on this thread
+        conn.rollback()
+
+
+def get_scoring_rows(bill_ids, source='lok_sabha', path=None):
+    """
+    Bills joined with their stage index for a list of bill_ids, in one
+    indexed query. Like get_bill, only the first row per bill_id is kept.
+    """
+    bill_ids = [str(b) for b in bill_ids]
+    if not bill_ids:
+        return pd.DataFrame()
+    sql, params = _scoring_query(['b.source = ?'], [source], join="JOIN wanted w ON w.value = b.bill_id ")
+    df = _read_wanted(sql, params, bill_ids, path)
+    return df.drop_duplicates('bill_id', keep='first').reset_index(drop=True)
+
+
+def get_scoring_rows_by_key(bill_keys, path=None):
+    """Bills joined with their stage index for a list of bill_keys"""
+    bill_keys = list(bill_keys)
+    if not bill_keys:
+        return pd.DataFrame()
+    sql, params = _scoring_query(['1 = 1'], [], join="JOIN wanted w ON w.value = b.bill_key ")
+    return _read_wanted(sql, params, bill_keys, path)
+
+
+def query_scoring_rows(ministry=None, status=None, year=None, limit=None, source='lok_sabha', path=None):
+    """Bills joined with their stage index for an indexed ministry/status/year filter"""
+    clauses, params = ['b.source = ?'], [source]
+    for column, value in (('ministry', ministry), ('status', status), ('year', year)):
+        if value is not None:
+            clauses.append(f"b.{column} = ?")
+            params.append(value)
+    sql, params = _scoring_query(clauses, params, limit)
+    return pd.read_sql_query(sql, read_connection(path), params=params)
+
+
+def distinct_values(column, source='lok_sabha', path=None):
+    """Sorted distinct values of an indexed column (ministry, status, year)"""
+    if column not in ('ministry', 'status', 'year'):
+        raise ValueError(f"Not an indexed column: {column}")
+    rows = read_connection(path).execute(
+        f"SELECT DISTINCT {column} FROM bills WHERE source = ? AND {column} IS NOT NULL ORDER BY {column}",
+        (source,)
+    ).fetchall()
+    return [row[0] for row in rows]
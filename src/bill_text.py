@@ -0,0 +1,337 @@
+"""
+Bill document text: ingestion, a memory-mapped text store and text features.
+
+PRS bill pages link to the bill text and a summary (scraper.py records them
+as text_url / summary_url). ingest_documents downloads the documents that
+are not in the store yet on a thread pool, extracts their text in a process
+pool (PDF parsing is CPU bound) and appends it to the store:
+
+    data/bill_text/texts.bin   UTF-8 text of every document, back to back
+    data/bill_text/index.csv   title_key, kind, url, offset, length, sha256, fetched_at
+
+Documents are keyed by title_key, the normalized bill title. Scraper ids
+(bill_id in the PRS data) mean nothing in the Lok Sabha lists the models are
+trained on, while titles carry the year ("The Boilers Bill, 2024") and match
+across both sources. The store is append-only: text bytes are written (and
+flushed) before their index rows, and the last index row per (title_key,
+kind) wins. TextStore
+memory-maps texts.bin, so a lookup or a feature run reads only the slices it
+needs and a training run never re-reads the PDFs.
+
+text_features computes per-bill length, word, section and chapter counts and
+keyword-group densities (per 1,000 words) with vectorized string counts over
+batches of documents:
+
+    python src/bill_text.py ingest [--links data/indian_bills.csv]
+    python src/bill_text.py features [--output data/bill_text/features.csv]
+
+Links may be http(s) URLs or local paths (benchmarks/fixtures/documents has
+sample documents). PDFs need the optional pypdf package.
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import urljoin
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = 'data/bill_text'
+FEATURES_PATH = os.path.join(STORE_DIR, 'features.csv')
+LINKS_PATH = 'data/indian_bills.csv'
+INDEX_COLUMNS = ['title_key', 'kind', 'url', 'offset', 'length', 'sha256', 'fetched_at']
+KINDS = {'text': 'text_url', 'summary': 'summary_url'}
+FETCH_WORKERS = 8
+EXTRACT_WORKERS = None
+BATCH_SIZE = 500
+
+# Keyword groups (word prefixes) whose density is a feature
+KEYWORD_GROUPS = {
+    'penalty': ['penalt', 'imprison', 'fine', 'offence', 'punish'],
+    'finance': ['tax', 'duty', 'cess', 'fund', 'crore', 'appropriat'],
+    'amendment': ['amend', 'substitut', 'omit', 'insert'],
+    'regulatory': ['authority', 'board', 'commission', 'regulat', 'licen'],
+    'rights': ['right', 'citizen', 'protect', 'welfare', 'equal'],
+}
+# "12. " / "12A. " at the start of a line opens a section; "CHAPTER" headings open chapters
+SECTION_PATTERN = r'(?m)^\s*\d+[A-Z]?\.\s'
+CHAPTER_PATTERN = r'(?m)^\s*CHAPTER\b'
+FEATURE_COLUMNS = (['text_chars', 'text_words', 'text_sections', 'text_chapters']
+                   + [f'text_{group}_density' for group in KEYWORD_GROUPS] + ['summary_words'])
+_stored = {}
+
+
+def title_key(titles):
+    """Normalized titles (lower case, runs of other characters as one space), the document key"""
+    titles = pd.Series(titles, dtype=object)
+    keys = titles.astype(str).str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+    return keys.where(titles.notna() & (keys != ''), None)
+
+
+def document_links(soup, base_url):
+    """{'text_url': ..., 'summary_url': ...} for the document links on a PRS bill page"""
+    links = {}
+    for a in soup.find_all('a', href=True):
+        href, label = a['href'], a.get_text(strip=True).lower()
+        if not (href.lower().endswith('.pdf') or 'bill text' in label or 'summary' in label):
+            continue
+        column = 'summary_url' if 'summary' in label or 'summary' in href.lower() else 'text_url'
+        links.setdefault(column, urljoin(base_url, href))
+    return links
+
+
+def read_document(url):
+    """Raw bytes of a document URL or local path, or None if it cannot be read"""
+    try:
+        if url.startswith(('http://', 'https://')):
+            import requests
+            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=60)
+            return response.content if response.status_code == 200 else None
+        with open(url[len('file://'):] if url.startswith('file://') else url, 'rb') as f:
+            return f.read()
+    except Exception as e:
+        print(f"Error reading {url}: {e}")
+        return None
+
+
+def extract_text(content, url=''):
+    """Plain text of a PDF, HTML or text document; lines are kept, runs of spaces collapsed"""
+    if content[:5] == b'%PDF-':
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise RuntimeError("pypdf is required to extract text from PDF documents (pip install pypdf)")
+        import io
+        text = '\n'.join(page.extract_text() or '' for page in PdfReader(io.BytesIO(content)).pages)
+    elif url.lower().endswith(('.html', '.htm')) or content.lstrip()[:1] == b'<':
+        from bs4 import BeautifulSoup
+        text = BeautifulSoup(content, 'html.parser').get_text('\n')
+    else:
+        text = content.decode('utf-8', errors='replace')
+    text = re.sub(r'[ \t\r\f\v]+', ' ', text)
+    return re.sub(r'\n\s*\n+', '\n', text).strip()
+
+
+def extract_safe(key, url, content):
+    """Extraction pool task: (key, url, text or None)"""
+    try:
+        return key, url, extract_text(content, url)
+    except Exception as e:
+        print(f"Error extracting {url}: {e}")
+        return key, url, None
+
+
+class TextStore:
+    """Append-only text store: texts.bin memory-mapped, index.csv keyed by (title_key, kind)"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.data_path = os.path.join(root, 'texts.bin')
+        self.index_path = os.path.join(root, 'index.csv')
+        self._mmap = None
+        self.reload()
+
+    def reload(self):
+        """Re-read the index and re-map the text file (after an append)"""
+        self.close()
+        if os.path.exists(self.index_path):
+            index = pd.read_csv(self.index_path, dtype={'title_key': str})
+            index = index.drop_duplicates(['title_key', 'kind'], keep='last')
+        else:
+            index = pd.DataFrame(columns=INDEX_COLUMNS)
+        self.index = index.set_index(['title_key', 'kind'], drop=False).sort_index()
+        if os.path.exists(self.data_path) and os.path.getsize(self.data_path):
+            with open(self.data_path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def urls(self):
+        return set(self.index['url'])
+
+    def _read(self, offset, length):
+        return self._mmap[int(offset):int(offset) + int(length)].decode('utf-8')
+
+    def get(self, title, kind='text'):
+        """Text of one bill document (looked up by title), or None"""
+        key = (title_key([title])[0], kind)
+        if key not in self.index.index:
+            return None
+        row = self.index.loc[key]
+        return self._read(row['offset'], row['length'])
+
+    def texts(self, rows):
+        """Texts of index rows (a slice of self.index), in order"""
+        return [self._read(offset, length) for offset, length in zip(rows['offset'], rows['length'])]
+
+    def append(self, documents):
+        """Append (title_key, kind, url, text) documents. Returns the number written."""
+        if not documents:
+            return 0
+        os.makedirs(self.root, exist_ok=True)
+        rows = []
+        fetched_at = datetime.now().isoformat(timespec='seconds')
+        with open(self.data_path, 'ab') as f:
+            offset = f.tell()
+            for key, kind, url, text in documents:
+                data = text.encode('utf-8')
+                f.write(data)
+                rows.append((key, kind, url, offset, len(data), hashlib.sha256(data).hexdigest()[:16],
+                             fetched_at))
+                offset += len(data)
+            # Text first, index second: a crash can only leave unreferenced bytes
+            f.flush()
+            os.fsync(f.fileno())
+        rows = pd.DataFrame(rows, columns=INDEX_COLUMNS)
+        rows.to_csv(self.index_path, mode='a', header=not os.path.exists(self.index_path), index=False)
+        self.reload()
+        return len(rows)
+
+
+def pending_documents(links, store):
+    """(title_key, kind, url) for every linked document whose URL is not in the store yet"""
+    known = store.urls()
+    keys = title_key(links['title']).set_axis(links.index)
+    pending = []
+    for kind, column in KINDS.items():
+        if column not in links.columns:
+            continue
+        rows = links[links[column].notna() & ~links[column].isin(known) & keys.notna()]
+        pending += [(k, kind, url) for k, url in zip(keys[rows.index], rows[column])]
+    return pending
+
+
+def ingest_documents(links, root=STORE_DIR, fetch_workers=FETCH_WORKERS, extract_workers=EXTRACT_WORKERS):
+    """
+    Download and extract the documents linked from `links` (title plus
+    text_url / summary_url columns) that the store does not have yet.
+    Returns the number of documents added.
+    """
+    store = TextStore(root)
+    pending = pending_documents(links, store)
+    if not pending:
+        print(f"No new documents ({len(store)} in {root})")
+        return 0
+    print(f"Fetching {len(pending)} documents ({fetch_workers} fetch threads, "
+          f"{extract_workers or os.cpu_count()} extract processes)...")
+
+    documents, failed = [], 0
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetchers, \
+            ProcessPoolExecutor(max_workers=extract_workers) as extractors:
+        extracting = []
+        for (key, kind, url), content in zip(pending, fetchers.map(lambda p: read_document(p[2]), pending)):
+            if content is None:
+                failed += 1
+                continue
+            extracting.append(extractors.submit(extract_safe, (key, kind), url, content))
+        for future in extracting:
+            (key, kind), url, text = future.result()
+            if text is None:
+                failed += 1
+                continue
+            documents.append((key, kind, url, text))
+
+    added = store.append(documents)
+    store.close()
+    print(f"Added {added} documents to {root}" + (f"; {failed} could not be read" if failed else ''))
+    return added
+
+
+def _keyword_pattern(prefixes):
+    return r'\b(?:' + '|'.join(map(re.escape, prefixes)) + r')\w*'
+
+
+def text_features(root=STORE_DIR, batch_size=BATCH_SIZE):
+    """One row of text features per title_key with a stored bill text or summary"""
+    store = TextStore(root)
+    index = store.index.reset_index(drop=True)
+    frames = []
+    for kind in KINDS:
+        rows = index[index['kind'] == kind]
+        for start in range(0, len(rows), batch_size):
+            batch = rows.iloc[start:start + batch_size]
+            texts = pd.Series(store.texts(batch), index=batch['title_key'].to_numpy())
+            words = texts.str.count(r'\b\w+\b')
+            if kind == 'summary':
+                frames.append(pd.DataFrame({'summary_words': words}))
+                continue
+            per_thousand = 1000 / np.maximum(words.to_numpy(), 1)
+            features = pd.DataFrame({
+                # Byte length straight from the index, no need to decode
+                'text_chars': batch['length'].to_numpy(),
+                'text_words': words,
+                'text_sections': texts.str.count(SECTION_PATTERN),
+                'text_chapters': texts.str.count(CHAPTER_PATTERN),
+            }, index=texts.index)
+            lowered = texts.str.lower()
+            for group, prefixes in KEYWORD_GROUPS.items():
+                features[f'text_{group}_density'] = lowered.str.count(_keyword_pattern(prefixes)) * per_thousand
+            frames.append(features)
+    store.close()
+    if not frames:
+        return pd.DataFrame(columns=['title_key'] + FEATURE_COLUMNS)
+    features = pd.concat(frames).groupby(level=0).first()
+    features = features.reindex(columns=FEATURE_COLUMNS).fillna(0)
+    counts = [column for column in FEATURE_COLUMNS if not column.endswith('_density')]
+    features[counts] = features[counts].astype(int)
+    return features.rename_axis('title_key').reset_index()
+
+
+def join_text_features(df, features):
+    """df with the text feature columns added by title (0 for bills without documents)"""
+    features = features.drop_duplicates('title_key', keep='last')
+    out = df.assign(_title_key=title_key(df['title']).to_numpy()).merge(
+        features.rename(columns={'title_key': '_title_key'}), on='_title_key', how='left')
+    out[FEATURE_COLUMNS] = out[FEATURE_COLUMNS].fillna(0)
+    return out.drop(columns='_title_key').set_axis(df.index)
+
+
+def stored_features(path=FEATURES_PATH):
+    """The features written by `bill_text.py features`, re-read only when the file changes"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=['title_key'] + FEATURE_COLUMNS)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _stored:
+        _stored.clear()
+        _stored[key] = pd.read_csv(path, dtype={'title_key': str})
+    return _stored[key]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Bill document text store and text features')
+    parser.add_argument('--root', default=STORE_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='fetch and extract linked documents not stored yet')
+    ingest.add_argument('--links', default=LINKS_PATH, help='CSV with title, text_url and summary_url columns')
+    ingest.add_argument('--fetch-workers', type=int, default=FETCH_WORKERS)
+    ingest.add_argument('--extract-workers', type=int, default=EXTRACT_WORKERS)
+    build = commands.add_parser('features', help='compute text features for every stored bill')
+    build.add_argument('--output', default=FEATURES_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == 'ingest':
+        ingest_documents(pd.read_csv(args.links), args.root, args.fetch_workers,
+                         args.extract_workers)
+    else:
+        features = text_features(args.root)
+        features.to_csv(args.output, index=False)
+        print(f"Saved text features for {len(features)} bills to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
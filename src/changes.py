@@ -0,0 +1,222 @@
+"""
+Change detection between dataset refreshes.
+
+Before a refresh is written to the bill store, detect_changes compares it
+with what is stored: each side is reduced to one 64-bit hash per bill over
+the tracked fields and event dates (pd.util.hash_pandas_object), the two are
+joined on the stable bill_key, and only bills whose hash differs are
+compared field by field. Every difference becomes one compact record:
+
+    {"change": "event", "field": "passed_ls", "old_value": null, "new_value": "2025-08-11", ...}
+
+with change one of added / status / event / updated. publish_changes appends
+the records to the bill store's changes table, pushes them to the configured
+sinks and re-scores only the changed bills. The dashboard's cache key for a
+bill includes its latest change_id (bill_store.bill_version), so a refresh
+only invalidates the bills it changed.
+
+Sinks are chosen with BILL_TRACKER_CHANGE_SINKS, a comma separated list of
+stdout, file:<path.jsonl> and webhook:<url> (default: file:data/changes.jsonl).
+Other sinks can be added to SINKS: a class taking the text after the colon
+and exposing send(records).
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import bill_store
+from bill_store import CHANGE_COLUMNS, EVENT_COLUMNS
+
+# bill_key is the URL or source|bill_id|year, so a corrected title (or a PRS bill's year) is an update
+TRACKED_FIELDS = ['title', 'short_title', 'ministry', 'type', 'status', 'house', 'introduction_date', 'year',
+                  'is_amendment', 'is_appropriation', 'is_finance']
+EVENT_FIELDS = [event for event in EVENT_COLUMNS if event != 'introduced']
+FIELDS = TRACKED_FIELDS + EVENT_FIELDS
+CHANGES_FILE = 'data/changes.jsonl'
+DEFAULT_SINKS = f'file:{CHANGES_FILE}'
+INTEGER_FIELDS = ['year', 'is_amendment', 'is_appropriation', 'is_finance']
+
+
+def _normalize(frame):
+    """Tracked fields as strings ('' when missing) so stored and fresh rows hash alike"""
+    out = pd.DataFrame(index=frame.index)
+    for field in FIELDS:
+        values = frame[field] if field in frame.columns else pd.Series(None, index=frame.index, dtype=object)
+        if field in INTEGER_FIELDS:
+            values = pd.to_numeric(values, errors='coerce').astype('Int64')
+        out[field] = values.astype('string').fillna('')
+    return out
+
+
+def bill_state(df, source):
+    """A processed/scraped frame in the stored layout: bills columns plus one column per event date"""
+    # Same bill twice in one frame: the first row wins, as in bill_store.upsert_bills
+    bills = bill_store.prepare_bills(df, source).drop_duplicates('bill_key', keep='first')
+    events = bill_store.prepare_events(df.loc[bills.index], bills['bill_key'])
+    events = events.pivot(index='bill_key', columns='event', values='event_date')
+    bills = bills.merge(events.reindex(columns=list(EVENT_COLUMNS)), left_on='bill_key', right_index=True, how='left')
+    return bills.reset_index(drop=True)
+
+
+def detect_changes(previous, current, source, detected_at=None):
+    """
+    Change records (CHANGE_COLUMNS) turning `previous` into `current`, both
+    in the bill_state layout. Bills missing from `current` are not reported:
+    chunked and incremental refreshes only carry part of the data.
+    """
+    detected_at = (detected_at or datetime.now()).isoformat(timespec='seconds')
+    old, new = _normalize(previous), _normalize(current)
+    old_hash = pd.util.hash_pandas_object(old, index=False).to_numpy()
+    new_hash = pd.util.hash_pandas_object(new, index=False).to_numpy()
+
+    position = pd.Index(previous['bill_key']).get_indexer(current['bill_key'])
+    added = np.flatnonzero(position < 0)
+    seen = np.flatnonzero(position >= 0)
+    changed = seen[new_hash[seen] != old_hash[position[seen]]]
+
+    # Field-by-field comparison, only for the bills whose hash differs
+    old_values = old.to_numpy(dtype=object)[position[changed]]
+    new_values = new.to_numpy(dtype=object)[changed]
+    rows, cols = np.nonzero(old_values != new_values)
+    fields = np.array(FIELDS, dtype=object)[cols]
+    before, after = old_values[rows, cols], new_values[rows, cols]
+    kinds = np.where(fields == 'status', 'status', np.where(np.isin(fields, EVENT_FIELDS) & (before == ''),
+                                                             'event', 'updated'))
+
+    updates = pd.DataFrame({'row': changed[rows], 'change': kinds, 'field': fields,
+                            'old_value': before, 'new_value': after})
+    additions = pd.DataFrame({'row': added, 'change': 'added', 'field': 'status', 'old_value': '',
+                              'new_value': new['status'].to_numpy()[added]})
+    records = pd.concat([additions, updates], ignore_index=True).sort_values('row', kind='stable')
+    bills = current.iloc[records['row'].to_numpy()]
+    records = records.assign(detected_at=detected_at, source=source, bill_key=bills['bill_key'].to_numpy(),
+                             bill_id=bills['bill_id'].to_numpy(), title=bills['title'].to_numpy())
+    for column in ['old_value', 'new_value']:
+        records[column] = records[column].astype(object).where(records[column] != '', None)
+    return records[CHANGE_COLUMNS].reset_index(drop=True)
+
+
+def detect_refresh(df, source, path=None):
+    """
+    Changes a refresh (or one chunk of it) would make to the bill store;
+    empty on the first load (nothing to compare with). Only the stored rows
+    of the bills in `df` are read.
+    """
+    if not bill_store.has_bills(source, path):
+        print("No stored bills yet; this refresh is the baseline for change detection")
+        return pd.DataFrame(columns=CHANGE_COLUMNS)
+    current = bill_state(df, source)
+    previous = bill_store.stored_state(source, path, bill_keys=current['bill_key'])
+    return detect_changes(previous, current, source)
+
+
+class StdoutSink:
+    def __init__(self, target=None):
+        pass
+
+    def send(self, records):
+        for r in records:
+            print(f"[{r['change']}] {r['bill_id']} {r['title']}: {r['field']} "
+                  f"{r['old_value'] or '-'} -> {r['new_value'] or '-'}")
+
+
+class FileSink:
+    """Appends one JSON line per change"""
+
+    def __init__(self, target=None):
+        self.path = target or CHANGES_FILE
+
+    def send(self, records):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a') as f:
+            for r in records:
+                f.write(json.dumps(r, default=str) + '\n')
+
+
+class WebhookSink:
+    """POSTs {"changes": [...]} to a (local) URL"""
+
+    def __init__(self, target, timeout=10):
+        self.url = target
+        self.timeout = timeout
+
+    def send(self, records):
+        import requests
+        response = requests.post(self.url, json={'changes': records}, timeout=self.timeout)
+        response.raise_for_status()
+
+
+SINKS = {'stdout': StdoutSink, 'file': FileSink, 'webhook': WebhookSink}
+
+
+def configured_sinks(spec=None):
+    """Sinks named in `spec` or BILL_TRACKER_CHANGE_SINKS ('stdout,file:path,webhook:url')"""
+    spec = spec if spec is not None else os.environ.get('BILL_TRACKER_CHANGE_SINKS', DEFAULT_SINKS)
+    sinks = []
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, target = entry.partition(':')
+        if name not in SINKS:
+            print(f"Unknown change sink '{name}' (expected one of {', '.join(SINKS)})")
+            continue
+        sinks.append(SINKS[name](target or None))
+    return sinks
+
+
+def rescore(bill_keys, path=None):
+    """Re-predict the given bills and store the scores under the served model version"""
+    import model_registry
+    from predict import predict_frame
+
+    frame = bill_store.get_scoring_rows_by_key(bill_keys, path=path)
+    if frame.empty:
+        return 0
+    result = predict_frame(frame)
+    version = model_registry.current_version() or 'local'
+    bill_store.upsert_predictions(zip(frame['bill_key'], result['probability']), version, path=path)
+    return len(frame)
+
+
+def publish_changes(changes, path=None, sinks=None, rescore_changed=True):
+    """Log changes to the bill store, push them to every sink and re-score the changed bills"""
+    if changes.empty:
+        print("No bill changes detected")
+        return changes
+    changes = changes.assign(change_id=bill_store.insert_changes(changes, path))
+    records = changes.astype(object).where(changes.notna(), None).to_dict('records')
+    for sink in configured_sinks() if sinks is None else sinks:
+        try:
+            sink.send(records)
+        except Exception as e:
+            print(f"Change sink {type(sink).__name__} failed: {e}")
+
+    counts = changes['change'].value_counts()
+    print(f"Detected {len(changes)} changes to {changes['bill_key'].nunique()} bills "
+          f"({', '.join(f'{n} {kind}' for kind, n in counts.items())})")
+    if rescore_changed:
+        try:
+            print(f"Re-scored {rescore(changes['bill_key'].unique(), path)} changed bills")
+        except Exception as e:
+            print(f"Could not re-score changed bills: {e}")
+    return changes
+
+
+def main(argv):
+    """Print the change log: python src/changes.py [since_change_id]"""
+    since = int(argv[0]) if argv else 0
+    log = bill_store.get_changes(since)
+    if log.empty:
+        print("No changes recorded")
+        return 0
+    StdoutSink().send(log.astype(object).where(log.notna(), None).to_dict('records'))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,110 @@
+"""
+Chunked reading and partitioned writing for bill archives too large for memory.
+
+iter_chunks streams a source (Excel export, CSV or a partitioned directory)
+as DataFrames of at most `chunksize` rows, and PartitionedWriter appends
+processed chunks to one CSV per partition:
+
+    data/bills_partitioned/year=2024/house=Lok Sabha/part.csv
+
+Only one chunk is held at a time, so peak memory depends on the chunk size
+rather than on the size of the archive.
+"""
+
+import glob
+import os
+import re
+
+import pandas as pd
+
+CHUNK_SIZE = 50_000
+PARTITION_COLUMNS = ['year', 'house']
+PART_FILE = 'part.csv'
+
+
+def iter_excel_chunks(path, chunksize=CHUNK_SIZE):
+    """Stream the first sheet of an .xlsx file (openpyxl read-only mode)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunksize:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def partition_files(root):
+    return sorted(glob.glob(os.path.join(root, '**', PART_FILE), recursive=True))
+
+
+def _rebatch(frames, chunksize):
+    """Combine small frames (e.g. one per partition) into chunks of up to `chunksize` rows"""
+    pending, size = [], 0
+    for frame in frames:
+        pending.append(frame)
+        size += len(frame)
+        if size >= chunksize:
+            combined = pd.concat(pending, ignore_index=True)
+            for start in range(0, len(combined) - chunksize + 1, chunksize):
+                yield combined.iloc[start:start + chunksize]
+            rest = combined.iloc[len(combined) - len(combined) % chunksize:]
+            pending, size = [rest], len(rest)
+    if size:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def iter_chunks(path, chunksize=CHUNK_SIZE):
+    """Yield DataFrames of at most `chunksize` rows from an .xlsx, a CSV or a partitioned directory"""
+    if os.path.isdir(path):
+        parts = (frame for part in partition_files(path) for frame in pd.read_csv(part, chunksize=chunksize))
+        yield from _rebatch(parts, chunksize)
+    elif path.lower().endswith(('.xlsx', '.xlsm')):
+        yield from iter_excel_chunks(path, chunksize)
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def _partition_value(value):
+    if pd.isna(value):
+        return 'unknown'
+    return re.sub(r'[\\/:*?"<>|]+', '_', str(value)).strip() or 'unknown'
+
+
+class PartitionedWriter:
+    """Appends chunks to <root>/<column>=<value>/.../part.csv, one file per partition"""
+
+    def __init__(self, root, partition_columns=PARTITION_COLUMNS):
+        self.root = root
+        self.partition_columns = partition_columns
+        self.rows = 0
+        self.files = set()
+        # A rerun replaces the previous output instead of appending to it
+        for part in partition_files(root):
+            os.remove(part)
+
+    def _path(self, columns, keys):
+        parts = [f"{column}={_partition_value(key)}" for column, key in zip(columns, keys)]
+        directory = os.path.join(self.root, *parts)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, PART_FILE)
+
+    def write(self, df):
+        columns = [column for column in self.partition_columns if column in df.columns]
+        groups = df.groupby(columns, dropna=False, sort=False) if columns else [((), df)]
+        for keys, group in groups:
+            keys = keys if isinstance(keys, tuple) else (keys,)
+            path = self._path(columns, keys)
+            group.to_csv(path, mode='a', header=path not in self.files, index=False)
+            self.files.add(path)
+        self.rows += len(df)
@@ -0,0 +1,182 @@
+"""
+Multi-bill comparison view for the dashboard.
+
+Bills are selected by a list of ids or by a ministry / status / year
+filter, fetched through one lookup, scored in one batched prediction call
+and shown as a sortable table plus side-by-side timelines.
+"""
+
+import streamlit as st
+
+import tracing
+import warmup
+
+MAX_COMPARE = 200
+
+# Timeline events: label -> offset column (None = the introduction itself)
+TIMELINE_EVENTS = {
+    'Introduced': None,
+    'Referred to Committee': 'days_to_referred_committee',
+    'Passed Lok Sabha': 'days_to_passed_ls',
+    'Passed Rajya Sabha': 'days_to_passed_rs',
+    'Presidential Assent': 'days_to_assent',
+}
+# What-if event overrides (scenarios.EVENT_FEATURES) and their labels
+WHAT_IF_EVENTS = {
+    'referred_committee': 'Referred to Committee',
+    'passed_ls': 'Passed Lok Sabha',
+    'passed_rs': 'Passed Rajya Sabha',
+}
+
+
+def parse_bill_ids(text):
+    """'127, 128 130' -> ['127', '128', '130'] (order kept, duplicates dropped)"""
+    ids = [part.strip() for part in text.replace(',', ' ').split()]
+    return list(dict.fromkeys(part for part in ids if part))
+
+
+def timeline_frame(frame):
+    """Long (bill, event, date) frame built from the introduction date and event offsets"""
+    import pandas as pd
+
+    intro = pd.to_datetime(frame['introduction_date'], errors='coerce')
+    parts = []
+    for label, column in TIMELINE_EVENTS.items():
+        if column is None:
+            dates = intro
+        elif column in frame.columns:
+            dates = intro + pd.to_timedelta(pd.to_numeric(frame[column], errors='coerce'), unit='D')
+        else:
+            continue
+        parts.append(pd.DataFrame({'Bill': frame['label'], 'Event': label, 'Date': dates}))
+    events = pd.concat(parts, ignore_index=True)
+    return events.dropna(subset=['Date'])
+
+
+def render_timelines(frame):
+    go = warmup.get('plotly')
+    events = timeline_frame(frame)
+    fig = go.Figure()
+    for bill, group in events.sort_values('Date').groupby('Bill', sort=False):
+        fig.add_trace(go.Scatter(
+            x=group['Date'], y=[bill] * len(group), mode='lines+markers',
+            text=group['Event'], hovertemplate='%{text}<br>%{x|%d %b %Y}<extra></extra>',
+            showlegend=False
+        ))
+    fig.update_layout(height=max(250, 40 * frame['label'].nunique()), margin=dict(l=20, r=20, t=30, b=20),
+                      yaxis=dict(autorange='reversed'))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def render():
+    data_fetch = warmup.get('data')
+    import predict
+
+    st.subheader("⚖️ Compare Bills")
+    by = st.radio("Select bills by", ["Bill IDs", "Filter"], horizontal=True)
+
+    if by == "Bill IDs":
+        text = st.text_input("Bill IDs", placeholder="e.g., 127, 128, 130")
+        bill_ids = parse_bill_ids(text)[:MAX_COMPARE]
+        if not bill_ids:
+            return
+        with tracing.span('compare.fetch'):
+            frame = data_fetch.fetch_scoring_frame(bill_ids)
+        if not frame.empty:
+            # Keep the order the ids were entered in
+            order = {bill_id: i for i, bill_id in enumerate(bill_ids)}
+            frame = frame.sort_values('bill_id', key=lambda ids: ids.astype(str).map(order)).reset_index(drop=True)
+            missing = [b for b in bill_ids if b not in set(frame['bill_id'].astype(str))]
+            if missing:
+                st.warning(f"Not found: {', '.join(missing)}")
+    else:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            ministry = st.selectbox("Ministry", ["Any"] + data_fetch.list_filter_values('ministry'))
+        with col2:
+            status = st.selectbox("Status", ["Any"] + data_fetch.list_filter_values('status'))
+        with col3:
+            year = st.selectbox("Year", ["Any"] + data_fetch.list_filter_values('year'))
+        if ministry == status == year == "Any":
+            st.info("Choose at least one filter.")
+            return
+        with tracing.span('compare.fetch'):
+            frame = data_fetch.query_scoring_frame(
+                ministry=None if ministry == "Any" else ministry,
+                status=None if status == "Any" else status,
+                year=None if year == "Any" else int(year),
+                limit=MAX_COMPARE
+            )
+        if len(frame) == MAX_COMPARE:
+            st.caption(f"Showing the first {MAX_COMPARE} matching bills.")
+
+    if frame.empty:
+        st.error("No matching bills found.")
+        return
+
+    with tracing.span('compare.predict'):
+        scores = predict.predict_frame(frame)
+
+    frame = frame.assign(
+        label=frame['bill_id'].astype(str) + ' · ' + frame['title'].astype(str).str.split(',').str[0].str.slice(0, 60)
+    )
+    table = frame[['bill_id', 'title', 'ministry', 'status', 'year']].copy()
+    table['introduced'] = frame['introduction_date'].astype(str).str.slice(0, 10)
+    table['passage_probability'] = (scores['probability'] * 100).round(1)
+    if scores['stage'].notna().any():
+        table['model_stage'] = scores['stage'].str.replace('_', ' ').str.title()
+
+    st.dataframe(
+        table.sort_values('passage_probability', ascending=False),
+        use_container_width=True, hide_index=True,
+        column_config={'passage_probability': st.column_config.ProgressColumn(
+            "Passage Probability (%)", min_value=0, max_value=100, format="%.1f")}
+    )
+
+    st.subheader("📅 Timelines")
+    with tracing.span('compare.render_timelines'):
+        render_timelines(frame)
+
+    render_what_if(frame, data_fetch)
+
+
+def scenario_label(row, features):
+    """'Home Affairs · Referred to Committee: yes' for one scenario row"""
+    parts = []
+    for feature in features:
+        value = row[feature]
+        if value is None or value != value:
+            continue
+        parts.append(f"{WHAT_IF_EVENTS[feature]}: {'yes' if value else 'no'}" if feature in WHAT_IF_EVENTS else value)
+    return ' · '.join(parts) or 'As is'
+
+
+def render_what_if(frame, data_fetch):
+    """Re-score the compared bills under ministry / event overrides and chart the result"""
+    with st.expander("🔀 What if..."):
+        col1, col2 = st.columns(2)
+        with col1:
+            ministries = st.multiselect("Introduced by", data_fetch.list_filter_values('ministry'))
+        with col2:
+            events = st.multiselect("Compare with and without", list(WHAT_IF_EVENTS),
+                                    format_func=WHAT_IF_EVENTS.get)
+        if not ministries and not events:
+            st.caption("Pick ministries and/or events to re-score these bills under each combination.")
+            return
+
+        from scenarios import scenario_grid, run_scenarios, scenario_summary
+        values = {'ministry': [None] + ministries} if ministries else {}
+        values.update({event: [True, False] for event in events})
+        with tracing.span('compare.what_if'):
+            result = run_scenarios(frame, scenario_grid(values))
+        summary = scenario_summary(result)
+        summary['label'] = summary.apply(scenario_label, axis=1, features=list(values))
+        result = result.merge(summary[['scenario', 'label']], on='scenario')
+
+        go = warmup.get('plotly')
+        fig = go.Figure(go.Bar(x=summary['label'], y=summary['mean_probability'] * 100,
+                               hovertemplate='%{x}<br>%{y:.1f}%<extra></extra>'))
+        fig.update_layout(height=300, margin=dict(l=20, r=20, t=30, b=20), yaxis_title="Mean passage probability (%)")
+        st.plotly_chart(fig, use_container_width=True)
+        table = result.pivot_table(index='bill_id', columns='label', values='probability', sort=False) * 100
+        st.dataframe(table.round(1), use_container_width=True)
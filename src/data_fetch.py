@@ -3,8 +3,15 @@ import numpy as np
 import os
 from datetime import datetime
 
+import tracing
+import bill_store
+from dates import normalize_dates
+from records import BillRecord, ActionList
+
 # Path to the local CSV file
 DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'bills_processed.csv')
+# SQLite bill store; preferred over the CSV when it has been built
+DB_FILE = bill_store.DB_FILE
 
 def load_indian_bills():
     """
@@ -12,31 +19,119 @@ def load_indian_bills():
     """
     if not os.path.exists(DATA_FILE):
         return pd.DataFrame()
-    df = pd.read_csv(DATA_FILE)
-    # Parse dates
-    date_cols = ['introduction_date']
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
+    with tracing.span('data_fetch.load_csv'):
+        df = pd.read_csv(DATA_FILE)
+        # Parse dates
+        date_cols = ['introduction_date']
+        for col in date_cols:
+            if col in df.columns:
+                df[col] = normalize_dates(df[col], source='csv', column=col)
     return df
 
-def fetch_bill(bill_id, congress=None, bill_type=None):
+def dataset_version():
+    """
+    Changes whenever the bill store (or, without one, the CSV) is rewritten.
+    Used as a cache key by the dashboard.
     """
-    Simulate fetching bill details by looking up the CSV
+    paths = [DB_FILE, DB_FILE + '-wal'] if os.path.exists(DB_FILE) else [DATA_FILE]
+    stamps = []
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            stamps.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+    return '/'.join(stamps) or 'none'
+
+def bill_version(bill_id):
+    """
+    Changes whenever this bill changes: its latest change_id in the bill store
+    (see changes.py), so a refresh only invalidates the bills it touched.
+    Without a store, the CSV's dataset_version().
     """
+    if os.path.exists(DB_FILE):
+        return f"change-{bill_store.bill_version(bill_id, path=DB_FILE)}"
+    return dataset_version()
+
+def lookup_bill(bill_id):
+    """
+    Return the first bill with this bill_id as a dict, or None.
+    Uses an indexed lookup in the bill store when it exists, else scans the CSV.
+    """
+    if os.path.exists(DB_FILE):
+        with tracing.span('data_fetch.db_lookup'):
+            row = bill_store.get_bill(bill_id, path=DB_FILE)
+        if row:
+            row['introduction_date'] = pd.to_datetime(row['introduction_date'])
+        return row
+
     df = load_indian_bills()
     if df.empty:
-        return pd.DataFrame()
+        return None
     
     # Filter by bill_id (assuming simple integer matching for this prototype)
-    # In a real app, logic would be more complex
     try:
         bill_row = df[df['bill_id'].astype(str) == str(bill_id)]
     except:
-        return pd.DataFrame()
+        return None
 
     if bill_row.empty:
-        return pd.DataFrame()
+        return None
+    return bill_row.iloc[0].to_dict()
+
+def fetch_scoring_frame(bill_ids):
+    """
+    Model-ready rows (base features, introduction date and event offsets) for
+    a list of bill ids in one lookup; first match per bill id.
+    """
+    if os.path.exists(DB_FILE):
+        with tracing.span('data_fetch.db_scoring_rows'):
+            return bill_store.get_scoring_rows(bill_ids, path=DB_FILE)
+
+    df = load_indian_bills()
+    if df.empty:
+        return df
+    ids = [str(b) for b in bill_ids]
+    rows = df[df['bill_id'].astype(str).isin(ids)].drop_duplicates('bill_id')
+    return pd.concat([rows, bill_store.event_offsets(rows)], axis=1).reset_index(drop=True)
+
+def query_scoring_frame(ministry=None, status=None, year=None, limit=None):
+    """Model-ready rows for every bill matching a ministry/status/year filter"""
+    if os.path.exists(DB_FILE):
+        with tracing.span('data_fetch.db_scoring_rows'):
+            return bill_store.query_scoring_rows(ministry, status, year, limit, path=DB_FILE)
+
+    df = load_indian_bills()
+    if df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for column, value in (('ministry', ministry), ('status', status), ('year', year)):
+        if value is not None:
+            mask &= df[column] == value
+    rows = df[mask].head(limit) if limit else df[mask]
+    return pd.concat([rows, bill_store.event_offsets(rows)], axis=1).reset_index(drop=True)
+
+def list_filter_values(column):
+    """Distinct ministry / status / year values for filter widgets"""
+    if os.path.exists(DB_FILE):
+        return bill_store.distinct_values(column, path=DB_FILE)
+    df = load_indian_bills()
+    if df.empty or column not in df.columns:
+        return []
+    return sorted(df[column].dropna().unique().tolist())
+
+@tracing.traced('data_fetch.fetch_bill')
+def fetch_bill(bill_id, congress=None, bill_type=None):
+    """
+    Simulate fetching bill details by looking up the bill store / CSV.
+    Returns a BillRecord, or None if the bill is unknown.
+    """
+    bill_row = lookup_bill(bill_id)
+    if bill_row is None:
+        return None
+    return bill_record(bill_row, bill_id)
+
+def bill_record(bill_row, bill_id=None):
+    """BillRecord for one bill store / CSV row (a dict or Series)"""
+    bill_id = bill_row['bill_id'] if bill_id is None else bill_id
 
     # Map CSV columns to the structure expected by app.py
     # This maintains compatibility without rewriting the whole app logic immediately
@@ -44,53 +139,50 @@ def fetch_bill(bill_id, congress=None, bill_type=None):
     # processed: title, ministry, introduction_date, status, bill_id, year, is_amendment, ...
     
     # Handle missing short_title
-    title = bill_row['title'].values[0]
+    title = bill_row['title']
     short_title = title.split(',')[0] if ',' in str(title) else title
 
-    mapped_data = {
-        'title': title,
-        'short_title': short_title,
-        'bill_id': str(bill_id),
-        'sponsor': bill_row['ministry'].values[0],
-        'introduced_date': bill_row['introduction_date'].values[0],
-        'status': bill_row['status'].values[0],
-        'summary': "No summary available for this bill.",
-        'congress': bill_row['year'].values[0], 
-        'bill_type': "Government" if "Private" not in str(title) else "Private",
+    return BillRecord(
+        title=title,
+        short_title=short_title,
+        bill_id=str(bill_id),
+        sponsor=bill_row['ministry'],
+        introduced_date=bill_row['introduction_date'],
+        status=bill_row['status'],
+        summary="No summary available for this bill.",
+        congress=bill_row['year'],
+        bill_type="Government" if "Private" not in str(title) else "Private",
         # New ML features
-        'year': bill_row['year'].values[0],
-        'ministry': bill_row['ministry'].values[0],
-        'is_amendment': bill_row['is_amendment'].values[0],
-        'is_appropriation': bill_row['is_appropriation'].values[0],
-        'is_finance': bill_row['is_finance'].values[0],
+        year=bill_row['year'],
+        ministry=bill_row['ministry'],
+        is_amendment=bill_row['is_amendment'],
+        is_appropriation=bill_row['is_appropriation'],
+        is_finance=bill_row['is_finance'],
         # Mock old fields
-        'house': 'Lok Sabha', # Default to LS for this dataset
-        'type': "Government" if "Private" not in str(title) else "Private",
-        'cosponsor_count': 0,
-        'committees': 'None',
-        'policy_area': bill_row['ministry'].values[0],
-        'is_bipartisan': True,
-        'sponsors': bill_row['ministry'].values[0],
-        'sponsor_parties': 'Government',
-        'dem_sponsors': 1,
-        'rep_sponsors': 0
-    }
-    
-    return pd.DataFrame([mapped_data])
+        house='Lok Sabha', # Default to LS for this dataset
+        type="Government" if "Private" not in str(title) else "Private",
+        cosponsor_count=0,
+        committees='None',
+        policy_area=bill_row['ministry'],
+        is_bipartisan=True,
+        sponsors=bill_row['ministry'],
+        sponsor_parties='Government',
+        dem_sponsors=1,
+        rep_sponsors=0
+    )
 
+@tracing.traced('data_fetch.build_actions')
 def fetch_bill_actions(bill_id, congress=None, bill_type=None):
     """
     Generate mock actions based on the bill status to populate the timeline
     """
-    df = load_indian_bills()
-    if df.empty:
-        return pd.DataFrame()
-        
-    try:
-        bill_row = df[df['bill_id'].astype(str) == str(bill_id)].iloc[0]
-    except:
-        return pd.DataFrame()
+    bill_row = lookup_bill(bill_id)
+    if bill_row is None:
+        return ActionList()
+    return build_actions(bill_row)
 
+def build_actions(bill_row):
+    """Mock timeline for one bill store / CSV row, from its status"""
     actions = []
     
     # 1. Introduction
@@ -140,26 +232,29 @@ def fetch_bill_actions(bill_id, congress=None, bill_type=None):
              'action_code': 'withdrawn'
         })
     
-    return pd.DataFrame(actions)
+    return ActionList(
+        [a['date'] for a in actions], [a['text'] for a in actions], [a['action_code'] for a in actions]
+    )
 
+@tracing.traced('data_fetch.fetch_comprehensive')
 def fetch_comprehensive_bill_data(bill_input, congress=None, bill_type=None):
     """
     Orchestrator function compatible with app.py
     """
-    bill_df = fetch_bill(bill_input)
-    if bill_df.empty:
+    bill = fetch_bill(bill_input)
+    if bill is None:
         return None
         
-    actions_df = fetch_bill_actions(bill_input)
+    actions = fetch_bill_actions(bill_input)
     
     # Return structure matching what app.py expects
     return {
-        'bill_info': bill_df,
-        'actions': actions_df,
-        'cosponsors': pd.DataFrame({'name': []}), 
-        'subjects': {'subjects': ['Governance'], 'policy_area': bill_df['policy_area'].values[0]},
+        'bill_info': bill,
+        'actions': actions,
+        'cosponsors': [],
+        'subjects': {'subjects': ['Governance'], 'policy_area': bill.policy_area},
         'metrics': {
-            'total_actions': len(actions_df),
+            'total_actions': len(actions),
             'committee_count': 0,
             'bipartisan_score': 0.0
         }
@@ -0,0 +1,200 @@
+"""
+Date normalization shared by every ingest path.
+
+Each source writes dates its own way: the PRS scraper reads 'Aug 08, 2024',
+the Lok Sabha export has Excel datetimes in 'Date of Introduction' but
+'25 Mar 1985' and '23/01/1970 ' strings in its event columns, and the
+processed CSVs hold ISO dates. normalize_dates parses a column with an
+explicit format instead of letting pandas guess per value:
+
+  * the format of each (source, column) is detected once, on a sample of
+    its distinct values, from DATE_FORMATS (none of which are ambiguous
+    with each other, so any of them may be tried as a fallback);
+  * values are factorized and only the distinct raw strings are parsed,
+    through a memo shared by all calls (MEMO_SIZE entries at most);
+  * datetime objects are accepted as they are, and numbers as Excel serial
+    day numbers only within EXCEL_SERIALS (1950-2100), so a bare year such
+    as 2024 is reported instead of becoming 1905-07-16 (and the string
+    '2024' is not read as ISO 2024-01-01 either);
+  * values no format understands come back as NaT and are recorded:
+    a warning names the first new ones, unparsed_report() lists them all.
+
+    dates = normalize_dates(raw['Assent Date'], source='lok_sabha', column='Assent Date')
+"""
+
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMATS = [
+    'ISO8601',     # 2024-08-08, 2024-08-08 00:00:00
+    '%d %b %Y',    # 08 Aug 2024
+    '%d/%m/%Y',    # 08/08/2024
+    '%b %d, %Y',   # Aug 08, 2024
+    '%B %d, %Y',   # August 08, 2024
+    '%d %B %Y',    # 08 August 2024
+    '%d-%m-%Y',    # 08-08-2024
+    '%d.%m.%Y',    # 08.08.2024
+    '%d-%b-%Y',    # 08-Aug-2024
+]
+# Formats tried first per source, before detection
+SOURCE_FORMATS = {
+    'prs': ['%b %d, %Y', '%B %d, %Y'],
+    'lok_sabha': ['%d %b %Y', '%d/%m/%Y', 'ISO8601'],
+    'csv': ['ISO8601'],
+}
+DETECT_SAMPLE = 200
+MEMO_SIZE = 500_000
+# Excel serial day numbers count from 1899-12-30; only 1950-01-01..2100-12-31 are plausible bill dates
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+EXCEL_SERIALS = (18_264, 73_415)
+WARN_EXAMPLES = 5
+# ISO8601 parsing accepts a lone year; for a bill date that is missing data, not 1 January
+YEAR_ONLY = r'^\d{4}$'
+
+_MISSING = object()
+_formats = {}
+_memo = {}
+_unparsed = {}
+
+
+def _parse(values, fmt):
+    if fmt == 'ISO8601':
+        values = pd.Series(values, dtype=object)
+        values = values.mask(values.astype(str).str.match(YEAR_ONLY))
+    return pd.to_datetime(values, format=fmt, errors='coerce').astype('datetime64[ns]')
+
+
+def detect_format(samples, source=None):
+    """The DATE_FORMATS entry parsing most of `samples` (source hints win ties), or None"""
+    samples = pd.Series(samples, dtype=object)
+    if samples.empty:
+        return None
+    hints = SOURCE_FORMATS.get(source, [])
+    candidates = hints + [f for f in DATE_FORMATS if f not in hints]
+    best, best_hits = None, 0
+    for fmt in candidates:
+        hits = int(_parse(samples, fmt).notna().sum())
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+        if hits == len(samples):
+            break
+    return best
+
+
+def _format_order(key, text):
+    fmt = _formats.get(key)
+    if fmt is None:
+        fmt = detect_format(text[:DETECT_SAMPLE], key[0])
+        if fmt is not None and key[1] is not None:
+            _formats[key] = fmt
+    return ([fmt] if fmt else []) + [f for f in DATE_FORMATS if f != fmt]
+
+
+def _parse_text(text, key):
+    """datetime64 array for distinct stripped strings, via the memo"""
+    cached = [_memo.get(value, _MISSING) for value in text]
+    missing = np.array([i for i, value in enumerate(cached) if value is _MISSING], dtype=int)
+    parsed = np.array([np.datetime64('NaT') if value is _MISSING else value for value in cached],
+                      dtype='datetime64[ns]')
+    if len(missing) == 0:
+        return parsed
+
+    todo = pd.Series(text[missing], index=missing)
+    for fmt in _format_order(key, todo.to_numpy()):
+        result = _parse(todo, fmt)
+        done = result.notna()
+        parsed[result.index[done]] = result[done].to_numpy()
+        todo = todo[~done]
+        if todo.empty:
+            break
+
+    if len(_memo) + len(missing) > MEMO_SIZE:
+        _memo.clear()
+    _memo.update(zip(text[missing], parsed[missing]))
+    return parsed
+
+
+def _excel_serials(numbers):
+    numbers = numbers.astype(float)
+    valid = (numbers >= EXCEL_SERIALS[0]) & (numbers <= EXCEL_SERIALS[1])
+    out = np.full(len(numbers), np.datetime64('NaT'), dtype='datetime64[ns]')
+    out[valid] = (EXCEL_EPOCH + pd.to_timedelta(numbers[valid], unit='D')).to_numpy()
+    return out
+
+
+def _record_unparsed(key, values, counts):
+    seen = _unparsed.setdefault(key, {})
+    new = [v for v in values if v not in seen]
+    for value, count in zip(values, counts):
+        seen[value] = seen.get(value, 0) + int(count)
+    if new:
+        source, column = key
+        where = f" in {column}" if column else ""
+        where += f" ({source})" if source else ""
+        examples = ', '.join(repr(v) for v in new[:WARN_EXAMPLES]) + (', ...' if len(new) > WARN_EXAMPLES else '')
+        print(f"Warning: {len(new)} unparsed date value(s){where}: {examples}")
+
+
+def normalize_dates(values, source=None, column=None):
+    """
+    Parse a column of raw dates to datetime64[ns], aligned with its index.
+    `source` ('prs', 'lok_sabha', 'csv') and `column` key the format
+    detection and the unparsed-value report.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        if getattr(values.dt, 'tz', None) is not None:
+            values = values.dt.tz_localize(None)
+        return values.astype('datetime64[ns]')
+
+    key = (source, column)
+    codes, uniques = pd.factorize(values.astype(object))
+    uniques = np.asarray(uniques, dtype=object)
+    parsed = np.full(len(uniques), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    is_datetime = np.array([isinstance(v, (datetime, date)) for v in uniques], dtype=bool)
+    is_number = np.array([isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_))
+                          for v in uniques], dtype=bool)
+    if is_datetime.any():
+        parsed[is_datetime] = pd.to_datetime(list(uniques[is_datetime]), errors='coerce').astype('datetime64[ns]')
+    if is_number.any():
+        parsed[is_number] = _excel_serials(uniques[is_number])
+
+    is_text = ~(is_datetime | is_number)
+    text = pd.Series(uniques[is_text], dtype=object).astype(str).str.strip().to_numpy(dtype=object)
+    blank = np.zeros(len(uniques), dtype=bool)
+    blank[is_text] = text == ''
+    rows = np.flatnonzero(is_text & ~blank)
+    if len(rows):
+        parsed[rows] = _parse_text(text[text != ''], key)
+
+    failed = np.flatnonzero(pd.isna(parsed) & ~blank)
+    if len(failed):
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))[failed]
+        _record_unparsed(key, [str(v).strip() for v in uniques[failed]], counts)
+
+    out = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+    valid = codes >= 0
+    out[valid] = parsed[codes[valid]]
+    return pd.Series(out, index=values.index, name=values.name)
+
+
+def unparsed_report():
+    """Every value normalize_dates could not parse, with how often it was seen"""
+    rows = [(source, column, value, count)
+            for (source, column), values in _unparsed.items() for value, count in values.items()]
+    report = pd.DataFrame(rows, columns=['source', 'column', 'value', 'count'])
+    return report.sort_values('count', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def reset_report():
+    _unparsed.clear()
+
+
+def clear_caches():
+    """Forget detected formats and memoized values (and the report)"""
+    _formats.clear()
+    _memo.clear()
+    reset_report()
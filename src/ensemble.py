@@ -0,0 +1,156 @@
+"""
+Weighted RandomForest + GradientBoosting + LogisticRegression ensemble.
+
+Members are fitted on the same feature matrix and combined 40/40/20 as
+described in docs/model_architecture.md, followed by isotonic calibration.
+The calibration curve is stored as plain arrays, so at inference time the
+weighting and calibration are a dot product and an np.interp.
+
+EnsembleScorer loads every member once and scores a whole matrix per call.
+The members can run concurrently in threads since sklearn's tree inference
+releases the GIL; all scorers share one module-level thread pool, so
+scorers rebuilt on a model hot-swap do not leave threads behind.
+"""
+
+import copy
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+
+from features import build_inference_features
+
+ENSEMBLE_PATH = 'data/indian_bill_ensemble.pkl'
+WEIGHTS = {'rf': 0.4, 'gb': 0.4, 'lr': 0.2}
+SCORING_THREADS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def scoring_executor():
+    """The thread pool shared by every parallel EnsembleScorer"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SCORING_THREADS, thread_name_prefix='ensemble')
+        return _executor
+
+
+def train_ensemble(X, y, columns, calibration_size=0.2, random_state=42, n_jobs=-1):
+    """
+    Fit the members on part of (X, y) and the isotonic calibration on the
+    rest. Returns the bundle saved to ENSEMBLE_PATH. n_jobs is the random
+    forest's thread count (1 inside process pools).
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    X_fit, X_cal, y_fit, y_cal = train_test_split(
+        X, y, test_size=calibration_size, random_state=random_state, stratify=y
+    )
+
+    members = {
+        'rf': RandomForestClassifier(n_estimators=300, class_weight='balanced_subsample',
+                                     n_jobs=n_jobs, random_state=random_state),
+        'gb': GradientBoostingClassifier(n_estimators=200, learning_rate=0.05, random_state=random_state),
+        'lr': make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)),
+    }
+    for model in members.values():
+        model.fit(X_fit, y_fit)
+
+    bundle = {
+        'members': members,
+        'weights': dict(WEIGHTS),
+        'columns': list(columns),
+        'calibration': None,
+    }
+
+    return fit_calibration(bundle, X_cal, y_cal)
+
+
+def fit_calibration(bundle, X, y):
+    """Fit the bundle's isotonic calibration on (X, y), held out from its members' training; in place"""
+    from sklearn.isotonic import IsotonicRegression
+
+    raw = EnsembleScorer(bundle, parallel=False).score(np.asarray(X, dtype=float), calibrate=False)
+    iso = IsotonicRegression(out_of_bounds='clip', y_min=0.0, y_max=1.0).fit(raw, np.asarray(y))
+    bundle['calibration'] = {
+        'x': np.asarray(iso.X_thresholds_, dtype=float),
+        'y': np.asarray(iso.y_thresholds_, dtype=float),
+    }
+    return bundle
+
+
+class EnsembleScorer:
+    """Batched scorer over a trained ensemble bundle"""
+
+    def __init__(self, bundle, parallel=True):
+        self.names = list(bundle['members'])
+        self.members = [bundle['members'][name] for name in self.names]
+        weights = np.array([bundle['weights'][name] for name in self.names], dtype=float)
+        self.weights = weights / weights.sum()
+        self.columns = list(bundle['columns'])
+        calibration = bundle.get('calibration')
+        self.calibration_x = calibration['x'] if calibration else None
+        self.calibration_y = calibration['y'] if calibration else None
+        self._executor = scoring_executor() if parallel else None
+        # Members already run side by side; per-model joblib threads only add overhead.
+        # Shallow copies: the bundle's own estimators (saved by train_model) keep their n_jobs.
+        if parallel:
+            self.members = [self._single_job(model) for model in self.members]
+
+    @staticmethod
+    def _single_job(model):
+        if getattr(model, 'n_jobs', None) in (None, 1):
+            return model
+        model = copy.copy(model)
+        model.n_jobs = 1
+        return model
+
+    @classmethod
+    def load(cls, path=ENSEMBLE_PATH, parallel=True):
+        return cls(joblib.load(path), parallel=parallel)
+
+    def member_scores(self, X):
+        """(n_bills, n_members) matrix of positive-class probabilities"""
+        X = np.asarray(X, dtype=float)
+        if self._executor is not None and len(X) > 1:
+            futures = [self._executor.submit(model.predict_proba, X) for model in self.members]
+            probs = [future.result()[:, 1] for future in futures]
+        else:
+            probs = [model.predict_proba(X)[:, 1] for model in self.members]
+        return np.column_stack(probs)
+
+    def calibrate(self, raw):
+        if self.calibration_x is None:
+            return raw
+        return np.interp(raw, self.calibration_x, self.calibration_y)
+
+    def score(self, X, calibrate=True):
+        """Weighted (and calibrated) passage probability for every row of X"""
+        raw = self.member_scores(X) @ self.weights
+        return self.calibrate(raw) if calibrate else raw
+
+    def predict_proba(self, X):
+        """sklearn-compatible (n, 2) output so the scorer can stand in for a single model"""
+        p = self.score(X)
+        return np.column_stack([1.0 - p, p])
+
+    def score_frame(self, df):
+        """Featurize a bills frame and score it in one pass"""
+        return self.score(build_inference_features(df, self.columns).to_numpy())
+
+
+def load_scorer(path=ENSEMBLE_PATH):
+    """The ensemble scorer if an ensemble has been trained, else None"""
+    if not os.path.exists(path):
+        return None
+    return EnsembleScorer.load(path)
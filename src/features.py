@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from bill_text import FEATURE_COLUMNS as TEXT_FEATURES, join_text_features, stored_features, title_key
+from ministry import normalize_ministries
+
+# Statuses used to build the training target
+PASSED_STATUSES = ['Assented', 'Passed']
+FAILED_STATUSES = ['Lapsed', 'Withdrawn', 'Negatived']
+
+NUMERIC_FEATURES = ['is_amendment', 'is_appropriation', 'is_finance', 'year']
+MINISTRY_PREFIX = 'ministry_clean_'
+TOP_MINISTRIES = 20
+
+
+def build_training_features(df, text_features=None):
+    """
+    Build the (X, y) training matrix from the processed bills frame.
+    Only bills with a final outcome are kept. With `text_features` (see
+    bill_text.text_features) the document text columns are added too, joined
+    by title; ValueError if no training bill has a stored document.
+    """
+    # Filter out Unknown/Pending for training
+    df_train = df[df['status'].isin(PASSED_STATUSES + FAILED_STATUSES)].copy()
+    y = df_train['status'].isin(PASSED_STATUSES).astype(int)
+
+    # Canonical ministry names, so spelling variants share one column
+    df_train['ministry'] = normalize_ministries(df_train['ministry'])
+
+    # Top Ministries, everything else folded into 'Other'
+    top_ministries = df_train['ministry'].value_counts().nlargest(TOP_MINISTRIES).index
+    df_train['ministry_clean'] = df_train['ministry'].where(df_train['ministry'].isin(top_ministries), 'Other')
+
+    features = pd.get_dummies(df_train[['ministry_clean']], drop_first=True)
+    numeric_features = df_train[NUMERIC_FEATURES]
+
+    X = pd.concat([features, numeric_features], axis=1)
+    if text_features is not None:
+        if not title_key(df_train['title']).isin(text_features['title_key']).any():
+            raise ValueError(f"None of the {len(df_train)} training bills matches a document in the text features "
+                             f"({len(text_features)} bills); ingest the documents of these bills and run "
+                             f"`bill_text.py features` first.")
+        X = pd.concat([X, join_text_features(df_train[['title']], text_features)[TEXT_FEATURES]], axis=1)
+    return X, y
+
+
+def build_inference_features(df, model_columns):
+    """
+    Build the model input matrix for any number of bills, aligned to the
+    training columns. Unknown ministries simply leave every one-hot column at 0.
+    Text columns the frame does not carry are joined from the stored text
+    features by title, so a model trained with them scores the same way.
+    """
+    index = {col: i for i, col in enumerate(model_columns)}
+    matrix = np.zeros((len(df), len(model_columns)), dtype=float)
+
+    # Numeric columns (base features plus any stage-specific extras) are copied as is
+    for col in model_columns:
+        if col in df.columns and not col.startswith(MINISTRY_PREFIX):
+            matrix[:, index[col]] = pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+    text_columns = [col for col in TEXT_FEATURES if col in index and col not in df.columns]
+    if text_columns and 'title' in df.columns:
+        joined = join_text_features(df[['title']], stored_features())
+        for col in text_columns:
+            matrix[:, index[col]] = joined[col].to_numpy(dtype=float)
+
+    if 'ministry' in df.columns:
+        ministry_cols = MINISTRY_PREFIX + normalize_ministries(df['ministry'])
+        positions = ministry_cols.map(index).to_numpy()
+        rows = np.flatnonzero(pd.notna(positions))
+        matrix[rows, positions[rows].astype(int)] = 1.0
+
+    return pd.DataFrame(matrix, columns=list(model_columns))
@@ -0,0 +1,270 @@
+"""
+Incremental model updates as new outcomes arrive.
+
+Every published version carries a 'labels' artifact: the bill_key and label
+of each bill it was trained on. update() compares the current processed
+dataset with it to find new outcomes (bills that lapsed, got assent, ...)
+and, instead of a full train_model run:
+
+  * appends trees to the random forest and stages to the gradient boosting
+    member (warm_start) of the ensemble and of every stage model, fitted on
+    the new outcomes plus the most recent RECENT labelled bills;
+  * holds out part of the new outcomes: half of them refit the grown
+    models' isotonic calibration (the old curve was fitted to the old
+    members), the other half score the current and the candidate models;
+    the candidate is published only if its Brier score is no worse than
+    the current one's (within GATE_TOLERANCE);
+  * falls back to a full retrain when one is due (FULL_RETRAIN_DAYS since
+    the last one), when the forest has reached MAX_TREES, or when drift is
+    detected: the current model's Brier score on the new outcomes, or their
+    pass rate, moved too far from the training baseline.
+
+    python src/incremental.py [--data data/bills_processed.csv] [--full] [--dry-run]
+"""
+
+import argparse
+import copy
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sklearn.utils.class_weight import compute_class_weight
+
+import bill_store
+import model_registry
+from ensemble import fit_calibration
+from features import PASSED_STATUSES, FAILED_STATUSES, build_inference_features
+
+RECENT = 400
+ADD_TREES = 25
+ADD_STAGES = 20
+MAX_TREES = 600
+HOLDOUT_FRACTION = 0.3
+MIN_HOLDOUT = 20
+GATE_TOLERANCE = 0.005
+FULL_RETRAIN_DAYS = 30
+# Drift: Brier score worse than the training baseline by more than this ...
+DRIFT_BRIER = 0.05
+# ... or a pass rate among the new outcomes this far from the training data's
+DRIFT_PASS_RATE = 0.2
+
+
+def training_labels(df, y):
+    """The 'labels' artifact: bill_key and label of every training row (y is indexed like df)"""
+    keys = bill_store.prepare_bills(df.loc[y.index], 'lok_sabha')['bill_key']
+    labels = pd.DataFrame({'bill_key': keys.to_numpy(), 'label': y.to_numpy()})
+    return labels.drop_duplicates('bill_key', keep='first').reset_index(drop=True)
+
+
+def labelled_bills(df):
+    """Decided bills of a processed frame with their bill_key and label, most recently introduced last"""
+    decided = df[df['status'].isin(PASSED_STATUSES + FAILED_STATUSES)].copy()
+    decided['bill_key'] = bill_store.prepare_bills(decided, 'lok_sabha')['bill_key'].to_numpy()
+    decided['label'] = decided['status'].isin(PASSED_STATUSES).astype(int)
+    decided = decided.drop_duplicates('bill_key', keep='first')
+    intro = pd.to_datetime(decided['introduction_date'], errors='coerce')
+    return decided.iloc[np.argsort(intro.to_numpy(), kind='stable')]
+
+
+def new_outcomes(labelled, trained):
+    """Boolean mask of labelled bills the model has not seen with this label"""
+    position = pd.Index(trained['bill_key']).get_indexer(labelled['bill_key'])
+    seen = position >= 0
+    same = np.zeros(len(labelled), dtype=bool)
+    same[seen] = trained['label'].to_numpy()[position[seen]] == labelled['label'].to_numpy()[seen]
+    return ~same
+
+
+def brier(p, y):
+    return float(np.mean((np.asarray(p) - np.asarray(y)) ** 2))
+
+
+def grow_bundle(bundle, X, y):
+    """A copy of an ensemble bundle with trees / boosting stages appended, fitted on (X, y)"""
+    bundle = copy.deepcopy(bundle)
+    members = bundle['members']
+    rf, gb = members['rf'], members['gb']
+    if isinstance(rf.class_weight, str):
+        # 'balanced' presets would be recomputed on the update rows alone
+        classes = np.unique(y)
+        rf.set_params(class_weight=dict(zip(classes, compute_class_weight('balanced', classes=classes, y=y))))
+    rf.set_params(warm_start=True, n_estimators=rf.n_estimators + ADD_TREES)
+    rf.fit(X, y)
+    gb.set_params(warm_start=True, n_estimators=gb.n_estimators + ADD_STAGES)
+    gb.fit(X, y)
+    return bundle
+
+
+def _stage_inputs(frame, stage):
+    from stage_router import build_stage_index, stage_features, STAGE_START_DAY
+    offsets = build_stage_index(frame)
+    eligible = ~(offsets['days_to_assent'] < STAGE_START_DAY[stage] - 1)
+    inputs = pd.concat([frame, offsets.drop(columns='introduction_date'), stage_features(offsets, stage)], axis=1)
+    return inputs[eligible.to_numpy()]
+
+
+def recalibrate(bundle, rows):
+    """Refit a grown bundle's calibration on held-out labelled rows (kept as is with a single class)"""
+    labels = rows['label'].to_numpy()
+    if len(np.unique(labels)) < 2:
+        return bundle
+    return fit_calibration(bundle, build_inference_features(rows, bundle['columns']).to_numpy(), labels)
+
+
+def grow_models(ensemble, stage_bundles, fit_rows, calibration_rows):
+    """Candidate ensemble and stage bundles grown on the update rows and recalibrated"""
+    y = fit_rows['label'].to_numpy()
+    X = build_inference_features(fit_rows, ensemble['columns']).to_numpy()
+    candidate = recalibrate(grow_bundle(ensemble, X, y), calibration_rows)
+
+    stages = None
+    if stage_bundles:
+        stages = {}
+        for stage, bundle in stage_bundles.items():
+            rows = _stage_inputs(fit_rows, stage)
+            labels = rows['label'].to_numpy()
+            if len(np.unique(labels)) < 2:
+                stages[stage] = bundle
+                continue
+            grown = grow_bundle(bundle, build_inference_features(rows, bundle['columns']).to_numpy(), labels)
+            stages[stage] = recalibrate(grown, _stage_inputs(calibration_rows, stage))
+    return candidate, stages
+
+
+def score_models(ensemble, stage_bundles, rows):
+    """Brier score of the served scorers (ensemble, and stage router when present) on labelled rows"""
+    from ensemble import EnsembleScorer
+    from stage_router import StageRouter, build_stage_index
+
+    y = rows['label'].to_numpy()
+    scores = {'ensemble': brier(EnsembleScorer(ensemble, parallel=False).score_frame(rows), y)}
+    if stage_bundles:
+        frame = pd.concat([rows, build_stage_index(rows).drop(columns='introduction_date')], axis=1)
+        probs, _ = StageRouter(stage_bundles, parallel=False).score(frame)
+        scores['router'] = brier(probs, y)
+    return scores
+
+
+def full_retrain_reason(manifest, ensemble, update, trained):
+    """Why a full retrain is needed instead of an incremental update, or None"""
+    lineage = manifest.get('lineage') or {}
+    full_at = lineage.get('full_trained_at') or manifest['created_at']
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(full_at)
+    if age.days >= FULL_RETRAIN_DAYS:
+        return f"last full retrain was {age.days} days ago"
+    if ensemble['members']['rf'].n_estimators + ADD_TREES > MAX_TREES:
+        return f"the forest has reached {MAX_TREES} trees"
+    pass_rate = update['label'].mean()
+    if abs(pass_rate - trained['label'].mean()) > DRIFT_PASS_RATE:
+        return f"pass rate drift ({pass_rate:.2f} among new outcomes vs {trained['label'].mean():.2f})"
+    baseline = manifest['metrics'].get('ensemble_brier')
+    current = score_models(ensemble, None, update)['ensemble']
+    if baseline is not None and current > baseline + DRIFT_BRIER:
+        return f"performance drift (Brier {current:.3f} on new outcomes vs {baseline:.3f} at training)"
+    return None
+
+
+def split_update(labelled, new_mask, rng):
+    """
+    (fit_rows, calibration_rows, holdout_rows): the held-out new outcomes,
+    topped up with recent bills if there are few, are split in two halves
+    for recalibration and for the gate.
+    """
+    new = np.flatnonzero(new_mask)
+    held = rng.permutation(new)[:int(np.ceil(len(new) * HOLDOUT_FRACTION))]
+    if len(held) < 2 * MIN_HOLDOUT:
+        # Already-seen recent bills only make the gate stricter for the candidate
+        seen = np.flatnonzero(~new_mask)[-(2 * MIN_HOLDOUT - len(held)):]
+        held = np.concatenate([held, seen])
+    recent = np.arange(max(len(labelled) - RECENT, 0), len(labelled))
+    fit = np.setdiff1d(np.union1d(new, recent), held)
+    return labelled.iloc[fit], labelled.iloc[held[::2]], labelled.iloc[held[1::2]]
+
+
+def update(data_path='data/bills_processed.csv', registry_dir=model_registry.REGISTRY_DIR, full=False,
+           dry_run=False, random_state=42, text_features=False):
+    """
+    Bring the served model up to date with the outcomes in `data_path`.
+    Returns 'current', 'incremental', 'rejected' or 'full'.
+    """
+    from train_model import train_model
+
+    def retrain(reason):
+        print(f"Full retrain: {reason}")
+        if not dry_run:
+            train_model(data_path=data_path, registry_dir=registry_dir, text_features=text_features)
+        return 'full'
+
+    if full:
+        return retrain("requested")
+    try:
+        manifest = model_registry.load_manifest(registry_dir=registry_dir)
+        trained = model_registry.load_artifact('labels', registry_dir=registry_dir)
+        ensemble = model_registry.load_artifact('ensemble', registry_dir=registry_dir)
+    except model_registry.RegistryError as e:
+        return retrain(f"no incremental base ({e})")
+    stage_bundles = (model_registry.load_artifact('stage_models', registry_dir=registry_dir)
+                     if 'stage_models' in manifest['artifacts'] else None)
+
+    labelled = labelled_bills(pd.read_csv(data_path)).reset_index(drop=True)
+    new_mask = new_outcomes(labelled, trained)
+    if not new_mask.any():
+        print(f"Model {manifest['version']} is up to date ({len(labelled)} outcomes)")
+        return 'current'
+    print(f"{new_mask.sum()} new outcomes since {manifest['version']}")
+
+    reason = full_retrain_reason(manifest, ensemble, labelled[new_mask], trained)
+    if reason:
+        return retrain(reason)
+
+    fit_rows, calibration_rows, holdout = split_update(labelled, new_mask, np.random.default_rng(random_state))
+    if fit_rows['label'].nunique() < 2:
+        return retrain("the update rows hold a single class")
+    candidate, candidate_stages = grow_models(ensemble, stage_bundles, fit_rows, calibration_rows)
+
+    before = score_models(ensemble, stage_bundles, holdout)
+    after = score_models(candidate, candidate_stages, holdout)
+    for name in before:
+        print(f"  {name}: Brier {before[name]:.4f} -> {after[name]:.4f} on {len(holdout)} held-out bills")
+    if any(after[name] > before[name] + GATE_TOLERANCE for name in before):
+        print("Candidate rejected by the held-out check; the current model stays")
+        return 'rejected'
+    if dry_run:
+        return 'incremental'
+
+    artifacts = {name: model_registry.load_artifact(name, registry_dir=registry_dir)
+                 for name in manifest['artifacts'] if name not in ('ensemble', 'stage_models', 'labels')}
+    artifacts['ensemble'] = candidate
+    if candidate_stages:
+        artifacts['stage_models'] = candidate_stages
+    # Only what the members were fitted on: held-out outcomes stay new for the next update
+    fitted = pd.concat([fit_rows[['bill_key', 'label']], trained[['bill_key', 'label']]], ignore_index=True)
+    artifacts['labels'] = fitted.drop_duplicates('bill_key', keep='first').reset_index(drop=True)
+    metrics = dict(manifest['metrics'], incremental_brier=after['ensemble'])
+    lineage = {
+        'mode': 'incremental',
+        'base_version': manifest['version'],
+        'full_trained_at': (manifest.get('lineage') or {}).get('full_trained_at', manifest['created_at']),
+        'new_outcomes': int(new_mask.sum()),
+    }
+    version = model_registry.publish(artifacts, manifest['feature_schema'], metrics=metrics, data_path=data_path,
+                                     registry_dir=registry_dir, lineage=lineage)
+    print(f"Published incremental version {version}")
+    return 'incremental'
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Update the served model with new outcomes')
+    parser.add_argument('--data', default='data/bills_processed.csv')
+    parser.add_argument('--registry', default=model_registry.REGISTRY_DIR)
+    parser.add_argument('--full', action='store_true', help='force a full retrain')
+    parser.add_argument('--dry-run', action='store_true', help='report what would happen without publishing')
+    parser.add_argument('--text-features', action='store_true', help='include the bill document features on a full retrain')
+    args = parser.parse_args(argv)
+    update(args.data, args.registry, args.full, args.dry_run, text_features=args.text_features)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,134 @@
+"""
+Canonical ministry names.
+
+The Lok Sabha export (`FINANCE`, `LABOUR  AND  EMPLOYMENT`) and PRS pages
+(`Finance`, `Labour and Employment`) spell ministries differently, and
+ministries have been renamed or merged over the years. canonical_ministry
+maps any raw value to one canonical name: first through the curated alias
+table, then by fuzzy match against it, else to a tidied version of the
+raw value. Results are memoized, and normalize_ministries only resolves
+each distinct value of a column once.
+"""
+
+import difflib
+import re
+from functools import lru_cache
+
+UNKNOWN = 'Unknown'
+FUZZY_CUTOFF = 0.85
+
+# Canonical name -> known spellings, former names and merged portfolios.
+# Spellings are compared after _key(), so case, '&' and spacing don't matter.
+ALIASES = {
+    'Agriculture and Farmers Welfare': ['Agriculture', 'Agriculture & Farmers Welfare', 'Agriculture and Cooperation',
+                                        'Agro and Rural Industries'],
+    'Atomic Energy': [],
+    'AYUSH': ['AYUSH (Ayurveda, Yoga and Naturopathy, Unani, Siddha and Homoeopathy',
+              'AYUSH (Ayurveda, Yoga and Naturopathy, Unani, Siddha and Homoeopathy)'],
+    'Chemicals and Fertilizers': ['Chemicals and Fertilisers', 'Chemical and Fertilisers and Pharmaceutical'],
+    'Civil Aviation': [],
+    'Coal': ['Coal and Mines'],
+    'Commerce and Industry': ['Commerce', 'Industry'],
+    'Communications and Information Technology': ['Communication and IT', 'Communications and IT',
+                                                  'Communications', 'Information Technology'],
+    'Consumer Affairs, Food and Public Distribution': ['Consumer Affairs and Food Distribution',
+                                                       'Consumer Affairs', 'Food and Public Distribution'],
+    'Co-operation': ['Cooperation'],
+    'Corporate Affairs': ['Company Affairs'],
+    'Culture': ['Tourism and Culture'],
+    'Defence': ['Defense'],
+    'Earth Sciences': [],
+    'Education': ['Human Resource Development', 'HRD'],
+    'Electronics and Information Technology': ['MeitY'],
+    'Environment, Forests and Climate Change': ['Environment and Forests', 'Environment'],
+    'External Affairs': [],
+    'Finance': ['Finance, Corporate Affairs and Information & Broadcasting'],
+    'Fisheries, Animal Husbandry and Dairying': [],
+    'Food Processing Industries': [],
+    'Health and Family Welfare': ['Health'],
+    'Heavy Industries and Public Enterprises': ['Heavy Industries'],
+    'Home Affairs': ['Home'],
+    'Housing and Urban Affairs': ['Urban Development', 'Housing and Urban Poverty Alleviation',
+                                  'Urban Development and Poverty Alleviation'],
+    'Information and Broadcasting': ['I&B'],
+    'Labour and Employment': ['Labour'],
+    'Law and Justice': ['Law', 'Law, Justice and Company Affairs'],
+    'Micro, Small and Medium Enterprises': ['MSME', 'Medium Small and Medium Enterprises (MSME)'],
+    'Mines': [],
+    'Minority Affairs': [],
+    'Panchayati Raj': [],
+    'Parliamentary Affairs': [],
+    'Personnel, Public Grievances and Pensions': ['Personnel, Grievances and Pensions'],
+    'Petroleum and Natural Gas': [],
+    'Ports, Shipping and Waterways': ['Shipping'],
+    'Power': [],
+    'Prime Minister': ["Prime Minister's Office", 'PMO'],
+    'Railways': ['Railway'],
+    'Rehabilitation': [],
+    'Road Transport and Highways': ['Roads', 'Shipping, Road Transport and Highways',
+                                    'Road Transport, Highways and Shipping'],
+    'Rural Development': [],
+    'Science and Technology': ['Science and Technology and Earth Sciences'],
+    'Skill Development and Entrepreneurship': [],
+    'Social Justice and Empowerment': ['Social Justice and Welfare', 'Welfare'],
+    'Statistics and Programme Implementation': [],
+    'Steel': [],
+    'Textiles': ['Textile'],
+    'Tribal Affairs': [],
+    'Water Resources': ['Jal Shakti', 'Water Resources, River Development and Ganga Rejuvenation'],
+    'Women and Child Development': [],
+    'Youth Affairs and Sports': ['Youth Affairs', 'Sports'],
+}
+
+_PREFIX = re.compile(r'^(?:THE\s+)?(?:MINISTRY|DEPARTMENT)\s+OF\s+')
+_NON_WORD = re.compile(r'[^A-Z0-9]+')
+_SMALL_WORDS = {'And', 'Of', 'The', 'For'}
+
+
+def _key(value):
+    """Comparison key: upper case, '&' as AND, no 'Ministry of', punctuation and runs of spaces collapsed"""
+    key = str(value).upper().replace('&', ' AND ')
+    key = _NON_WORD.sub(' ', key).strip()
+    return _PREFIX.sub('', key)
+
+
+_LOOKUP = {}
+for _canonical, _aliases in ALIASES.items():
+    for _alias in [_canonical] + _aliases:
+        _LOOKUP[_key(_alias)] = _canonical
+_KEYS = list(_LOOKUP)
+
+
+def _tidy(value):
+    """Fallback for unmatched names: 'Ministry of' dropped, single-spaced, title case"""
+    text = re.sub(r'^(?:the\s+)?(?:ministry|department)\s+of\s+', '', str(value).strip(), flags=re.IGNORECASE)
+    words = re.sub(r'\s+', ' ', text).strip(' ,').title().split(' ')
+    return ' '.join(w.lower() if i and w in _SMALL_WORDS else w for i, w in enumerate(words))
+
+
+@lru_cache(maxsize=None)
+def canonical_ministry(value):
+    """Canonical ministry name for one raw value ('Unknown' for blanks)"""
+    if value is None or value != value:  # None / NaN
+        return UNKNOWN
+    key = _key(value)
+    if not key or key in ('UNKNOWN', 'NAN', 'NONE', 'NA'):
+        return UNKNOWN
+    if key in _LOOKUP:
+        return _LOOKUP[key]
+    match = difflib.get_close_matches(key, _KEYS, n=1, cutoff=FUZZY_CUTOFF)
+    if match:
+        return _LOOKUP[match[0]]
+    return _tidy(value)
+
+
+def normalize_ministries(values):
+    """Canonical names for a pandas Series, resolving each distinct value once"""
+    import numpy as np
+    import pandas as pd
+
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values)
+    mapped = np.array([canonical_ministry(value) for value in uniques] + [UNKNOWN], dtype=object)
+    # Missing values have code -1, which picks the trailing UNKNOWN
+    return pd.Series(mapped[codes], index=values.index)
@@ -0,0 +1,215 @@
+"""
+Versioned registry of trained model artifacts.
+
+Every training run is published as an immutable version directory:
+
+    data/models/
+        CURRENT                      <- name of the version being served
+        20260301T101500-3f2a9c1e/
+            manifest.json            <- hashes, feature schema, metrics, data fingerprint, lineage
+            model.pkl  columns.pkl  ensemble.pkl  stage_models.pkl
+
+A version is written to a temporary directory and renamed into place, and
+CURRENT is replaced with os.replace, so readers never see a half-written
+version or pointer. Artifacts are checked against their manifest hash on
+load. Serving processes poll CURRENT (see warmup) and swap models without
+a restart.
+
+    python src/model_registry.py list
+    python src/model_registry.py promote <version>
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+import joblib
+
+REGISTRY_DIR = os.path.join('data', 'models')
+POINTER_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+
+class RegistryError(Exception):
+    """Missing version or artifact, or an artifact that fails its integrity check"""
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_fingerprint(path):
+    """Hash, size and row count of a training data file"""
+    with open(path, 'rb') as f:
+        rows = max(sum(1 for _ in f) - 1, 0)
+    return {
+        'path': path,
+        'sha256': file_sha256(path),
+        'bytes': os.path.getsize(path),
+        'rows': rows,
+    }
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def dump_atomic(obj, path):
+    """joblib.dump to a temporary file next to `path`, then rename it into place"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    os.close(fd)
+    try:
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def publish(artifacts, columns, metrics=None, data_path=None, registry_dir=REGISTRY_DIR, activate=True,
+            lineage=None):
+    """
+    Save `artifacts` ({name: object}) as a new immutable version and, if
+    `activate`, point CURRENT at it. `lineage` records how the version was
+    trained (see incremental.py). Returns the version name. The name ends in
+    a hash of the artifacts, so publishing identical artifacts again within
+    the same second returns the version already published.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=registry_dir, prefix='.staging-')
+    try:
+        files = {}
+        for name, obj in artifacts.items():
+            filename = f'{name}.pkl'
+            joblib.dump(obj, os.path.join(staging, filename))
+            files[name] = {'file': filename, 'sha256': file_sha256(os.path.join(staging, filename))}
+
+        created = datetime.now(timezone.utc)
+        content_hash = hashlib.sha256(''.join(f['sha256'] for f in files.values()).encode()).hexdigest()
+        version = f"{created.strftime('%Y%m%dT%H%M%S')}-{content_hash[:8]}"
+        manifest = {
+            'version': version,
+            'created_at': created.isoformat(),
+            'artifacts': files,
+            'feature_schema': list(columns),
+            'metrics': metrics or {},
+            'training_data': data_fingerprint(data_path) if data_path else None,
+            'lineage': lineage or {'mode': 'full', 'full_trained_at': created.isoformat()},
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        target = os.path.join(registry_dir, version)
+        try:
+            os.replace(staging, target)
+        except OSError:
+            # Same second and same artifact hashes: already published (possibly by a concurrent run)
+            if not os.path.exists(os.path.join(target, MANIFEST_FILE)):
+                raise
+            shutil.rmtree(staging, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if activate:
+        set_current(version, registry_dir)
+    return version
+
+
+def set_current(version, registry_dir=REGISTRY_DIR):
+    """Atomically point CURRENT at an existing version (publish or rollback)"""
+    if not os.path.exists(os.path.join(registry_dir, version, MANIFEST_FILE)):
+        raise RegistryError(f"Unknown model version: {version}")
+    _write_atomic(os.path.join(registry_dir, POINTER_FILE), version + '\n')
+
+
+def current_version(registry_dir=REGISTRY_DIR):
+    """Version named by CURRENT, or None if nothing has been published"""
+    try:
+        with open(os.path.join(registry_dir, POINTER_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    """Published versions, oldest first"""
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(registry_dir)
+        if os.path.exists(os.path.join(registry_dir, name, MANIFEST_FILE))
+    )
+
+
+def load_manifest(version=None, registry_dir=REGISTRY_DIR):
+    version = version or current_version(registry_dir)
+    if version is None:
+        raise RegistryError(f"No model version published in {registry_dir}")
+    path = os.path.join(registry_dir, version, MANIFEST_FILE)
+    if not os.path.exists(path):
+        raise RegistryError(f"Unknown model version: {version}")
+    with open(path) as f:
+        return json.load(f)
+
+
+def has_artifact(name, version=None, registry_dir=REGISTRY_DIR):
+    try:
+        return name in load_manifest(version, registry_dir)['artifacts']
+    except RegistryError:
+        return False
+
+
+def load_artifact(name, version=None, registry_dir=REGISTRY_DIR, verify=True):
+    """Unpickle one artifact of a version (default: CURRENT) after checking its hash"""
+    manifest = load_manifest(version, registry_dir)
+    entry = manifest['artifacts'].get(name)
+    if entry is None:
+        raise RegistryError(f"Version {manifest['version']} has no '{name}' artifact")
+    path = os.path.join(registry_dir, manifest['version'], entry['file'])
+    if verify and file_sha256(path) != entry['sha256']:
+        raise RegistryError(f"Checksum mismatch for {path}")
+    return joblib.load(path)
+
+
+def main(argv):
+    command = argv[0] if argv else 'list'
+    if command == 'list':
+        current = current_version()
+        for version in list_versions():
+            manifest = load_manifest(version)
+            marker = '*' if version == current else ' '
+            metrics = ', '.join(f"{k}={v:.3f}" for k, v in manifest['metrics'].items())
+            print(f"{marker} {version}  {', '.join(manifest['artifacts'])}  {metrics}")
+    elif command == 'promote' and len(argv) == 2:
+        set_current(argv[1])
+        print(f"CURRENT -> {argv[1]}")
+    else:
+        print("Usage: python src/model_registry.py [list | promote <version>]")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,110 @@
+"""
+Batch passage predictions for any number of bills.
+
+predict_frame scores a frame of model-ready rows (see
+data_fetch.fetch_scoring_frame) in one call: through the stage router when
+stage models exist, else through the single ensemble / RF model. Models are
+shared with the dashboard via warmup, so they are loaded once per process.
+
+score_file runs the same scoring over a processed dataset of any size, one
+chunk at a time, and writes predictions partitioned by year / house:
+
+    python src/predict.py --input data/bills_processed.csv --output data/predictions
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import tracing
+import warmup
+from features import build_inference_features
+from chunked import iter_chunks, PartitionedWriter, CHUNK_SIZE
+
+OUTPUT_COLUMNS = ['bill_id', 'title', 'ministry', 'status', 'year', 'house']
+
+
+def load_models():
+    """(router, model, model_columns); any of them may be None"""
+    try:
+        router = warmup.get('router')
+    except Exception as e:
+        print(f"Stage models unavailable: {e}")
+        router = None
+    try:
+        model, columns = warmup.get('model')
+    except Exception as e:
+        print(f"Model unavailable: {e}")
+        model, columns = None, None
+    return router, model, columns
+
+
+def predict_frame(frame, as_of=None, router=None, model=None, model_columns=None):
+    """
+    Passage probability for every row of `frame`. Returns a DataFrame aligned
+    with `frame` holding probability, stage and the model used.
+    """
+    if router is None and model is None:
+        router, model, model_columns = load_models()
+
+    result = pd.DataFrame(index=frame.index)
+    with tracing.span('predict.batch'):
+        if router is not None:
+            probs, stages = router.score(frame, as_of=as_of)
+            result['probability'] = probs
+            result['stage'] = stages
+            result['model'] = 'stage'
+        elif model is not None:
+            X = build_inference_features(frame, model_columns)
+            result['probability'] = model.predict_proba(X)[:, 1]
+            result['stage'] = None
+            result['model'] = 'single'
+        else:
+            # Same neutral fallback as the dashboard's heuristic path
+            result['probability'] = np.full(len(frame), 0.5)
+            result['stage'] = None
+            result['model'] = 'heuristic'
+    return result
+
+
+def recommendations(probability, bill_type):
+    """(heading, advice) pairs shown under Strategic Recommendations, on the dashboard and static pages"""
+    if probability >= 0.5:
+        return [('Press ahead', 'Schedule for passing in the remaining House immediately.'),
+                ('Gazette Notification', 'Prepare for immediate notification after Assent.')]
+    if 'government' in str(bill_type).lower():
+        return [('Floor Management', 'Ensure coalition MPs are present for voting.'),
+                ('Opposition Consensus', 'Engage with opposition leaders to reduce disruption.')]
+    return [('Ministry Support', "Try to get the relevant Ministry to adopt the bill's objectives."),
+            ('Public Awareness', 'Use the bill to generate public debate on the issue.')]
+
+
+def score_file(input_path='data/bills_processed.csv', output_dir='data/predictions', chunksize=CHUNK_SIZE,
+               as_of=None):
+    """
+    Score a processed dataset (CSV or partitioned directory) chunk by chunk.
+    Models are loaded once; only one chunk is in memory at a time.
+    """
+    from bill_store import event_offsets
+
+    router, model, model_columns = load_models()
+    writer = PartitionedWriter(output_dir)
+    for chunk in iter_chunks(input_path, chunksize):
+        frame = pd.concat([chunk, event_offsets(chunk)], axis=1)
+        scores = predict_frame(frame, as_of=as_of, router=router, model=model, model_columns=model_columns)
+        out = chunk[[c for c in OUTPUT_COLUMNS if c in chunk.columns]].copy()
+        out[['probability', 'stage', 'model']] = scores[['probability', 'stage', 'model']].to_numpy()
+        writer.write(out)
+        print(f"Scored {writer.rows} bills...")
+    print(f"Saved predictions for {writer.rows} bills to {output_dir}")
+    return writer.rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Batch-score a processed bills dataset in chunks')
+    parser.add_argument('--input', default='data/bills_processed.csv')
+    parser.add_argument('--output', default='data/predictions')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    score_file(args.input, args.output, args.chunksize)
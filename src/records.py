@@ -0,0 +1,72 @@
+"""
+Lightweight per-bill records passed between data_fetch, prediction and the UI.
+
+A bill lookup used to be packed into a one-row DataFrame and read back field
+by field with df['x'].values[0]. BillRecord is a plain __slots__ object and
+ActionList keeps the timeline as parallel arrays; both only become
+DataFrames (to_frame) where a table is rendered or a model needs one.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class BillRecord:
+    """One bill as shown on the dashboard"""
+
+    __slots__ = (
+        'bill_id', 'title', 'short_title', 'sponsor', 'introduced_date', 'status', 'summary', 'congress',
+        'bill_type', 'year', 'ministry', 'is_amendment', 'is_appropriation', 'is_finance', 'house', 'type',
+        'cosponsor_count', 'committees', 'policy_area', 'is_bipartisan', 'sponsors', 'sponsor_parties',
+        'dem_sponsors', 'rep_sponsors',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Unknown BillRecord fields: {', '.join(fields)}")
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_frame(self):
+        """One-row DataFrame, for the model feature builders"""
+        return pd.DataFrame([self.to_dict()])
+
+    def __repr__(self):
+        return f"BillRecord(bill_id={self.bill_id!r}, title={self.title!r}, status={self.status!r})"
+
+
+class ActionList:
+    """A bill's legislative actions as parallel date / text / code arrays"""
+
+    __slots__ = ('dates', 'texts', 'codes')
+
+    def __init__(self, dates=(), texts=(), codes=()):
+        self.dates = pd.to_datetime(list(dates), errors='coerce').to_numpy(dtype='datetime64[ns]')
+        self.texts = np.asarray(texts, dtype=object)
+        self.codes = np.asarray(codes, dtype=object)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        return zip(self.dates, self.texts, self.codes)
+
+    @property
+    def empty(self):
+        return len(self.texts) == 0
+
+    def first_date(self):
+        """Earliest known action date, or None"""
+        valid = self.dates[~np.isnat(self.dates)]
+        return pd.Timestamp(valid.min()) if len(valid) else None
+
+    def to_frame(self):
+        """Display table: formatted date and action text"""
+        dates = pd.Series(self.dates)
+        return pd.DataFrame({
+            'Date': dates.dt.strftime('%d %B %Y').fillna('N/A'),
+            'Action': pd.Series(self.texts, dtype=object).astype(str).str.strip(),
+        })
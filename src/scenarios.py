@@ -0,0 +1,159 @@
+"""
+What-if scenarios: re-score bills under feature overrides in bulk.
+
+A scenario is a set of overrides ("introduced by Home Affairs", "referred to
+committee", "year 2025"); scenario_grid builds every combination of the
+values given per feature. run_scenarios featurizes the base bills once per
+model, builds the (scenarios x bills x columns) matrix of variants with
+NumPy broadcasting, scores the distinct rows in one call per model (one per
+stage with the stage router) and returns a tidy frame with one row per
+(scenario, bill):
+
+    grid = scenario_grid({'ministry': ['Home Affairs', 'Finance'], 'referred_committee': [True, False]})
+    result = run_scenarios(data_fetch.fetch_scoring_frame(['127', '128']), grid)
+
+Overridable features: ministry, the numeric base features (is_amendment,
+is_appropriation, is_finance, year) and the stage events referred_committee,
+passed_ls and passed_rs (True = seen before the bill's stage started). An
+event override only affects models that use it (the Early Stage and
+Progressive stage models).
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from ensemble import EnsembleScorer
+from features import NUMERIC_FEATURES, MINISTRY_PREFIX, build_inference_features
+from ministry import canonical_ministry
+
+EVENT_FEATURES = ['referred_committee', 'passed_ls', 'passed_rs']
+SCENARIO_FEATURES = ['ministry'] + NUMERIC_FEATURES + EVENT_FEATURES
+RESULT_COLUMNS = ['scenario', 'bill_id', 'title', 'stage', 'base_probability', 'probability', 'delta']
+
+
+def scenario_grid(values):
+    """Every combination of the override values given per feature, one scenario per row"""
+    unknown = set(values) - set(SCENARIO_FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown scenario features: {', '.join(sorted(unknown))} "
+                         f"(expected some of {', '.join(SCENARIO_FEATURES)})")
+    features = list(values)
+    rows = list(itertools.product(*(list(values[f]) for f in features)))
+    return pd.DataFrame(rows, columns=features).rename_axis('scenario').reset_index()
+
+
+def _column(feature):
+    return f'{feature}_seen' if feature in EVENT_FEATURES else feature
+
+
+def variant_matrix(base, columns, scenarios):
+    """
+    (n_scenarios, n_bills, n_columns) feature matrix: the base matrix broadcast
+    over the scenarios, with each scenario's overrides written in place.
+    Missing values (NaN / None) in `scenarios` keep the bill's own value.
+    """
+    position = {column: i for i, column in enumerate(columns)}
+    X = np.broadcast_to(base, (len(scenarios),) + base.shape).copy()
+
+    for feature in scenarios.columns.intersection(NUMERIC_FEATURES + EVENT_FEATURES):
+        column = position.get(_column(feature))
+        if column is None:
+            continue
+        values = pd.to_numeric(scenarios[feature].astype(object), errors='coerce').to_numpy(dtype=float)
+        rows = np.flatnonzero(~np.isnan(values))
+        X[rows, :, column] = values[rows, None]
+
+    if 'ministry' in scenarios.columns:
+        ministry_columns = np.array([i for c, i in position.items() if c.startswith(MINISTRY_PREFIX)], dtype=int)
+        overridden = scenarios['ministry'].notna().to_numpy()
+        targets = np.array([position.get(MINISTRY_PREFIX + canonical_ministry(m), -1) if set_ else -1
+                            for m, set_ in zip(scenarios['ministry'], overridden)], dtype=int)
+        rows = np.flatnonzero(overridden)
+        # Clear the bill's own ministry; ministries the model does not know stay all zero
+        X[rows[:, None], :, ministry_columns[None, :]] = 0.0
+        hits = rows[targets[rows] >= 0]
+        X[hits, :, targets[hits]] = 1.0
+    return X
+
+
+def _score(model, X):
+    # sklearn estimators have a score(X, y) too, so only the ensemble scorer is called through score
+    return model.score(X) if isinstance(model, EnsembleScorer) else model.predict_proba(X)[:, 1]
+
+
+def score_variants(model, X):
+    """Score a (scenarios, bills, columns) matrix, each distinct feature row once"""
+    flat = X.reshape(-1, X.shape[-1])
+    unique, inverse = np.unique(flat, axis=0, return_inverse=True)
+    return _score(model, unique)[inverse.reshape(-1)].reshape(X.shape[:2])
+
+
+def run_scenarios(bills, scenarios, as_of=None, router=None, model=None, model_columns=None):
+    """
+    Score every bill in `bills` (model-ready rows, see data_fetch.fetch_scoring_frame)
+    under every scenario (a frame like scenario_grid's, or a list of override
+    dicts). Returns one row per (scenario, bill) with the scenario's
+    overrides, the base and scenario probabilities and their difference.
+    """
+    from predict import load_models
+
+    if not isinstance(scenarios, pd.DataFrame):
+        scenarios = pd.DataFrame(list(scenarios)).rename_axis('scenario').reset_index()
+    if 'scenario' not in scenarios.columns:
+        scenarios = scenarios.rename_axis('scenario').reset_index()
+    overrides = scenarios.drop(columns='scenario')
+    unknown = set(overrides.columns) - set(SCENARIO_FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown scenario features: {', '.join(sorted(unknown))}")
+    if router is None and model is None:
+        router, model, model_columns = load_models()
+
+    bills = bills.reset_index(drop=True)
+    n_scenarios, n_bills = len(scenarios), len(bills)
+    base = np.full(n_bills, np.nan)
+    probs = np.full((n_scenarios, n_bills), np.nan)
+    stages = np.full(n_bills, None, dtype=object)
+
+    if router is not None:
+        from stage_router import assign_stages, stage_features
+        from bill_store import OFFSET_COLUMNS
+
+        frame = bills.copy()
+        for column in OFFSET_COLUMNS:
+            if column not in frame.columns:
+                frame[column] = np.nan
+        stages = assign_stages(frame['introduction_date'], as_of).astype(object)
+        groups = [(stage, scorer, np.flatnonzero(stages == stage)) for stage, scorer in router.scorers.items()]
+        groups = [(scorer, pd.concat([frame.iloc[rows], stage_features(frame.iloc[rows], stage)], axis=1),
+                   scorer.columns, rows) for stage, scorer, rows in groups if len(rows)]
+    elif model is not None:
+        groups = [(model, bills, list(model_columns), np.arange(n_bills))]
+    else:
+        raise RuntimeError("No trained model available for scenarios")
+
+    for scorer, inputs, columns, rows in groups:
+        matrix = build_inference_features(inputs, columns).to_numpy()
+        base[rows] = _score(scorer, matrix)
+        probs[:, rows] = score_variants(scorer, variant_matrix(matrix, columns, overrides))
+
+    result = pd.DataFrame({
+        'scenario': np.repeat(scenarios['scenario'].to_numpy(), n_bills),
+        'bill_id': np.tile(bills['bill_id'].to_numpy(), n_scenarios),
+        'title': np.tile(bills['title'].to_numpy(), n_scenarios),
+        'stage': np.tile(stages, n_scenarios),
+        'base_probability': np.tile(base, n_scenarios),
+        'probability': probs.reshape(-1),
+    })
+    result['delta'] = result['probability'] - result['base_probability']
+    return result.merge(scenarios, on='scenario', how='left')[RESULT_COLUMNS + list(overrides.columns)]
+
+
+def scenario_summary(result):
+    """Mean probability and change per scenario, for charting"""
+    keys = ['scenario'] + [c for c in result.columns if c not in RESULT_COLUMNS]
+    summary = result.groupby('scenario', sort=True).agg(
+        bills=('bill_id', 'size'), mean_probability=('probability', 'mean'), mean_delta=('delta', 'mean'))
+    overrides = result[keys].drop_duplicates('scenario').set_index('scenario')
+    return overrides.join(summary).reset_index()
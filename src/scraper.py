@@ -2,53 +2,166 @@
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
+import os
 import time
 import random
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
+import queue
+import threading
+from datetime import datetime
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+import tracing
+import bill_store
+import bill_text
+import changes
+import snapshots
+from dates import normalize_dates
+from ministry import normalize_ministries
 
 
 BASE_URL = "https://prsindia.org"
 Tracking_URL = "https://prsindia.org/billtrack"
 
-def get_soup(url):
+# Pipeline defaults: network-bound fetchers, CPU-bound parsers (None = one per core)
+FETCH_WORKERS = 10
+PARSE_WORKERS = None
+QUEUE_SIZE = 50
+# How often a fetcher blocked on a full queue checks whether the pipeline was stopped
+PUT_TIMEOUT = 0.5
+
+# Listing discovery: facet filters crawled in parallel, each followed through ?page=N
+LISTING_FACETS = {
+    'year': [str(y) for y in range(2000, datetime.now().year + 1)],
+    'house': ['Lok Sabha', 'Rajya Sabha'],
+    'status': ['Pending', 'Passed', 'Lapsed', 'Withdrawn', 'Negatived'],
+}
+LISTING_WORKERS = 8
+MAX_LISTING_PAGES = 200
+OUTPUT_PATH = 'data/indian_bills.csv'
+# Bills in any other status can still change and are re-scraped by incremental runs
+FINAL_STATUSES = ['Enacted', 'Withdrawn', 'Lapsed', 'Negatived']
+
+def fetch_page(url):
+    """Download the raw page bytes, or None if the request failed"""
     try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+        with tracing.span('scraper.fetch', url):
+            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
         if response.status_code == 200:
-            return BeautifulSoup(response.content, 'html.parser')
+            return response.content
     except Exception as e:
         print(f"Error fetching {url}: {e}")
     return None
 
-def fetch_all_bill_links():
-    print(f"Fetching bill list from {Tracking_URL}...")
-    soup = get_soup(Tracking_URL)
-    if not soup:
-        return []
-    
-    bill_links = []
-    # Find all links that look like bill pages. 
-    # Examining the site, they are usually in div.views-row or similar containers
-    # We'll look for any anchor href identifying as /billtrack/bill-name
-    
+def get_soup(url):
+    content = fetch_page(url)
+    if content is None:
+        return None
+    with tracing.span('scraper.parse_html', url):
+        return BeautifulSoup(content, 'html.parser')
+
+def parse_bill_links(soup):
+    """Bill page URLs on a listing page, in page order without duplicates"""
+    # Bill pages are anchors of the form /billtrack/bill-name
+    links = {}
     for a in soup.find_all('a', href=True):
         href = a['href']
+        if href.startswith(BASE_URL):
+            href = href[len(BASE_URL):]
         if href.startswith('/billtrack/') and len(href.split('/')) == 3:
-            full_url = BASE_URL + href
-            if full_url not in bill_links:
-                bill_links.append(full_url)
-    
-    # Remove duplicates and filtered pages if any
-    bill_links = list(set(bill_links))
-    print(f"Found {len(bill_links)} unique bill links.")
+            links[BASE_URL + href] = None
+    return list(links)
+
+def listing_page(params, page=0):
+    """Bill links on one page of a (filtered) listing, or None if it could not be fetched"""
+    query = urlencode(dict(params, page=page)) if params or page else ''
+    soup = get_soup(f"{Tracking_URL}?{query}" if query else Tracking_URL)
+    return parse_bill_links(soup) if soup else None
+
+def crawl_listing(params, known_urls=frozenset(), max_pages=MAX_LISTING_PAGES, first_page=None):
+    """
+    Follow one (optionally filtered) listing through its pages.
+    The listing is newest first, so the crawl stops at the first page whose
+    links are all already known, as well as at the first page with nothing new.
+    `first_page` reuses already fetched page 0 links.
+    """
+    found = {}
+    for page in range(max_pages):
+        links = first_page if page == 0 and first_page is not None else listing_page(params, page)
+        if not links:
+            break
+        fresh = [link for link in links if link not in found]
+        if not fresh:
+            break
+        found.update(dict.fromkeys(fresh))
+        if known_urls and all(link in known_urls for link in fresh):
+            break
+    return list(found)
+
+def narrowing_facets(facets, unfiltered, executor):
+    """
+    First pages of the facet listings whose filter the site applies. A facet
+    is kept when at least one of its values gives a first page different
+    from the unfiltered one; otherwise the site ignores the parameter and
+    crawling it would only repeat the unfiltered listing.
+    """
+    listings = [{name: value} for name, values in facets.items() for value in values]
+    first_pages = list(executor.map(listing_page, listings))
+    kept = {name for params, links in zip(listings, first_pages) for name in params
+            if links is not None and links != unfiltered}
+    for name in facets:
+        if name not in kept:
+            print(f"Skipping the '{name}' facet: it does not narrow the listing")
+    return [(params, links) for params, links in zip(listings, first_pages) if links and next(iter(params)) in kept]
+
+def fetch_all_bill_links(facets=None, known_urls=None, workers=LISTING_WORKERS, max_pages=MAX_LISTING_PAGES):
+    """
+    Discover bill links from the unfiltered listing plus every facet filter
+    (year, house, status) that narrows it, crawling the listings in parallel.
+    Pass the URLs already scraped as `known_urls` to stop each listing once
+    it reaches them.
+    """
+    facets = LISTING_FACETS if facets is None else facets
+    known_urls = frozenset(known_urls or ())
+
+    print(f"Fetching bill list from {Tracking_URL}...")
+    unfiltered = listing_page({})
+    if not unfiltered:
+        print("Could not fetch the bill listing.")
+        return []
+    bill_links = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        listings = [({}, unfiltered)] + narrowing_facets(facets, unfiltered, executor)
+        print(f"Crawling {len(listings)} listings...")
+        crawled = executor.map(lambda listing: crawl_listing(listing[0], known_urls, max_pages, listing[1]), listings)
+        for links in crawled:
+            bill_links.update(dict.fromkeys(links))
+
+    bill_links = list(bill_links)
+    new_count = sum(1 for link in bill_links if link not in known_urls)
+    print(f"Found {len(bill_links)} unique bill links ({new_count} new).")
     return bill_links
 
 
-def extract_bill_details(url):
-    soup = get_soup(url)
+def extract_bill_details(url, content=None):
+    # content lets callers parse an already downloaded page (or a saved fixture)
+    if content is not None:
+        with tracing.span('scraper.parse_html', url):
+            soup = BeautifulSoup(content, 'html.parser')
+    else:
+        soup = get_soup(url)
     if not soup:
         return None
 
+    with tracing.span('scraper.extract', url):
+        return _extract_fields(url, soup)
+
+
+def _extract_fields(url, soup):
+    """Pull the bill fields out of a parsed bill page"""
     detail = {
         'url': url,
         'title': 'Unknown',
@@ -60,7 +173,9 @@ def extract_bill_details(url):
         'passed_rs': None,
         'assent_date': None,
         'type': 'Government',
-        'short_title': 'Unknown'
+        'short_title': 'Unknown',
+        'text_url': None,
+        'summary_url': None
     }
 
     # 1. Title
@@ -163,6 +278,9 @@ def extract_bill_details(url):
         if date_span:
              detail['assent_date'] = date_span.get_text(strip=True)
 
+    # Linked bill text / summary documents (ingested by bill_text.py)
+    detail.update(bill_text.document_links(soup, BASE_URL))
+
     # 6. Determine Status
     # Priority: Enacted > Passed > Passed One House > Introduced > Withdrawn
     
@@ -192,55 +310,170 @@ def extract_bill_details(url):
 
 
 
-def scrape_bill_safe(link):
+def parse_bill_safe(url, content):
+    """
+    Parse pool task. Runs in a worker process, so the parse time is returned
+    alongside the result and recorded by the parent.
+    """
+    start = time.perf_counter()
     try:
-        # random sleep to be polite even with threads, but shorter
-        return extract_bill_details(link)
+        detail = extract_bill_details(url, content)
     except Exception as e:
-        print(f"Error scraping {link}: {e}")
-        return None
+        print(f"Error parsing {url}: {e}")
+        detail = None
+    return detail, time.perf_counter() - start
 
-def scrape_bills(limit=None):
-    links = fetch_all_bill_links()
-    if limit:
-        links = links[:limit]
-    
+def _fetch_into(url, pages, stop):
+    """
+    Fetch task. put() blocks while the queue is full, which throttles the
+    fetchers; it wakes up every PUT_TIMEOUT so a stopped pipeline (parse pool
+    died, consumer raised) releases its threads instead of waiting forever.
+    """
+    if stop.is_set():
+        return
+    try:
+        content = fetch_page(url)
+    except Exception as e:
+        print(f"Error fetching {url}: {e}")
+        content = None
+    while not stop.is_set():
+        try:
+            pages.put((url, content), timeout=PUT_TIMEOUT)
+            return
+        except queue.Full:
+            continue
+
+def scrape_pages(links, fetch_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS, queue_size=QUEUE_SIZE, first_id=1000):
+    """
+    Two-stage pipeline: a thread pool downloads raw pages into a bounded queue
+    and a process pool parses them, so parsing scales with cores instead of
+    being serialized by the GIL. At most `queue_size` pages wait in the queue
+    and at most `queue_size` parse tasks are in flight. If parsing fails
+    (e.g. a BrokenProcessPool), pending fetches are cancelled and blocked
+    fetchers released before the error is raised.
+    """
+    pages = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
     data = []
-    print(f"Scraping {len(links)} bills with threading...")
-    
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_url = {executor.submit(scrape_bill_safe, url): url for url in links}
-        
-        for i, future in enumerate(as_completed(future_to_url)):
-            url = future_to_url[future]
+    failed = 0
+
+    def collect(done):
+        for future in done:
             try:
-                info = future.result()
-                if info:
-                    info['bill_id'] = 1000 + i 
-                    data.append(info)
-                if i % 50 == 0:
-                    print(f"Processed {i}/{len(links)} bills...")
+                info, seconds = future.result()
+            except BrokenProcessPool:
+                raise
             except Exception as e:
                 print(f"Generated an exception: {e}")
+                continue
+            if info:
+                tracing.record('scraper.parse', seconds, info['url'])
+                info['bill_id'] = first_id + len(data)
+                data.append(info)
+                if len(data) % 50 == 0:
+                    print(f"Processed {len(data)}/{len(links)} bills...")
+
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetchers, \
+            ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+        try:
+            for url in links:
+                fetchers.submit(_fetch_into, url, pages, stop)
+
+            in_flight = set()
+            for _ in range(len(links)):
+                url, content = pages.get()
+                if content is None:
+                    failed += 1
+                    continue
+                in_flight.add(parsers.submit(parse_bill_safe, url, content))
+                if len(in_flight) >= queue_size:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+            collect(wait(in_flight).done)
+        except BaseException:
+            stop.set()
+            fetchers.shutdown(wait=False, cancel_futures=True)
+            parsers.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    if failed:
+        print(f"Failed to fetch {failed} pages.")
+    return data
+
+def scrape_bills(limit=None, fetch_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS, queue_size=QUEUE_SIZE,
+                 incremental=False):
+    """
+    Scrape PRS bill pages into data/indian_bills.csv. With incremental=True
+    only bills missing from the existing file, plus known bills whose status
+    is not final (they may have moved on), are scraped; re-scraped bills
+    replace their old rows and keep their bill_id.
+    """
+    existing = pd.DataFrame()
+    known_urls = set()
+    refresh = []
+    if incremental and os.path.exists(OUTPUT_PATH):
+        existing = pd.read_csv(OUTPUT_PATH)
+        known_urls = set(existing['url'].dropna())
+        refresh = existing.loc[~existing['status'].isin(FINAL_STATUSES), 'url'].dropna().unique().tolist()
+
+    with tracing.span('scraper.fetch_links'):
+        links = fetch_all_bill_links(known_urls=known_urls)
+    links = [link for link in links if link not in known_urls]
+    if limit:
+        links = links[:limit]
+    if not links and not refresh:
+        print("No new bills to scrape.")
+        return
+    
+    first_id = int(existing['bill_id'].max()) + 1 if not existing.empty else 1000
+    print(f"Scraping {len(links)} new and {len(refresh)} pending bills ({fetch_workers} fetch threads, "
+          f"{parse_workers or os.cpu_count()} parse processes)...")
+    data = scrape_pages(links + refresh, fetch_workers, parse_workers, queue_size, first_id)
+    if not data:
+        print("No bills scraped.")
+        return
                 
     df = pd.DataFrame(data)
+    if not existing.empty:
+        # Re-scraped bills keep their id; new bills are numbered after the existing ones
+        known_ids = existing.drop_duplicates('url').set_index('url')['bill_id']
+        df['bill_id'] = df['url'].map(known_ids)
+        new = df['bill_id'].isna()
+        df.loc[new, 'bill_id'] = range(first_id, first_id + int(new.sum()))
+        df['bill_id'] = df['bill_id'].astype(int)
+        existing = existing[~existing['url'].isin(df['url'])]
     
     # Post-processing to match schema
     # bill_id,title,short_title,ministry,type,status,introduction_date,house,passed_ls,passed_rs,assent_date,total_actions
     
     # We should parse date format from "Aug 08, 2024" to "2024-08-08" for compatibility with dashboard
     for col in ['introduction_date', 'passed_ls', 'passed_rs', 'assent_date']:
-        df[col] = pd.to_datetime(df[col], errors='coerce').dt.strftime('%Y-%m-%d')
+        df[col] = normalize_dates(df[col], source='prs', column=col).dt.strftime('%Y-%m-%d')
 
     df['total_actions'] = df.apply(lambda x: 10 if x['status'] == 'Enacted' else 5, axis=1) # Mocked
+
+    if not existing.empty:
+        df = pd.concat([existing, df], ignore_index=True)
+    df['ministry'] = normalize_ministries(df['ministry'])
     
     # Save
-    output_path = 'data/indian_bills.csv'
+    output_path = OUTPUT_PATH
     df.to_csv(output_path, index=False)
     print(f"Saved {len(df)} bills to {output_path}")
+    detected = changes.detect_refresh(df, 'prs')
+    count = bill_store.upsert_bills(df, source='prs')
+    print(f"Upserted {count} bills into {bill_store.DB_FILE}")
+    changes.publish_changes(detected)
+    count = snapshots.append_snapshot(df, source='prs')
+    print(f"Appended a snapshot of {count} bills to {snapshots.SNAPSHOT_DIR}")
+    tracing.print_summary()
 
 if __name__ == "__main__":
-    # Scrape all bills with threading
-    scrape_bills(limit=None)
+    # Scrape all bills: threads fetch, processes parse
+    # --incremental only scrapes bills not already in data/indian_bills.csv, plus known bills that are not final
+    # --documents also ingests the linked bill text / summary documents (bill_text.py)
+    scrape_bills(limit=None, incremental='--incremental' in sys.argv)
+    if '--documents' in sys.argv and os.path.exists(OUTPUT_PATH):
+        bill_text.ingest_documents(pd.read_csv(OUTPUT_PATH, dtype={'bill_id': str}))
   
  
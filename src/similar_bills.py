@@ -0,0 +1,190 @@
+"""
+"Bills like this one": a precomputed nearest-neighbour index over past bills.
+
+Each bill is a sparse vector of its title's TF-IDF terms plus its canonical
+ministry, title flags (amendment / appropriation / finance) and a 5-year
+introduction window, L2-normalized so a dot product is a cosine similarity.
+build_index runs once at ingest (process_bills): it multiplies the corpus
+matrix against the decided bills in bounded row blocks and keeps only each
+bill's top NEIGHBORS matches. The dashboard then answers a lookup by reading
+one precomputed row; titles that are not in the index are vectorized and
+scored with a single sparse product.
+"""
+
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from features import PASSED_STATUSES, FAILED_STATUSES
+from ministry import normalize_ministries
+
+INDEX_PATH = 'data/similar_bills.pkl'
+NEIGHBORS = 20
+# Relative weight of each block of the bill vector
+WEIGHTS = {'title': 1.0, 'ministry': 0.6, 'flags': 0.3, 'period': 0.3}
+FLAG_COLUMNS = ['is_amendment', 'is_appropriation', 'is_finance']
+PERIOD_YEARS = 5
+# Cells of the dense similarity block computed at a time (bounds memory)
+BLOCK_CELLS = 20_000_000
+BILL_COLUMNS = ['bill_id', 'title', 'ministry', 'year', 'status']
+# What save() persists, in constructor order
+STATE = ['vectorizer', 'ministries', 'periods', 'matrix', 'bills', 'neighbors', 'scores']
+
+
+def _one_hot(values, vocabulary):
+    index = {value: i for i, value in enumerate(vocabulary)}
+    cols = pd.Series(values).map(index)
+    rows = np.flatnonzero(cols.notna().to_numpy())
+    data = np.ones(len(rows))
+    return sparse.csr_matrix((data, (rows, cols.iloc[rows].to_numpy(dtype=int))),
+                             shape=(len(values), len(vocabulary)))
+
+
+def _title_keys(titles):
+    return titles.fillna('').astype(str).str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip()
+
+
+def _periods(years):
+    years = pd.to_numeric(pd.Series(years), errors='coerce').fillna(0).astype(int)
+    return (years // PERIOD_YEARS * PERIOD_YEARS).to_numpy()
+
+
+class SimilarBills:
+    """Vectorizer, bill vectors and precomputed top-k neighbours of a bill corpus"""
+
+    def __init__(self, vectorizer, ministries, periods, matrix, bills, neighbors, scores):
+        self.vectorizer = vectorizer
+        self.ministries = ministries
+        self.periods = periods
+        self.matrix = matrix
+        self.bills = bills
+        self.neighbors = neighbors
+        self.scores = scores
+        # First row per bill_id, matching data_fetch.lookup_bill
+        ids = bills['bill_id'].astype(str)
+        first = ~ids.duplicated().to_numpy()
+        self.positions = dict(zip(ids[first], np.flatnonzero(first)))
+        # Candidate neighbours: decided bills, one row per title (the export repeats some
+        # bills as both Passed and Assented; the Assented row is kept)
+        self.title_keys = _title_keys(bills['title']).to_numpy()
+        decided = bills[bills['status'].isin(PASSED_STATUSES + FAILED_STATUSES)]
+        decided = decided.assign(_key=self.title_keys[decided.index], _rank=decided['status'].ne('Assented'))
+        decided = decided.sort_values('_rank', kind='stable').drop_duplicates('_key')
+        self.historical = np.sort(decided.index.to_numpy())
+
+    def vectorize(self, df):
+        """Normalized bill vectors for a frame with title, ministry, year and the title flags"""
+        title = self.vectorizer.transform(df['title'].fillna('').astype(str))
+        ministry = _one_hot(normalize_ministries(df['ministry']), self.ministries)
+        flags = sparse.csr_matrix(df[FLAG_COLUMNS].fillna(0).to_numpy(dtype=float))
+        period = _one_hot(_periods(df['year']), self.periods)
+        matrix = sparse.hstack([
+            title * WEIGHTS['title'], ministry * WEIGHTS['ministry'],
+            flags * WEIGHTS['flags'], period * WEIGHTS['period'],
+        ]).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms) @ matrix
+
+    def _frame(self, positions, scores):
+        out = self.bills.iloc[positions].reset_index(drop=True)
+        out['similarity'] = scores
+        return out
+
+    def for_bill(self, bill_id, k=5):
+        """Top-k most similar decided bills for an indexed bill (empty if unknown)"""
+        position = self.positions.get(str(bill_id))
+        if position is None:
+            return self._frame([], [])
+        neighbors = self.neighbors[position]
+        # Skip other rows of the same bill
+        keep = (neighbors >= 0) & (self.title_keys[neighbors] != self.title_keys[position])
+        return self._frame(neighbors[keep][:k], self.scores[position][keep][:k])
+
+    def query(self, df, k=5):
+        """Top-k decided bills for one bill that is not in the index"""
+        sims = (self.matrix[self.historical] @ self.vectorize(df.head(1)).T).toarray().ravel()
+        top = np.argsort(-sims)[:k]
+        return self._frame(self.historical[top], sims[top])
+
+    def save(self, path=INDEX_PATH):
+        # Atomic: serving processes reload the index when the file changes
+        from model_registry import dump_atomic
+        dump_atomic({name: getattr(self, name) for name in STATE}, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        state = joblib.load(path)
+        return cls(*(state[name] for name in STATE))
+
+
+def top_neighbors(matrix, candidates, k=NEIGHBORS):
+    """
+    (neighbors, scores): for every row of `matrix`, the k most similar rows
+    among `candidates`, excluding itself. Computed in row blocks so only a
+    block x len(candidates) dense matrix exists at a time.
+    """
+    n = matrix.shape[0]
+    k = min(k, len(candidates))
+    neighbors = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if not k:
+        return neighbors, scores
+
+    candidate_matrix = matrix[candidates].T.tocsc()
+    block = max(1, BLOCK_CELLS // max(len(candidates), 1))
+    for start in range(0, n, block):
+        rows = np.arange(start, min(start + block, n))
+        sims = (matrix[rows] @ candidate_matrix).toarray()
+        # A bill is not its own neighbour
+        self_hits = np.flatnonzero(np.isin(candidates, rows))
+        sims[rows.searchsorted(candidates[self_hits]), self_hits] = -np.inf
+
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_sims = np.take_along_axis(top_sims, order, axis=1)
+        valid = np.isfinite(top_sims)
+        neighbors[rows] = np.where(valid, candidates[top], -1)
+        scores[rows] = np.where(valid, top_sims, 0)
+    return neighbors, scores
+
+
+def build_index(df, k=NEIGHBORS):
+    """Fit the vectorizer on the corpus titles and precompute every bill's top-k decided neighbours"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    df = df.reset_index(drop=True)
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), min_df=2, sublinear_tf=True,
+                                 token_pattern=r'(?u)\b[a-zA-Z][a-zA-Z]+\b')
+    vectorizer.fit(df['title'].fillna('').astype(str))
+
+    ministries = sorted(normalize_ministries(df['ministry']).unique())
+    periods = sorted(np.unique(_periods(df['year'])))
+    bills = df[BILL_COLUMNS].copy()
+    bills['ministry'] = normalize_ministries(bills['ministry'])
+
+    index = SimilarBills(vectorizer, ministries, periods, None, bills, None, None)
+    index.matrix = index.vectorize(df)
+    index.neighbors, index.scores = top_neighbors(index.matrix, index.historical, k)
+    return index
+
+
+def index_version(path=INDEX_PATH):
+    """Changes whenever the index file is rewritten; None if it has not been built"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def load_index(path=INDEX_PATH):
+    """The similar-bills index if it has been built, else None"""
+    if not os.path.exists(path):
+        return None
+    return SimilarBills.load(path)
@@ -0,0 +1,235 @@
+"""
+Append-only, point-in-time snapshots of bill state.
+
+Every ingest (process_bills, the PRS scraper) appends the state it saw,
+stamped with snapshot_at, as a new Parquet file in a month partition:
+
+    data/snapshots/month=2025-08/20250811T093000-3f2a1c9e.parquet
+
+Files are never rewritten, so what was known about any bill at any moment
+can be recovered later. state_as_of and training_set answer those questions
+with one vectorized as-of join (pd.merge_asof by bill_key) rather than a
+loop per bill: training_set(day=30) pairs every decided bill's state as it
+stood at the end of its 30th day with its eventual outcome, so stage models
+only learn from what was known at the time. backfill seeds the history
+before each bill's first snapshot from the event dates of an existing
+dataset, so it can run after the first ingest has already appended one.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from bill_store import prepare_bills, _parse_dates, EVENT_COLUMNS, OFFSET_EVENTS
+from features import PASSED_STATUSES, FAILED_STATUSES
+
+SNAPSHOT_DIR = 'data/snapshots'
+PARTITION = 'month'
+STATE_COLUMNS = ['bill_key', 'source', 'bill_id', 'title', 'ministry', 'type', 'status', 'house', 'year',
+                 'is_amendment', 'is_appropriation', 'is_finance']
+EVENT_DATE_COLUMNS = [f'{event}_date' for event in OFFSET_EVENTS]
+DATE_COLUMNS = ['introduction_date'] + EVENT_DATE_COLUMNS
+SNAPSHOT_COLUMNS = ['snapshot_at'] + STATE_COLUMNS + DATE_COLUMNS
+DECIDED_STATUSES = PASSED_STATUSES + FAILED_STATUSES
+
+
+def _schema():
+    import pyarrow as pa
+
+    types = {'snapshot_at': pa.timestamp('ns'), 'year': pa.int64(), 'is_amendment': pa.int64(),
+             'is_appropriation': pa.int64(), 'is_finance': pa.int64()}
+    types.update({column: pa.timestamp('ns') for column in DATE_COLUMNS})
+    return pa.schema([(column, types.get(column, pa.string())) for column in SNAPSHOT_COLUMNS])
+
+
+def _timestamps(values):
+    return pd.to_datetime(values, errors='coerce').astype('datetime64[ns]')
+
+
+def snapshot_frame(df, source, snapshot_at=None):
+    """The state of every bill in a processed/scraped frame, as snapshot rows"""
+    bills = prepare_bills(df, source)
+    out = bills[STATE_COLUMNS].copy()
+    out['introduction_date'] = _timestamps(bills['introduction_date'])
+    for event in OFFSET_EVENTS:
+        column = next((c for c in EVENT_COLUMNS[event] if c in df.columns), None)
+        out[f'{event}_date'] = _timestamps(_parse_dates(df[column])) if column else pd.NaT
+    out.insert(0, 'snapshot_at', pd.Timestamp(snapshot_at or datetime.now()).as_unit('ns'))
+    out[EVENT_DATE_COLUMNS] = out[EVENT_DATE_COLUMNS].astype('datetime64[ns]')
+    # Same bill twice in one frame: keep the first, as bill_store does
+    return out.drop_duplicates('bill_key', keep='first').reset_index(drop=True)
+
+
+def snapshot_files(root=SNAPSHOT_DIR, until=None):
+    """Snapshot files, skipping month partitions that start after `until`"""
+    files = sorted(glob.glob(os.path.join(root, f'{PARTITION}=*', '*.parquet')))
+    if until is not None:
+        last = pd.Timestamp(until).strftime('%Y-%m')
+        files = [f for f in files if os.path.basename(os.path.dirname(f)).split('=', 1)[1] <= last]
+    return files
+
+
+def write_snapshots(frame, root=SNAPSHOT_DIR):
+    """Append snapshot rows: one new file per month partition touched. Returns the rows written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    months = frame['snapshot_at'].dt.strftime('%Y-%m')
+    for month, part in frame.groupby(months, sort=True):
+        directory = os.path.join(root, f'{PARTITION}={month}')
+        os.makedirs(directory, exist_ok=True)
+        name = f"{part['snapshot_at'].max():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        # Written under a dot name (ignored by readers) and renamed into place
+        tmp = os.path.join(directory, f'.{name}.tmp')
+        pq.write_table(pa.Table.from_pandas(part[SNAPSHOT_COLUMNS], schema=_schema(), preserve_index=False), tmp)
+        os.replace(tmp, os.path.join(directory, name))
+    return len(frame)
+
+
+def append_snapshot(df, source, root=SNAPSHOT_DIR, snapshot_at=None):
+    """Record the current state of every bill in df. Returns the rows written."""
+    return write_snapshots(snapshot_frame(df, source, snapshot_at), root)
+
+
+def load_snapshots(root=SNAPSHOT_DIR, until=None, columns=None):
+    """All snapshot rows recorded up to and including `until` (default: all of them)"""
+    import pyarrow.dataset as ds
+
+    columns = columns or SNAPSHOT_COLUMNS
+    files = snapshot_files(root, until)
+    if not files:
+        return pd.DataFrame({column: pd.Series(dtype=field.type.to_pandas_dtype())
+                             for column, field in zip(SNAPSHOT_COLUMNS, _schema()) if column in columns})
+    dataset = ds.dataset(files, schema=_schema(), format='parquet')
+    where = ds.field('snapshot_at') <= pd.Timestamp(until) if until is not None else None
+    return dataset.to_table(columns=columns, filter=where).to_pandas()
+
+
+def latest_states(snapshots):
+    """Last snapshot row per bill"""
+    ordered = snapshots.sort_values('snapshot_at', kind='stable')
+    return ordered.drop_duplicates('bill_key', keep='last').reset_index(drop=True)
+
+
+def state_as_of(when=None, root=SNAPSHOT_DIR):
+    """Every bill's state as known at `when` (default: now)"""
+    return latest_states(load_snapshots(root, until=when or datetime.now()))
+
+
+def as_of_join(queries, snapshots):
+    """
+    For each (bill_key, as_of) query row, the last snapshot of that bill taken
+    strictly before as_of, in the order of `queries`. Queries without an
+    as_of or with no earlier snapshot get NaN state columns.
+    """
+    queries = queries[['bill_key', 'as_of']].reset_index(drop=True)
+    # An empty query frame comes in as object dtype; merge_asof needs matching key types
+    queries['bill_key'] = queries['bill_key'].astype(snapshots['bill_key'].dtype)
+    queries['as_of'] = _timestamps(queries['as_of'])
+    queries['_row'] = np.arange(len(queries))
+    known = queries[queries['as_of'].notna()].sort_values('as_of', kind='stable')
+    merged = pd.merge_asof(known, snapshots.sort_values('snapshot_at', kind='stable'),
+                           left_on='as_of', right_on='snapshot_at', by='bill_key',
+                           direction='backward', allow_exact_matches=False)
+    merged = queries.merge(merged.drop(columns=['bill_key', 'as_of']), on='_row', how='left')
+    return merged.drop(columns='_row')
+
+
+def training_set(day=None, cutoff=None, label_as_of=None, root=SNAPSHOT_DIR):
+    """
+    Leakage-free training rows. Each bill decided by `label_as_of` (default:
+    the latest snapshot) is labelled with that outcome (`status`), and gets
+    its features from the state known at its feature time: the end of its
+    `day`-th day (day 1 = introduction day) or, without `day`, the fixed
+    `cutoff` date. Event dates are those known by then, with days_to_<event>
+    offsets as stage_router.stage_features expects. Bills unknown or already
+    decided at their feature time are left out.
+    """
+    if (day is None) == (cutoff is None):
+        raise ValueError("Pass exactly one of day or cutoff")
+    snapshots = load_snapshots(root, until=label_as_of)
+    labels = latest_states(snapshots)
+    labels = labels[labels['status'].isin(DECIDED_STATUSES)]
+
+    if day is not None:
+        feature_time = labels['introduction_date'] + pd.Timedelta(days=day)
+    else:
+        feature_time = pd.Series(pd.Timestamp(cutoff), index=labels.index)
+    queries = pd.DataFrame({'bill_key': labels['bill_key'].to_numpy(), 'as_of': feature_time.to_numpy()})
+    rows = as_of_join(queries, snapshots).rename(columns={'status': 'status_as_of'})
+    rows['status'] = labels['status'].to_numpy()
+
+    rows = rows[rows['snapshot_at'].notna() & ~rows['status_as_of'].isin(DECIDED_STATUSES)].copy()
+    for column in EVENT_DATE_COLUMNS:
+        rows[column] = rows[column].where(rows[column] < rows['as_of'])
+        rows[f"days_to_{column[:-len('_date')]}"] = (rows[column] - rows['introduction_date']).dt.days
+    return rows.reset_index(drop=True)
+
+
+def backfill(df, source, root=SNAPSHOT_DIR, snapshot_at=None):
+    """
+    Seed the store with history from an existing dataset: for every known
+    event date of a bill, its state on that day (the events dated up to
+    then; 'Assented' from the assent date, else 'Pending'). Bills already in
+    the store (e.g. from the ingest that just ran) only get the dates before
+    their first snapshot, so running it again adds nothing; bills not in the
+    store also get their current state at `snapshot_at` (default: now).
+    Returns the rows written.
+    """
+    snapshot_at = pd.Timestamp(snapshot_at or datetime.now()).as_unit('ns')
+    current = snapshot_frame(df, source, snapshot_at)
+    stored = load_snapshots(root, columns=['bill_key', 'snapshot_at'])
+    first_seen = stored.groupby('bill_key')['snapshot_at'].min()
+    # History stops at the first snapshot of each bill (or at snapshot_at for new ones)
+    horizon = current['bill_key'].map(first_seen).fillna(snapshot_at).astype('datetime64[ns]')
+
+    dates = current.drop(columns='snapshot_at').assign(_horizon=horizon).melt(
+        id_vars=['bill_key', '_horizon'], value_vars=DATE_COLUMNS, value_name='snapshot_at')
+    dates = dates.loc[dates['snapshot_at'] < dates['_horizon'], ['bill_key', 'snapshot_at']].drop_duplicates()
+    history = dates.merge(current.drop(columns='snapshot_at'), on='bill_key')
+    for column in EVENT_DATE_COLUMNS:
+        history[column] = history[column].where(history[column] <= history['snapshot_at'])
+    history['status'] = np.where(history['assent_date'].notna(), 'Assented', 'Pending')
+    new_bills = current[~current['bill_key'].isin(first_seen.index)]
+    rows = pd.concat([history[SNAPSHOT_COLUMNS], new_bills], ignore_index=True)
+    if rows.empty:
+        print(f"{root} already holds the history of every bill")
+        return 0
+    return write_snapshots(rows, root)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Point-in-time bill snapshot store')
+    parser.add_argument('--root', default=SNAPSHOT_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    seed = commands.add_parser('backfill', help='seed bill history before the first snapshots from a processed bills CSV')
+    seed.add_argument('input', nargs='?', default='data/bills_processed.csv')
+    seed.add_argument('--source', default='lok_sabha')
+    build = commands.add_parser('training-set', help='build an as-of training set')
+    build.add_argument('--day', type=int)
+    build.add_argument('--cutoff')
+    build.add_argument('--label-as-of')
+    build.add_argument('--output')
+    args = parser.parse_args(argv)
+
+    if args.command == 'backfill':
+        count = backfill(pd.read_csv(args.input), args.source, args.root)
+        print(f"Wrote {count} snapshot rows to {args.root}")
+    else:
+        rows = training_set(args.day, args.cutoff, args.label_as_of, args.root)
+        print(f"{len(rows)} training rows")
+        print(rows['status'].value_counts())
+        if args.output:
+            rows.to_csv(args.output, index=False)
+            print(f"Saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,155 @@
+"""
+Stage-aware model routing by bill age.
+
+docs/model_architecture.md defines three time-aware models:
+New Bill (day 1), Early Stage (days 2-30) and Progressive (day 31 onward).
+Each bill is placed in its stage from its real introduction date, and each
+stage model only sees the events that had happened by the day its stage
+starts, so training and serving use the same point of view.
+
+The per-bill event offsets (days from introduction to referral, passage in
+each House and assent) are precomputed at ingest in the bill store's
+stage_index table; stage assignment and stage features are then vectorized
+comparisons. StageRouter.score groups a batch by stage and makes one
+scoring call per stage.
+"""
+
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from bill_store import event_offsets, OFFSET_COLUMNS
+from ensemble import EnsembleScorer, train_ensemble
+from features import build_training_features, build_inference_features
+
+STAGE_MODELS_PATH = 'data/stage_models.pkl'
+STAGES = ['new_bill', 'early_stage', 'progressive']
+# Day number (introduction day = day 1) on which each stage starts
+STAGE_START_DAY = {'new_bill': 1, 'early_stage': 2, 'progressive': 31}
+# Events the stage model may look at (as known on the stage's first day)
+STAGE_EVENTS = {
+    'new_bill': [],
+    'early_stage': ['referred_committee', 'passed_ls', 'passed_rs'],
+    'progressive': ['referred_committee', 'passed_ls', 'passed_rs'],
+}
+STAGE_LABELS = {'new_bill': 'New Bill', 'early_stage': 'Early Stage', 'progressive': 'Progressive'}
+
+
+def build_stage_index(df):
+    """introduction_date plus the days_to_<event> offsets, for frames not loaded from the bill store"""
+    index = event_offsets(df)
+    index.insert(0, 'introduction_date', pd.to_datetime(df['introduction_date'], errors='coerce'))
+    return index
+
+
+def days_active(introduction_dates, as_of=None):
+    """Day number of each bill as of `as_of` (day 1 = introduction day), NaN if undated"""
+    as_of = pd.Timestamp(as_of or pd.Timestamp.now()).normalize()
+    intro = pd.to_datetime(pd.Series(introduction_dates), errors='coerce')
+    return ((as_of - intro).dt.days + 1).to_numpy(dtype=float)
+
+
+def assign_stages(introduction_dates, as_of=None):
+    """Stage name per bill. Undated bills get the base-feature New Bill model."""
+    days = days_active(introduction_dates, as_of)
+    return np.select(
+        [days >= STAGE_START_DAY['progressive'], days >= STAGE_START_DAY['early_stage']],
+        ['progressive', 'early_stage'],
+        default='new_bill'
+    )
+
+
+def stage_features(frame, stage):
+    """
+    Event flags visible to a stage's model: 1 if the event happened before
+    the stage's first day. `frame` must carry the days_to_<event> offsets.
+    """
+    horizon = STAGE_START_DAY[stage] - 1
+    out = pd.DataFrame(index=frame.index)
+    for event in STAGE_EVENTS[stage]:
+        offsets = pd.to_numeric(frame[f'days_to_{event}'], errors='coerce')
+        out[f'{event}_seen'] = (offsets < horizon).astype(int)
+    return out
+
+
+def train_stage_models(df):
+    """
+    Fit one ensemble per stage. A stage is trained on decided bills that were
+    still undecided on the stage's first day, with that day's event flags.
+    """
+    X_base, y = build_training_features(df)
+    offsets = event_offsets(df.loc[X_base.index])
+
+    bundles = {}
+    for stage in STAGES:
+        horizon = STAGE_START_DAY[stage] - 1
+        eligible = ~(offsets['days_to_assent'] < horizon)
+        X = pd.concat([X_base, stage_features(offsets, stage)], axis=1)[eligible]
+        print(f"Training {STAGE_LABELS[stage]} model on {len(X)} bills...")
+        bundles[stage] = train_ensemble(X, y[eligible], X.columns)
+    return bundles
+
+
+def train_stage_models_as_of(snapshot_dir, label_as_of=None):
+    """
+    Fit one ensemble per stage from the snapshot store. Each stage sees every
+    bill as it was known at the end of the day before the stage starts
+    (snapshots.training_set), labelled with its outcome as of `label_as_of`.
+    """
+    from snapshots import training_set
+
+    bundles = {}
+    for stage in STAGES:
+        day = max(STAGE_START_DAY[stage] - 1, 1)
+        frame = training_set(day=day, label_as_of=label_as_of, root=snapshot_dir)
+        if frame.empty:
+            raise ValueError(f"No point-in-time training rows for the {STAGE_LABELS[stage]} model (day {day}) in "
+                             f"{snapshot_dir}: no decided bill has a snapshot from before then. Seed the history "
+                             f"with `python src/snapshots.py backfill`.")
+        X_base, y = build_training_features(frame)
+        X = pd.concat([X_base, stage_features(frame.loc[X_base.index], stage)], axis=1)
+        print(f"Training {STAGE_LABELS[stage]} model on {len(X)} point-in-time rows...")
+        bundles[stage] = train_ensemble(X, y, X.columns)
+    return bundles
+
+
+class StageRouter:
+    """Routes bills to their stage model and scores each stage in one batch"""
+
+    def __init__(self, bundles, parallel=True):
+        self.scorers = {stage: EnsembleScorer(bundle, parallel=parallel) for stage, bundle in bundles.items()}
+
+    @classmethod
+    def load(cls, path=STAGE_MODELS_PATH, parallel=True):
+        return cls(joblib.load(path), parallel=parallel)
+
+    def score(self, frame, as_of=None):
+        """
+        Passage probability and stage for every bill in `frame`, which needs
+        the model's base columns, introduction_date and the days_to_<event>
+        offsets (see bill_store.get_scoring_rows / build_stage_index).
+        """
+        frame = frame.reset_index(drop=True)
+        for column in OFFSET_COLUMNS:
+            if column not in frame.columns:
+                frame[column] = np.nan
+        stages = assign_stages(frame['introduction_date'], as_of)
+        probs = np.full(len(frame), np.nan)
+
+        for stage, scorer in self.scorers.items():
+            rows = np.flatnonzero(stages == stage)
+            if not len(rows):
+                continue
+            subset = frame.iloc[rows]
+            inputs = pd.concat([subset, stage_features(subset, stage)], axis=1)
+            probs[rows] = scorer.score(build_inference_features(inputs, scorer.columns).to_numpy())
+        return probs, stages
+
+
+def load_router(path=STAGE_MODELS_PATH):
+    """The stage router if stage models have been trained, else None"""
+    if not os.path.exists(path):
+        return None
+    return StageRouter.load(path)
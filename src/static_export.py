@@ -0,0 +1,276 @@
+"""
+Static, pre-rendered bill pages.
+
+Most dashboard traffic is read-only views of the same few hundred bills.
+export_site renders one HTML page per bill (details, timeline, probability
+gauge, recommendations) plus an index, so they can be served by any plain
+file server and the Streamlit app is left for interactive analysis:
+
+    python src/static_export.py [--output data/site] [--workers N] [--force]
+    python -m http.server --directory data/site
+
+Every bill is scored in one batch call (predict.predict_frame) and reduced
+to a plain page payload. Each payload is hashed, and manifest.json records
+the hash behind every page, so a rerun only re-renders bills whose data or
+prediction changed (and drops pages of bills that are gone). The pages that
+do need rendering are split into chunks rendered by a pool of worker
+processes. The gauge is inline SVG: pages need no JavaScript library.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+OUTPUT_DIR = 'data/site'
+MANIFEST = 'manifest.json'
+# Bump when the page layout changes so every page is rebuilt
+TEMPLATE_VERSION = 1
+CHUNKS_PER_WORKER = 4
+# Gauge bands as on the dashboard: (upper bound in %, colour)
+GAUGE_STEPS = [(30, 'lightgray'), (70, 'gray'), (100, 'lightblue')]
+
+STYLE = """body { font-family: sans-serif; max-width: 960px; margin: 2em auto; padding: 0 1em; color: #222; }
+table { border-collapse: collapse; width: 100%; }
+th, td { text-align: left; padding: 4px 8px; border-bottom: 1px solid #ddd; }
+.details, .metrics { display: flex; flex-wrap: wrap; gap: 1em 3em; }
+.metric { font-size: 1.6em; }
+.metric small { display: block; font-size: 0.5em; color: #666; }
+.high { background: #e6f4ea; } .low { background: #fce8e6; } .moderate { background: #fef7e0; }
+.analysis { padding: 0.8em; border-radius: 4px; }
+footer { margin-top: 3em; color: #666; font-size: 0.85em; }
+"""
+
+# Fills in "Days Active" in the reader's browser so pages do not go stale every day
+DAYS_ACTIVE_SCRIPT = """<script>
+document.querySelectorAll('[data-since]').forEach(function (el) {
+  var days = Math.floor((Date.now() - Date.parse(el.dataset.since)) / 86400000);
+  if (!isNaN(days)) el.textContent = days;
+});
+</script>"""
+
+
+def explanation(bill, stage, model):
+    """The dashboard's explanation of a prediction"""
+    from stage_router import STAGE_LABELS
+
+    if model == 'heuristic':
+        return "Uncertain status (Heuristic)."
+    if model == 'stage':
+        text = f"ML {STAGE_LABELS[stage]} Model Prediction"
+    else:
+        text = "ML Model Prediction (v2)"
+    text += f" based on: Year {int(bill.year)}, Ministry '{bill.ministry}'."
+    if int(bill.is_amendment):
+        text += " Identifed as Amendment Bill."
+    return text
+
+
+def page_name(bill_key):
+    # By bill_key: Lok Sabha bill numbers restart every year, so bill_id is not unique
+    return 'bills/' + re.sub(r'[^\w.-]', '_', str(bill_key)) + '.html'
+
+
+def _date(value):
+    return '' if value is None or value != value else str(value)[:10]
+
+
+def load_pages():
+    """Page payload (plain, JSON-serializable) for every bill, scored in one batch"""
+    import pandas as pd
+    import bill_store
+    import data_fetch
+    from predict import predict_frame, recommendations
+
+    rows = data_fetch.query_scoring_frame()
+    if rows.empty:
+        return []
+    if 'bill_key' not in rows.columns:
+        # CSV fallback (no bill store): the key the store would give each row
+        rows['bill_key'] = bill_store.prepare_bills(rows, 'lok_sabha')['bill_key'].to_numpy()
+    # One page per bill
+    rows = rows.drop_duplicates('bill_key', keep='first').reset_index(drop=True)
+    rows['introduction_date'] = pd.to_datetime(rows['introduction_date'], errors='coerce')
+    scores = predict_frame(rows)
+
+    pages = []
+    for row, probability, stage, model in zip(rows.to_dict('records'), scores['probability'],
+                                              scores['stage'], scores['model']):
+        bill = data_fetch.bill_record(row)
+        actions = data_fetch.build_actions(row)
+        timeline = actions.to_frame()
+        first_action = actions.first_date()
+        probability = round(float(probability), 4)
+        pages.append({
+            'path': page_name(row['bill_key']),
+            'bill_id': str(bill.bill_id),
+            'title': str(bill.title),
+            'house': bill.house,
+            'sponsor': str(bill.sponsor),
+            'introduced': _date(bill.introduced_date),
+            'status': str(bill.status),
+            'year': str(bill.year),
+            'is_amendment': bill.is_amendment == 1,
+            'type': bill.type,
+            'first_action': first_action.date().isoformat() if first_action is not None else '',
+            'timeline': timeline[['Date', 'Action']].values.tolist(),
+            'probability': probability,
+            'reason': explanation(bill, stage, model),
+            'recommendations': recommendations(probability, bill.type),
+        })
+    return pages
+
+
+def page_hash(page):
+    payload = json.dumps({'template': TEMPLATE_VERSION, 'page': page}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def gauge_svg(probability):
+    """Semicircular 0-100 gauge with the dashboard's bands and a dark blue bar"""
+    def arc(start, end, radius):
+        a0, a1 = math.pi * (1 - start / 100), math.pi * (1 - end / 100)
+        x0, y0 = 120 + radius * math.cos(a0), 120 - radius * math.sin(a0)
+        x1, y1 = 120 + radius * math.cos(a1), 120 - radius * math.sin(a1)
+        return f"M {x0:.1f} {y0:.1f} A {radius} {radius} 0 0 1 {x1:.1f} {y1:.1f}"
+
+    value = min(max(probability * 100, 0), 100)
+    parts, start = [], 0
+    for end, colour in GAUGE_STEPS:
+        parts.append(f'<path d="{arc(start, end, 90)}" stroke="{colour}" stroke-width="36" fill="none"/>')
+        start = end
+    if value > 0:
+        parts.append(f'<path d="{arc(0, value, 90)}" stroke="darkblue" stroke-width="14" fill="none"/>')
+    parts.append(f'<text x="120" y="115" text-anchor="middle" font-size="32">{value:.1f}</text>')
+    return ('<svg viewBox="0 0 240 135" width="320" role="img" aria-label="Probability">'
+            + ''.join(parts) + '</svg>')
+
+
+def render_page(page):
+    e = html.escape
+    p = page['probability']
+    band, label = (('high', '✅ High Probability') if p > 0.7 else
+                   ('low', '❌ Low Probability') if p < 0.3 else ('moderate', '⚠️ Moderate Probability'))
+    details = [('Bill ID', page['bill_id']), ('House', page['house']), ('Ministry/Sponsor', page['sponsor']),
+               ('Introduction Date', page['introduced']), ('Status', page['status']), ('Year', page['year']),
+               ('Is Amendment', 'Yes' if page['is_amendment'] else 'No'), ('Type', page['type'])]
+    metrics = [('Days Active', f'<span data-since="{e(page["first_action"])}">–</span>'),
+               ('Total Actions', len(page['timeline'])), ('Ministry', e(page['sponsor'])),
+               ('Bill Type', e(page['type']))]
+    timeline = ''.join(f"<tr><td>{e(date)}</td><td>{e(text)}</td></tr>" for date, text in page['timeline'])
+    advice = ''.join(f"<li><strong>{e(heading)}</strong>: {e(text)}</li>"
+                     for heading, text in page['recommendations'])
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{e(page['title'])}</title>
+<link rel="stylesheet" href="../style.css"></head><body>
+<p><a href="../index.html">← All bills</a></p>
+<h1>📄 {e(page['title'])}</h1>
+<div class="details">{''.join(f'<div><strong>{e(k)}:</strong> {e(str(v))}</div>' for k, v in details)}</div>
+<div class="metrics">{''.join(f'<div class="metric">{v}<small>{e(k)}</small></div>' for k, v in metrics)}</div>
+<h2>📅 Legislative Timeline</h2>
+<table><tr><th>Date</th><th>Action</th></tr>{timeline}</table>
+<h2>🔮 Passage Probability</h2>
+{gauge_svg(p)}
+<p class="analysis {band}"><strong>{label}</strong>: {e(page['reason'])}</p>
+<h2>💡 Strategic Recommendations</h2>
+<ul>{advice}</ul>
+<footer>Indian Parliament Bill Tracker | Static page generated {datetime.now():%d %B %Y %H:%M}</footer>
+{DAYS_ACTIVE_SCRIPT}
+</body></html>
+"""
+
+
+def render_index(pages):
+    e = html.escape
+    rows = ''.join(f"<tr><td><a href=\"{e(page['path'])}\">{e(page['bill_id'])}</a></td><td>{e(page['year'])}</td>"
+                   f"<td>{e(page['title'])}</td>"
+                   f"<td>{e(page['sponsor'])}</td><td>{e(page['status'])}</td>"
+                   f"<td>{page['probability']:.0%}</td></tr>" for page in pages)
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Indian Parliament Bill Tracker</title>
+<link rel="stylesheet" href="style.css"></head><body>
+<h1>🇮🇳 Indian Parliament Bill Tracker</h1>
+<p>{len(pages)} bills. Generated {datetime.now():%d %B %Y %H:%M}.</p>
+<table><tr><th>Bill ID</th><th>Year</th><th>Title</th><th>Ministry</th><th>Status</th><th>Passage</th></tr>{rows}</table>
+</body></html>
+"""
+
+
+def _write(path, text):
+    """Write via a temporary file so a file server never sees half a page"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _render_chunk(pages, output_dir):
+    for page in pages:
+        _write(os.path.join(output_dir, page['path']), render_page(page))
+    return len(pages)
+
+
+def render_pages(pages, output_dir, workers=None):
+    """Render pages in parallel worker processes (in this process when workers == 1)"""
+    if not pages:
+        return 0
+    if workers == 1:
+        return _render_chunk(pages, output_dir)
+    workers = workers or os.cpu_count() or 1
+    size = max(1, -(-len(pages) // (workers * CHUNKS_PER_WORKER)))
+    chunks = [pages[i:i + size] for i in range(0, len(pages), size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_render_chunk, chunks, [output_dir] * len(chunks)))
+
+
+def export_site(output_dir=OUTPUT_DIR, workers=None, force=False, pages=None):
+    """
+    Render the pages of every bill whose payload changed since the last
+    export (all of them with force). Returns the number of pages rendered.
+    """
+    started = time.perf_counter()
+    pages = load_pages() if pages is None else pages
+    os.makedirs(os.path.join(output_dir, 'bills'), exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    previous = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            previous = json.load(f)
+
+    hashes = {page['path']: page_hash(page) for page in pages}
+    stale = [page for page in pages if previous.get(page['path']) != hashes[page['path']]
+             or not os.path.exists(os.path.join(output_dir, page['path']))]
+    removed = [path for path in previous if path not in hashes]
+    rendered = render_pages(stale, output_dir, workers)
+    for path in removed:
+        if os.path.exists(os.path.join(output_dir, path)):
+            os.remove(os.path.join(output_dir, path))
+
+    if rendered or removed or not os.path.exists(os.path.join(output_dir, 'index.html')):
+        _write(os.path.join(output_dir, 'style.css'), STYLE)
+        _write(os.path.join(output_dir, 'index.html'), render_index(pages))
+    _write(manifest_path, json.dumps(hashes, indent=0, sort_keys=True))
+    print(f"Rendered {rendered} of {len(pages)} bill pages ({len(removed)} removed) "
+          f"in {time.perf_counter() - started:.1f}s; site in {output_dir}")
+    return rendered
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Export static HTML pages for every bill')
+    parser.add_argument('--output', default=OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='re-render every page')
+    args = parser.parse_args(argv)
+    export_site(args.output, args.workers, args.force)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,193 @@
+"""
+Lightweight timing spans for the dashboard and the data pipelines.
+
+Tracing is off unless BILL_TRACKER_TRACE=1 is set (or enable() is called).
+When off, span() hands back a shared no-op object and traced() calls straight
+through, so instrumented code pays roughly one attribute lookup.
+
+    with tracing.span('data_fetch.load_csv'):
+        ...
+
+    @tracing.traced('train_model.fit')
+    def fit(...):
+        ...
+
+Every stage gets a latency histogram; the registry can be exported as JSON
+or in the Prometheus text exposition format.
+"""
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+ENABLED = os.environ.get('BILL_TRACKER_TRACE', '').lower() in ('1', 'true', 'yes')
+
+# Histogram bucket upper bounds in seconds (Prometheus style, +Inf implied)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_LIMIT = 1000
+
+_lock = threading.Lock()
+_histograms = {}
+_recent = deque(maxlen=RECENT_LIMIT)
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Approximate quantile from the bucket counts (upper bound of the bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (self.max,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([str(b) for b in BUCKETS] + ['+Inf'], self.counts))
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'label', 'start')
+
+    def __init__(self, name, label):
+        self.name = name
+        self.label = label
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start, self.label)
+        return False
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+def span(name, label=None):
+    """Time a block under `name`; `label` (e.g. a URL) is kept in the recent-spans log"""
+    if not ENABLED:
+        return _NOOP
+    return _Span(name, label)
+
+
+def traced(name=None):
+    """Decorator form of span(); defaults to module.function as the stage name"""
+    def decorator(fn):
+        stage = name or f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Span(stage, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record(name, seconds, label=None):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(seconds)
+        _recent.append((time.time(), name, label, seconds))
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _recent.clear()
+
+
+def snapshot():
+    """Per-stage summary plus the most recent spans"""
+    with _lock:
+        stages = {name: hist.to_dict() for name, hist in sorted(_histograms.items())}
+        recent = [
+            {'timestamp': ts, 'stage': name, 'label': label, 'seconds': seconds}
+            for ts, name, label, seconds in _recent
+        ]
+    return {'enabled': ENABLED, 'stages': stages, 'recent': recent}
+
+
+def export_json(indent=2):
+    return json.dumps(snapshot(), indent=indent)
+
+
+def export_prometheus(metric='bill_tracker_stage_seconds'):
+    """Render every histogram in the Prometheus text exposition format"""
+    lines = [
+        f"# HELP {metric} Time spent per pipeline stage.",
+        f"# TYPE {metric} histogram",
+    ]
+    with _lock:
+        for name, hist in sorted(_histograms.items()):
+            stage = name.replace('\\', '\\\\').replace('"', '\\"')
+            cumulative = 0
+            for bound, n in zip([str(b) for b in BUCKETS] + ['+Inf'], hist.counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {hist.total}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {hist.count}')
+    return "\n".join(lines) + "\n"
+
+
+def print_summary():
+    """Print a per-stage timing table (used at the end of CLI runs)"""
+    stages = snapshot()['stages']
+    if not stages:
+        return
+    print(f"\n{'Stage':<32} {'Count':>7} {'Total(s)':>10} {'Mean(ms)':>10} {'p95(ms)':>10}")
+    for name, stats in stages.items():
+        print(f"{name:<32} {stats['count']:>7} {stats['sum']:>10.3f} "
+              f"{stats['mean'] * 1000:>10.2f} {stats['p95'] * 1000:>10.2f}")
@@ -1,4 +1,4 @@
-
+import argparse
 import pandas as pd
 import numpy as np
 import joblib
@@ -7,9 +7,26 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, accuracy_score
 from sklearn.preprocessing import OneHotEncoder
 
-def train_model():
+import tracing
+from features import build_training_features
+from bill_text import stored_features
+from ensemble import train_ensemble, EnsembleScorer, ENSEMBLE_PATH
+from stage_router import train_stage_models, train_stage_models_as_of, STAGE_MODELS_PATH
+import model_registry
+from incremental import training_labels
+
+def train_model(data_path='data/bills_processed.csv',
+                model_path='data/indian_bill_model.pkl',
+                columns_path='data/model_columns.pkl',
+                ensemble_path=ENSEMBLE_PATH,
+                stage_models_path=STAGE_MODELS_PATH,
+                registry_dir=model_registry.REGISTRY_DIR,
+                snapshot_dir=None,
+                label_as_of=None,
+                text_features=False):
     print("Loading data...")
-    df = pd.read_csv('data/bills_processed.csv')
+    with tracing.span('train_model.load'):
+        df = pd.read_csv(data_path)
     
     # 1. Define Target
     # Passed/Enacted = 1, Others = 0
@@ -19,34 +36,13 @@ def train_model():
     # Pending -> Exclude from training (can't learn from incomplete) or treat as 0?
     # Better to exclude Pending for training to have clear outcomes.
     
-    passed_statuses = ['Assented', 'Passed']
-    failed_statuses = ['Lapsed', 'Withdrawn', 'Negatived']
-    
-    # Filter out Unknown/Pending for training
-    df_train = df[df['status'].isin(passed_statuses + failed_statuses)].copy()
-    
-    df_train['target'] = df_train['status'].apply(lambda x: 1 if x in passed_statuses else 0)
-    
-    print(f"Target Distribution:\n{df_train['target'].value_counts()}")
-    
     # 2. Features
-    # Use: ministry, is_amendment, is_appropriation, is_finance, year
-    
-    # Handle missing values in Ministry
-    df_train['ministry'] = df_train['ministry'].fillna('Unknown')
+    # Use: ministry (top 20, one-hot), is_amendment, is_appropriation, is_finance, year
+    # plus, with text_features, the bill document features from `bill_text.py features`
+    with tracing.span('train_model.featurize'):
+        X, y = build_training_features(df, stored_features() if text_features else None)
     
-    # Top Ministries
-    top_ministries = df_train['ministry'].value_counts().nlargest(20).index
-    df_train['ministry_clean'] = df_train['ministry'].apply(lambda x: x if x in top_ministries else 'Other')
-    
-    # One-hot encode Ministry
-    # Numeric features: is_amendment, is_appropriation, is_finance, year
-    
-    features = pd.get_dummies(df_train[['ministry_clean']], drop_first=True)
-    numeric_features = df_train[['is_amendment', 'is_appropriation', 'is_finance', 'year']]
-    
-    X = pd.concat([features, numeric_features], axis=1)
-    y = df_train['target']
+    print(f"Target Distribution:\n{y.value_counts()}")
     
     # 3. Split
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -54,20 +50,68 @@ def train_model():
     # 4. Train
     print("Training Random Forest...")
     rf = RandomForestClassifier(n_estimators=100, random_state=42)
-    rf.fit(X_train, y_train)
+    with tracing.span('train_model.fit'):
+        rf.fit(X_train, y_train)
     
     # 5. Evaluate
-    y_pred = rf.predict(X_test)
+    with tracing.span('train_model.evaluate'):
+        y_pred = rf.predict(X_test)
     print("--- Classification Report ---")
     print(classification_report(y_test, y_pred))
     print(f"Accuracy: {accuracy_score(y_test, y_pred):.2f}")
+    metrics = {'rf_accuracy': accuracy_score(y_test, y_pred)}
+
+    # 5b. Weighted RF + GB + LR ensemble on the same split
+    bundle = stage_bundles = None
+    if ensemble_path:
+        print("Training RF + GB + LR ensemble...")
+        with tracing.span('train_model.fit_ensemble'):
+            bundle = train_ensemble(X_train, y_train, X.columns)
+        scorer = EnsembleScorer(bundle)
+        ensemble_prob = scorer.score(X_test.to_numpy(dtype=float))
+        ensemble_pred = (ensemble_prob >= 0.5).astype(int)
+        print(f"Ensemble Accuracy: {accuracy_score(y_test, ensemble_pred):.2f}")
+        metrics['ensemble_accuracy'] = accuracy_score(y_test, ensemble_pred)
+        # Baseline for incremental.py's drift check
+        metrics['ensemble_brier'] = float(np.mean((ensemble_prob - y_test.to_numpy()) ** 2))
+    
+    # 5c. Stage models (New Bill / Early Stage / Progressive)
+    # With a snapshot store they train on point-in-time rows instead of final records
+    if stage_models_path:
+        with tracing.span('train_model.fit_stages'):
+            if snapshot_dir:
+                stage_bundles = train_stage_models_as_of(snapshot_dir, label_as_of)
+            else:
+                stage_bundles = train_stage_models(df)
     
     # 6. Save
     print("Saving model and artifacts...")
-    joblib.dump(rf, 'data/indian_bill_model.pkl')
-    # Save columns to ensure alignment during inference
-    joblib.dump(X.columns.tolist(), 'data/model_columns.pkl')
+    # Columns are saved to ensure alignment during inference
+    artifacts = {'model': rf, 'columns': X.columns.tolist(), 'ensemble': bundle, 'stage_models': stage_bundles}
+    artifacts = {name: obj for name, obj in artifacts.items() if obj is not None}
+    paths = {'model': model_path, 'columns': columns_path, 'ensemble': ensemble_path, 'stage_models': stage_models_path}
+    with tracing.span('train_model.save'):
+        for name, obj in artifacts.items():
+            model_registry.dump_atomic(obj, paths[name])
+
+    # 7. Publish an immutable, checksummed version and switch serving to it
+    if registry_dir:
+        # labels: what this version was fitted on, so incremental.py can find new outcomes;
+        # the test split was never fitted, so it stays new for the first update
+        artifacts['labels'] = training_labels(df, y_train)
+        with tracing.span('train_model.publish'):
+            version = model_registry.publish(artifacts, X.columns, metrics=metrics,
+                                             data_path=data_path, registry_dir=registry_dir)
+        print(f"Published model version {version}")
     print("Done.")
+    tracing.print_summary()
+    return rf
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description='Train the bill passage models')
+    parser.add_argument('--snapshots', default=None, help='train stage models as of each stage from this snapshot store')
+    parser.add_argument('--label-as-of', default=None, help='only use outcomes known by this date')
+    parser.add_argument('--text-features', action='store_true',
+                        help='add the bill document features (run `bill_text.py features` first)')
+    args = parser.parse_args()
+    train_model(snapshot_dir=args.snapshots, label_as_of=args.label_as_of, text_features=args.text_features)
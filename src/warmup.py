@@ -0,0 +1,190 @@
+"""
+Lazy, process-wide loading of the dashboard's heavy dependencies.
+
+src/app.py only imports pandas, plotly and the model artifacts when a panel
+needs them. Each resource is loaded once per process and reused by later
+reruns and sessions. start() preloads everything on a background thread
+right after the first page render, so the first bill lookup usually finds
+it ready. Set BILL_TRACKER_WARMUP=0 to turn the background thread off.
+
+The model and stage router come from the model registry's CURRENT version
+(falling back to the legacy fixed paths); the similar-bills index is
+versioned by its file's mtime and size. get() checks those versions at most
+every RELOAD_INTERVAL seconds; when one moves (a new model is published,
+process_bills rebuilds the index), the new version is loaded on a background
+thread while requests keep using the old one, and swapped in once it is
+fully loaded.
+"""
+
+import os
+import threading
+import time
+
+import tracing
+
+ENABLED = os.environ.get('BILL_TRACKER_WARMUP', '1').lower() not in ('0', 'false', 'no')
+
+MODEL_PATH = 'data/indian_bill_model.pkl'
+COLUMNS_PATH = 'data/model_columns.pkl'
+RELOAD_INTERVAL = float(os.environ.get('BILL_TRACKER_RELOAD_INTERVAL', '5'))
+
+
+def _load_data():
+    import data_fetch
+    return data_fetch
+
+
+def _load_plotly():
+    import plotly.graph_objects as go
+    return go
+
+
+def _current_version():
+    import model_registry
+    return model_registry.current_version()
+
+
+def _load_model(version=None):
+    # Prefer the weighted RF + GB + LR ensemble, fall back to the single RF
+    if version is not None:
+        import model_registry
+        from ensemble import EnsembleScorer
+        if model_registry.has_artifact('ensemble', version):
+            scorer = EnsembleScorer(model_registry.load_artifact('ensemble', version))
+            return scorer, scorer.columns
+        return model_registry.load_artifact('model', version), model_registry.load_artifact('columns', version)
+
+    from ensemble import load_scorer
+    scorer = load_scorer()
+    if scorer is not None:
+        return scorer, scorer.columns
+    import joblib
+    return joblib.load(MODEL_PATH), joblib.load(COLUMNS_PATH)
+
+
+def _index_version():
+    from similar_bills import index_version
+    return index_version()
+
+
+def _load_similar(version=None):
+    from similar_bills import load_index
+    return load_index()
+
+
+def _load_router(version=None):
+    if version is not None:
+        import model_registry
+        from stage_router import StageRouter
+        if not model_registry.has_artifact('stage_models', version):
+            return None
+        return StageRouter(model_registry.load_artifact('stage_models', version))
+    from stage_router import load_router
+    return load_router()
+
+
+# Loaded in this order by the background thread
+LOADERS = {
+    'data': _load_data,
+    'model': _load_model,
+    'router': _load_router,
+    'similar': _load_similar,
+    'plotly': _load_plotly,
+}
+# Versioned resources and where their current version comes from
+VERSION_SOURCES = {
+    'model': _current_version,
+    'router': _current_version,
+    'similar': _index_version,
+}
+VERSIONED = set(VERSION_SOURCES)
+
+_values = {}
+_versions = {}
+_locks = {name: threading.Lock() for name in LOADERS}
+_start_lock = threading.Lock()
+_thread = None
+_reload_lock = threading.Lock()
+_reloading = set()
+_last_check = {}
+
+
+def _load(name, version=None):
+    with tracing.span(f'app.load_{name}'):
+        if name in VERSIONED:
+            return LOADERS[name](version)
+        return LOADERS[name]()
+
+
+def get(name):
+    """Load (once) and return a resource; waits if the warm-up thread is loading it"""
+    if name in _values:
+        if name in VERSIONED:
+            _check_version(name)
+        return _values[name]
+    with _locks[name]:
+        if name not in _values:
+            version = VERSION_SOURCES[name]() if name in VERSIONED else None
+            _values[name] = _load(name, version)
+            _versions[name] = version
+    return _values[name]
+
+
+def version(name):
+    """Version a loaded resource came from (None = legacy paths / no index)"""
+    return _versions.get(name)
+
+
+def _check_version(name):
+    now = time.monotonic()
+    if now - _last_check.get(name, 0.0) < RELOAD_INTERVAL:
+        return
+    _last_check[name] = now
+    latest = VERSION_SOURCES[name]()
+    if latest is None or latest == _versions.get(name):
+        return
+    with _reload_lock:
+        if name in _reloading:
+            return
+        _reloading.add(name)
+    threading.Thread(target=_reload, args=(name, latest), name=f'bill-tracker-reload-{name}', daemon=True).start()
+
+
+def _reload(name, version):
+    """Load a new version off the request path, then swap it in with one assignment"""
+    try:
+        value = _load(name, version)
+        with _locks[name]:
+            _values[name] = value
+            _versions[name] = version
+        print(f"Swapped {name} to version {version}")
+    except Exception as e:
+        # Keep serving the loaded version; the next check retries
+        print(f"Reload of {name} at version {version} failed: {e}")
+    finally:
+        with _reload_lock:
+            _reloading.discard(name)
+
+
+def is_ready(name):
+    return name in _values
+
+
+def _warm_all():
+    for name in LOADERS:
+        try:
+            get(name)
+        except Exception as e:
+            # The request path calls get() again and reports the error in the UI
+            print(f"Warm-up of {name} failed: {e}")
+
+
+def start():
+    """Start the background warm-up once per process"""
+    global _thread
+    if not ENABLED:
+        return
+    with _start_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_warm_all, name='bill-tracker-warmup', daemon=True)
+            _thread.start()
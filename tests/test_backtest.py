@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+import backtest
+from backtest import cutoff_metrics, decision_dates, group_cutoffs, session_cutoffs
+
+
+def test_decision_dates():
+    df = pd.DataFrame({
+        'status': ['Assented', 'Passed', 'Passed', 'Lapsed', 'Pending'],
+        'introduction_date': ['2020-02-03', '2020-02-03', '2020-08-01', '2015-03-01', '2020-02-03'],
+        'Debate/Date Passed in LS': [None, '2020-03-01', None, None, None],
+        'Debate/Date Passed in RS': [None, '2020-03-10', None, None, None],
+        'Assent Date': ['2020-04-01', None, None, None, None],
+    })
+    assert pd.DatetimeIndex(decision_dates(df)).strftime('%Y-%m-%d').fillna('NaT').tolist() == [
+        '2020-04-01',   # assent
+        '2020-03-10',   # the later House passage
+        '2020-11-25',   # no event dates: end of the session it was introduced in
+        '2019-05-24',   # failed: the Lok Sabha it was introduced in was dissolved
+        'NaT',          # undecided
+    ]
+
+
+def test_session_cutoffs_and_grouping():
+    cutoffs = session_cutoffs(years=1, end='2024-12-31')
+    assert [c.strftime('%Y-%m-%d') for c in cutoffs] == ['2024-02-01', '2024-07-20', '2024-11-25']
+    decided = np.array(['2024-03-01', 'NaT'], dtype='datetime64[ns]')
+    # Nothing was decided between the last two cutoffs, so they share a model
+    assert group_cutoffs(cutoffs, decided) == [cutoffs[:1], cutoffs[1:]]
+
+
+def test_cutoff_metrics():
+    y = np.array([1, 1, 0, 0])
+    metrics, bins = cutoff_metrics(y, np.array([0.9, 0.8, 0.2, 0.1]))
+    assert metrics['auc'] == 1.0
+    assert np.isclose(metrics['brier'], np.mean([0.01, 0.04, 0.04, 0.01]))
+    assert bins['count'].sum() == 4
+    assert np.isnan(cutoff_metrics(np.array([1, 1]), np.array([0.5, 0.6]))[0]['auc'])
+
+
+class FixedScorer:
+    def score(self, X):
+        return np.full(len(X), 0.7)
+
+
+def test_only_bills_pending_at_the_cutoff_are_scored(monkeypatch):
+    days = lambda *values: np.array(values, dtype='datetime64[ns]')
+    monkeypatch.setattr(backtest, '_shared', {
+        'X': np.zeros((4, 2)), 'y': np.array([1, 0, 1, -1]),
+        'introduced': days('2019-01-01', '2019-06-01', '2021-01-01', '2019-01-01'),
+        'decided': days('2019-12-01', '2020-06-01', '2021-05-01', 'NaT'),
+        'scorer': FixedScorer(),
+    })
+    [(cutoff, known, pending, probs)] = backtest._run_group('2020-01-01', ['2020-01-01'], ['a', 'b'])
+    # Bill 0 is already decided, bill 2 not introduced yet, bill 3 has no outcome
+    assert known == 1 and pending.tolist() == [1] and probs.tolist() == [0.7]
@@ -0,0 +1,104 @@
+import sqlite3
+
+import pandas as pd
+
+import bill_store
+
+
+def bills(titles, status='Pending'):
+    return pd.DataFrame({'bill_id': [22, 22], 'year': [2019, 2024], 'title': titles, 'ministry': 'Finance',
+                         'status': status, 'introduction_date': ['2019-07-01', '2024-02-01'],
+                         'is_amendment': 0, 'is_appropriation': 0, 'is_finance': 1})
+
+
+def test_title_correction_updates_the_same_bill(tmp_path):
+    path = str(tmp_path / 'bills.db')
+    bill_store.upsert_bills(bills(['The Finanse Bill, 2019', 'The Finance Bill, 2024']), 'lok_sabha', path)
+    bill_store.upsert_bills(bills(['The Finance Bill, 2019', 'The Finance Bill, 2024']), 'lok_sabha', path)
+    stored = bill_store.stored_state('lok_sabha', path)
+    assert stored['title'].tolist() == ['The Finance Bill, 2019', 'The Finance Bill, 2024']
+    assert bill_store.get_bill(22, path=path)['title'] == 'The Finance Bill, 2019'
+
+
+def test_prs_bills_are_keyed_by_url():
+    first = bill_store.make_bill_key('prs', 1000, 2024, 'https://prsindia.org/billtrack/a')
+    assert first == bill_store.make_bill_key('prs', 1001, 2025, 'https://prsindia.org/billtrack/a')
+    assert bill_store.make_bill_key('lok_sabha', 22, 2019) != bill_store.make_bill_key('lok_sabha', 22, 2024)
+
+
+def test_old_title_keys_are_migrated(tmp_path):
+    path = str(tmp_path / 'bills.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(bill_store.SCHEMA)
+    rows = [('old-a', 'lok_sabha', '22', 'The Finanse Bill, 2019', 2019),
+            ('old-b', 'lok_sabha', '22', 'The Finance Bill, 2019', 2019),
+            ('old-c', 'lok_sabha', '22', 'The Finance Bill, 2024', 2024)]
+    conn.executemany("INSERT INTO bills (bill_key, source, bill_id, title, year) VALUES (?, ?, ?, ?, ?)", rows)
+    conn.executemany("INSERT INTO events VALUES (?, 'introduced', '2019-07-01')", [('old-a',), ('old-b',)])
+    conn.commit()
+    conn.close()
+
+    conn = bill_store.connect(path)
+    keys = [row[0] for row in conn.execute("SELECT bill_key FROM bills ORDER BY rowid")]
+    events = [row[0] for row in conn.execute("SELECT bill_key FROM events")]
+    conn.close()
+    assert keys == [bill_store.make_bill_key('lok_sabha', '22', 2019), bill_store.make_bill_key('lok_sabha', '22', 2024)]
+    assert events == keys[:1]
+
+
+def events_frame():
+    return pd.DataFrame({'bill_id': [5, 6, 6], 'year': [2020, 2021, 2021], 'title': ['A Bill', 'B Bill', 'B Bill'],
+                         'ministry': 'Law', 'status': ['Assented', 'Pending', 'Pending'],
+                         'introduction_date': ['2020-03-01', '2021-07-10', '2021-07-10'],
+                         'Debate/Date Passed in LS': ['2020-03-11', None, None],
+                         'Assent Date': ['2020-04-01', None, None],
+                         'is_amendment': 1, 'is_appropriation': 0, 'is_finance': 0})
+
+
+def test_upsert_is_idempotent(tmp_path):
+    path = str(tmp_path / 'bills.db')
+    assert bill_store.upsert_bills(events_frame(), 'lok_sabha', path) == 2
+    first = bill_store.stored_state('lok_sabha', path).drop(columns='updated_at')
+    bill_store.upsert_bills(events_frame(), 'lok_sabha', path)
+    again = bill_store.stored_state('lok_sabha', path).drop(columns='updated_at')
+    pd.testing.assert_frame_equal(first, again)
+    conn = bill_store.connect(path)
+    counts = [conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ['bills', 'events', 'stage_index']]
+    conn.close()
+    assert counts == [2, 4, 2]
+
+
+def test_stored_state_round_trip(tmp_path):
+    path = str(tmp_path / 'bills.db')
+    bill_store.upsert_bills(events_frame(), 'lok_sabha', path)
+    stored = bill_store.stored_state('lok_sabha', path)
+    assert stored['bill_id'].tolist() == ['5', '6']
+    events = stored[['introduced', 'passed_ls', 'assent']]
+    assert events.iloc[0].tolist() == ['2020-03-01', '2020-03-11', '2020-04-01']
+    assert events.iloc[1, 0] == '2021-07-10' and events.iloc[1, 1:].isna().all()
+    only = bill_store.stored_state('lok_sabha', path, bill_keys=stored['bill_key'].iloc[1:])
+    assert only['bill_id'].tolist() == ['6']
+    assert bill_store.stored_state('prs', path).empty
+
+
+def test_scoring_rows_carry_the_stage_index(tmp_path):
+    path = str(tmp_path / 'bills.db')
+    bill_store.upsert_bills(events_frame(), 'lok_sabha', path)
+    rows = bill_store.get_scoring_rows([6, 5, 404], path=path)
+    assert rows['bill_id'].tolist() == ['5', '6']
+    assert rows['days_to_passed_ls'].tolist()[0] == 10
+    assert rows['days_to_assent'].tolist()[0] == 31
+    assert pd.isna(rows['days_to_passed_ls'].tolist()[1])
+    by_key = bill_store.get_scoring_rows_by_key(rows['bill_key'], path=path)
+    assert by_key['bill_key'].tolist() == rows['bill_key'].tolist()
+
+
+def test_scoring_rows_for_more_ids_than_sqlite_variables(tmp_path):
+    path = str(tmp_path / 'bills.db')
+    bill_store.upsert_bills(events_frame(), 'lok_sabha', path)
+    wanted = list(range(100_000)) + [5]
+    assert bill_store.get_scoring_rows(wanted, path=path)['bill_id'].tolist() == ['5', '6']
+    # The temporary id table is emptied between calls
+    assert bill_store.get_scoring_rows([6], path=path)['bill_id'].tolist() == ['6']
+    keys = bill_store.stored_state('lok_sabha', path)['bill_key'].tolist()
+    assert len(bill_store.get_scoring_rows_by_key(keys * 40_000, path=path)) == 2
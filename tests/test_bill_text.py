@@ -0,0 +1,81 @@
+import os
+
+import pandas as pd
+import pytest
+
+from bill_text import FEATURE_COLUMNS, TextStore, ingest_documents, join_text_features, text_features, title_key
+from features import build_training_features
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def fixture_links():
+    links = pd.read_csv(os.path.join(ROOT, 'benchmarks', 'fixtures', 'documents', 'links.csv'))
+    for column in ['text_url', 'summary_url']:
+        links[column] = links[column].map(lambda path: os.path.join(ROOT, path), na_action='ignore')
+    return links
+
+
+def test_title_key_ignores_case_and_punctuation():
+    keys = title_key(['The Boilers Bill, 2024', 'the  BOILERS bill 2024', None, ''])
+    assert keys[0] == keys[1] == 'the boilers bill 2024'
+    assert keys[2:].isna().all()
+
+
+def test_append_is_visible_after_reopening(tmp_path):
+    store = TextStore(str(tmp_path))
+    assert store.append([('the a bill 2020', 'text', 'a.txt', 'Text of A')]) == 1
+    store.append([('the b bill 2021', 'text', 'b.txt', 'Text of B'),
+                  ('the a bill 2020', 'text', 'a2.txt', 'Corrected text of A')])
+    store.close()
+
+    reopened = TextStore(str(tmp_path))
+    assert len(reopened) == 2
+    assert reopened.get('The A Bill, 2020') == 'Corrected text of A'
+    assert reopened.get('The B Bill, 2021') == 'Text of B'
+    assert reopened.get('The B Bill, 2021', 'summary') is None
+    assert reopened.urls() == {'a2.txt', 'b.txt'}
+    reopened.close()
+
+
+def test_ingest_only_fetches_new_documents(tmp_path):
+    root = str(tmp_path)
+    assert ingest_documents(fixture_links(), root, extract_workers=1) == 3
+    assert ingest_documents(fixture_links(), root, extract_workers=1) == 0
+
+    store = TextStore(root)
+    assert 'Boilers' in store.get('The Boilers Bill, 2024')
+    assert store.get('The Boilers Bill, 2024', 'summary')
+    assert store.get('The Missing Document Bill, 2020') is None
+    store.close()
+
+
+def test_features_join_lok_sabha_rows_by_title(tmp_path):
+    root = str(tmp_path)
+    ingest_documents(fixture_links(), root, extract_workers=1)
+    features = text_features(root)
+    assert set(features['title_key']) == {'the boilers bill 2024', 'the right to sleep bill 2019'}
+
+    # Lok Sabha numbering: nothing in common with the PRS scraper ids of the documents
+    bills = pd.DataFrame({'bill_id': [7, 12], 'title': ['THE BOILERS BILL, 2024', 'The Finance Bill, 2024']},
+                         index=[5, 9])
+    joined = join_text_features(bills, features)
+    assert list(joined.index) == [5, 9]
+    assert joined.loc[5, 'text_words'] > 0 and joined.loc[5, 'summary_words'] > 0
+    assert (joined.loc[9, FEATURE_COLUMNS] == 0).all()
+
+
+def test_training_fails_when_no_bill_has_a_document():
+    bills = pd.DataFrame({
+        'bill_id': [1, 2], 'title': ['The Finance Bill, 2024', 'The Railways Bill, 2024'],
+        'ministry': ['Finance', 'Railways'], 'status': ['Assented', 'Lapsed'], 'year': [2024, 2024],
+        'is_amendment': [0, 0], 'is_appropriation': [0, 0], 'is_finance': [1, 0],
+    })
+    features = pd.DataFrame([['the boilers bill 2024'] + [1] * len(FEATURE_COLUMNS)],
+                            columns=['title_key'] + FEATURE_COLUMNS)
+    with pytest.raises(ValueError, match='None of the 2 training bills'):
+        build_training_features(bills, features)
+
+    bills.loc[1, 'title'] = 'The Boilers Bill, 2024'
+    X, _ = build_training_features(bills, features)
+    assert list(X['text_words']) == [0, 1]
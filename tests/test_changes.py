@@ -0,0 +1,59 @@
+import pandas as pd
+
+import bill_store
+from bill_store import CHANGE_COLUMNS
+from changes import bill_state, detect_changes, detect_refresh
+
+
+def state(rows):
+    return pd.DataFrame(rows, columns=['bill_key', 'bill_id', 'title', 'status', 'passed_ls'])
+
+
+def test_added_status_and_event_changes():
+    previous = state([['prs:1', '1', 'A Bill', 'Pending', None],
+                      ['prs:2', '2', 'B Bill', 'Pending', None]])
+    current = state([['prs:1', '1', 'A Bill', 'Pending', '2024-08-08'],
+                     ['prs:2', '2', 'B Bill', 'Passed', None],
+                     ['prs:3', '3', 'C Bill', 'Pending', None]])
+    changes = detect_changes(previous, current, 'prs')
+    assert changes.columns.tolist() == CHANGE_COLUMNS
+    assert changes[['bill_key', 'change', 'field', 'old_value', 'new_value']].values.tolist() == [
+        ['prs:1', 'event', 'passed_ls', None, '2024-08-08'],
+        ['prs:2', 'status', 'status', 'Pending', 'Passed'],
+        ['prs:3', 'added', 'status', None, 'Pending'],
+    ]
+
+
+def test_unchanged_and_missing_bills_are_not_reported():
+    previous = state([['prs:1', '1', 'A Bill', 'Pending', None],
+                      ['prs:2', '2', 'B Bill', 'Pending', None]])
+    assert detect_changes(previous, previous.iloc[:1], 'prs').empty
+
+
+def test_empty_previous_reports_additions():
+    current = state([['prs:1', '1', 'A Bill', 'Pending', None]])
+    changes = detect_changes(current.iloc[:0], current, 'prs')
+    assert changes['change'].tolist() == ['added']
+
+
+def test_title_correction_is_an_update(tmp_path):
+    path = str(tmp_path / 'bills.db')
+    stored = pd.DataFrame({'bill_id': [22], 'year': [2019], 'title': ['The Finanse Bill, 2019'], 'ministry': 'Finance',
+                           'status': 'Pending', 'introduction_date': ['2019-07-01']})
+    bill_store.upsert_bills(stored, 'lok_sabha', path)
+    refresh = stored.assign(title='The Finance Bill, 2019')
+    changes = detect_refresh(refresh, 'lok_sabha', path)
+    assert changes[['change', 'field', 'old_value', 'new_value']].values.tolist() == [
+        ['updated', 'title', 'The Finanse Bill, 2019', 'The Finance Bill, 2019']]
+
+
+def test_prs_year_change_is_an_update():
+    previous = bill_state(pd.DataFrame({'bill_id': [1000], 'title': ['A Bill'], 'status': 'Pending',
+                                        'introduction_date': ['2024-12-20'], 'url': ['https://prsindia.org/a']}),
+                          'prs')
+    current = bill_state(pd.DataFrame({'bill_id': [1000], 'title': ['A Bill'], 'status': 'Pending',
+                                       'introduction_date': ['2025-01-03'], 'url': ['https://prsindia.org/a']}),
+                         'prs')
+    changes = detect_changes(previous, current, 'prs')
+    assert set(changes['change']) == {'updated'}
+    assert sorted(changes['field']) == ['introduction_date', 'year']
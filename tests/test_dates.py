@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+import dates
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    dates.clear_caches()
+    yield
+    dates.clear_caches()
+
+
+def test_source_formats():
+    expected = pd.Timestamp('2024-08-08')
+    for source, raw in [('prs', 'Aug 08, 2024'), ('lok_sabha', '08 Aug 2024'), ('lok_sabha', '08/08/2024 '),
+                        ('csv', '2024-08-08')]:
+        assert dates.normalize_dates(pd.Series([raw]), source=source, column='date').iloc[0] == expected
+
+
+def test_datetimes_and_excel_serials():
+    values = pd.Series([datetime(2020, 1, 2), 45512, 45512.0], dtype=object)
+    parsed = dates.normalize_dates(values, source='lok_sabha', column='Date of Introduction')
+    assert parsed.tolist() == [pd.Timestamp('2020-01-02'), pd.Timestamp('2024-08-08'), pd.Timestamp('2024-08-08')]
+
+
+def test_bare_year_is_reported_not_parsed():
+    parsed = dates.normalize_dates(pd.Series([2024], dtype=object), source='lok_sabha', column='Assent Date')
+    assert parsed.isna().all()
+    report = dates.unparsed_report()
+    assert report[['column', 'value', 'count']].values.tolist() == [['Assent Date', '2024', 1]]
+
+
+def test_year_only_string_is_reported_not_parsed():
+    values = pd.Series(['2024', '2024-08-08'])
+    parsed = dates.normalize_dates(values, source='csv', column='Assent Date')
+    assert parsed.isna().tolist() == [True, False]
+    report = dates.unparsed_report()
+    assert report[['column', 'value', 'count']].values.tolist() == [['Assent Date', '2024', 1]]
+
+
+def test_blanks_and_garbage():
+    values = pd.Series(['2024-08-08', '', None, 'soon', 'soon'], index=[5, 6, 7, 8, 9])
+    parsed = dates.normalize_dates(values, source='csv', column='x')
+    assert parsed.index.tolist() == [5, 6, 7, 8, 9]
+    assert parsed.notna().tolist() == [True, False, False, False, False]
+    assert dates.unparsed_report()['value'].tolist() == ['soon']
+    assert dates.unparsed_report()['count'].tolist() == [2]
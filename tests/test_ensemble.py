@@ -0,0 +1,26 @@
+import numpy as np
+
+from ensemble import EnsembleScorer, train_ensemble
+
+
+def small_bundle():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    y = (X[:, 0] + rng.normal(scale=0.5, size=200) > 0).astype(int)
+    return train_ensemble(X, y, ['a', 'b', 'c']), X
+
+
+def test_parallel_and_serial_scores_match():
+    bundle, X = small_bundle()
+    parallel, serial = EnsembleScorer(bundle), EnsembleScorer(bundle, parallel=False)
+    raw = serial.member_scores(X) @ serial.weights
+    assert np.allclose(parallel.score(X, calibrate=False), raw)
+    assert np.allclose(parallel.score(X), serial.score(X))
+    assert np.allclose(parallel.predict_proba(X).sum(axis=1), 1.0)
+    assert ((parallel.score(X) >= 0) & (parallel.score(X) <= 1)).all()
+
+
+def test_scorer_leaves_the_bundle_untouched():
+    bundle, _ = small_bundle()
+    EnsembleScorer(bundle)
+    assert bundle['members']['rf'].n_jobs == -1
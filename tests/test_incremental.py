@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import incremental
+import model_registry
+from benchmarks.run_benchmarks import make_synthetic_bills
+from incremental import labelled_bills, new_outcomes, split_update
+from train_model import train_model
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    """A small dataset and a registry with one full training run on it"""
+    root = tmp_path_factory.mktemp('incremental')
+    data = str(root / 'bills.csv')
+    make_synthetic_bills(600, seed=3).to_csv(data, index=False)
+    registry = str(root / 'models')
+    train_model(data_path=data, model_path=str(root / 'rf.pkl'), columns_path=str(root / 'columns.pkl'),
+                ensemble_path=str(root / 'ensemble.pkl'), stage_models_path=None, registry_dir=registry)
+    return data, registry
+
+
+def test_labels_cover_only_the_fitted_split(trained):
+    data, registry = trained
+    labelled = labelled_bills(pd.read_csv(data))
+    labels = model_registry.load_artifact('labels', registry_dir=registry)
+    # train_model holds out 20% for its evaluation; those outcomes are still new
+    assert len(labels) == len(labelled) - int(np.ceil(0.2 * len(labelled)))
+    assert new_outcomes(labelled, labels).sum() == len(labelled) - len(labels)
+
+
+def test_changed_label_is_a_new_outcome():
+    labelled = pd.DataFrame({'bill_key': ['a', 'b', 'c'], 'label': [1, 0, 1]})
+    trained = pd.DataFrame({'bill_key': ['a', 'b'], 'label': [1, 1]})
+    assert new_outcomes(labelled, trained).tolist() == [False, True, True]
+
+
+def test_update_split_is_disjoint():
+    labelled = pd.DataFrame({'bill_key': [f'k{i}' for i in range(200)], 'label': np.arange(200) % 2})
+    new_mask = np.zeros(200, dtype=bool)
+    new_mask[150:] = True
+    fit, calibration, holdout = split_update(labelled, new_mask, np.random.default_rng(0))
+    keys = [set(part['bill_key']) for part in (fit, calibration, holdout)]
+    assert not (keys[0] & keys[1]) and not (keys[0] & keys[2]) and not (keys[1] & keys[2])
+    assert len(calibration) + len(holdout) >= 2 * incremental.MIN_HOLDOUT
+
+
+@pytest.fixture
+def no_retrain(monkeypatch):
+    monkeypatch.setattr(incremental, 'full_retrain_reason', lambda *args: None)
+
+
+def test_gate_rejects_a_worse_candidate(trained, no_retrain, monkeypatch):
+    data, registry = trained
+    monkeypatch.setattr(incremental, 'GATE_TOLERANCE', -np.inf)
+    before = model_registry.current_version(registry)
+    assert incremental.update(data, registry) == 'rejected'
+    assert model_registry.current_version(registry) == before
+
+
+def test_gate_accepts_and_publishes(trained, no_retrain, monkeypatch):
+    data, registry = trained
+    monkeypatch.setattr(incremental, 'GATE_TOLERANCE', np.inf)
+    labelled = labelled_bills(pd.read_csv(data))
+    new_before = new_outcomes(labelled, model_registry.load_artifact('labels', registry_dir=registry)).sum()
+
+    assert incremental.update(data, registry) == 'incremental'
+    manifest = model_registry.load_manifest(registry_dir=registry)
+    assert manifest['lineage']['mode'] == 'incremental'
+    grown = model_registry.load_artifact('ensemble', registry_dir=registry)
+    assert grown['members']['rf'].n_estimators == 300 + incremental.ADD_TREES
+    # The held-out outcomes were not fitted, so they stay new
+    new_after = new_outcomes(labelled, model_registry.load_artifact('labels', registry_dir=registry)).sum()
+    assert 0 < new_after < new_before
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from ministry import UNKNOWN, canonical_ministry, normalize_ministries
+
+
+def test_spelling_variants_share_one_name():
+    assert canonical_ministry('Ministry of Defense') == 'Defence'
+    assert canonical_ministry('  MINISTRY OF   DEFENCE ') == 'Defence'
+    assert canonical_ministry('Agriculture & Farmers Welfare') == 'Agriculture and Farmers Welfare'
+
+
+def test_blanks_are_unknown():
+    for value in [None, np.nan, '', 'nan', 'NA', 'Unknown']:
+        assert canonical_ministry(value) == UNKNOWN
+
+
+def test_unmatched_names_are_tidied():
+    assert canonical_ministry('ministry of  space  exploration') == 'Space Exploration'
+
+
+def test_normalize_keeps_index_and_missing_values():
+    values = pd.Series(['Defense', None, 'Defence'], index=[10, 11, 12])
+    result = normalize_ministries(values)
+    assert result.index.tolist() == [10, 11, 12]
+    assert result.tolist() == ['Defence', UNKNOWN, 'Defence']
@@ -0,0 +1,38 @@
+import pytest
+
+import model_registry
+
+
+def test_publish_and_rollback(tmp_path):
+    registry = str(tmp_path / 'models')
+    first = model_registry.publish({'model': {'v': 1}}, ['a', 'b'], registry_dir=registry)
+    assert model_registry.current_version(registry) == first
+    assert model_registry.load_artifact('model', registry_dir=registry) == {'v': 1}
+    assert model_registry.load_manifest(registry_dir=registry)['feature_schema'] == ['a', 'b']
+
+    second = model_registry.publish({'model': {'v': 2}}, ['a', 'b'], registry_dir=registry)
+    assert second != first
+    assert model_registry.load_artifact('model', registry_dir=registry) == {'v': 2}
+    assert model_registry.list_versions(registry) == sorted([first, second])
+
+    model_registry.set_current(first, registry)
+    assert model_registry.load_artifact('model', registry_dir=registry) == {'v': 1}
+
+
+def test_republishing_identical_artifacts(tmp_path):
+    registry = str(tmp_path / 'models')
+    versions = {model_registry.publish({'model': [1, 2, 3]}, ['a'], registry_dir=registry) for _ in range(3)}
+    assert set(model_registry.list_versions(registry)) == versions
+
+
+def test_unknown_version_and_checksum(tmp_path):
+    registry = str(tmp_path / 'models')
+    with pytest.raises(model_registry.RegistryError):
+        model_registry.load_manifest(registry_dir=registry)
+    version = model_registry.publish({'model': 'x'}, ['a'], registry_dir=registry)
+    with pytest.raises(model_registry.RegistryError):
+        model_registry.set_current('19990101T000000-deadbeef', registry)
+
+    (tmp_path / 'models' / version / 'model.pkl').write_bytes(b'corrupt')
+    with pytest.raises(model_registry.RegistryError):
+        model_registry.load_artifact('model', registry_dir=registry)
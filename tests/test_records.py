@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_fetch import bill_record, build_actions
+from records import ActionList, BillRecord
+
+ROW = {'bill_id': 22, 'title': 'The Finance Bill, 2024', 'ministry': 'Finance', 'introduction_date': '2024-02-01',
+       'status': 'Assented', 'year': 2024, 'is_amendment': 0, 'is_appropriation': 0, 'is_finance': 1}
+
+
+def test_record_fields_and_frame():
+    record = bill_record(ROW)
+    assert record.bill_id == '22' and record.short_title == 'The Finance Bill'
+    frame = record.to_frame()
+    assert frame.shape == (1, len(BillRecord.__slots__))
+    assert frame.loc[0, 'ministry'] == 'Finance' and frame.loc[0, 'is_finance'] == 1
+
+
+def test_record_rejects_unknown_fields():
+    with pytest.raises(TypeError):
+        BillRecord(bill_id='1', colour='red')
+    with pytest.raises(AttributeError):
+        BillRecord().colour = 'red'
+
+
+def test_actions_follow_the_status():
+    actions = build_actions(ROW)
+    assert [code for _, _, code in actions] == ['intro', 'passed_ls', 'passed_rs', 'assent']
+    assert actions.first_date() == pd.Timestamp('2024-02-01')
+    table = actions.to_frame()
+    assert table.columns.tolist() == ['Date', 'Action']
+    assert table.loc[0, 'Date'] == '01 February 2024'
+
+
+def test_empty_and_undated_actions():
+    assert ActionList().empty and ActionList().first_date() is None
+    actions = ActionList([None, '2020-05-01'], ['a', 'b'], ['x', 'y'])
+    assert np.isnat(actions.dates[0])
+    assert actions.first_date() == pd.Timestamp('2020-05-01')
+    assert actions.to_frame()['Date'].tolist() == ['N/A', '01 May 2020']
@@ -0,0 +1,17 @@
+import json
+
+from benchmarks.run_benchmarks import compare
+
+
+def report(results):
+    return {'commit': 'new', 'timestamp': 'now', 'results': results}
+
+
+def test_slowdowns_and_errors_are_regressions(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({'commit': 'old', 'timestamp': 'then', 'results': {
+        'lookup': {'10000': {'mean': 1.0}}, 'features': {'10000': {'mean': 1.0}}, 'train': {'10000': {'mean': 1.0}}}}))
+    current = report({'lookup': {'10000': {'mean': 1.1}}, 'features': {'10000': {'mean': 2.0}},
+                      'train': {'10000': {'error': 'boom'}}})
+    regressions = compare(current, str(baseline), threshold=1.2)
+    assert [(name, size) for name, size, _ in regressions] == [('features', '10000'), ('train', '10000')]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scenarios import scenario_grid, variant_matrix
+
+COLUMNS = ['ministry_clean_Defence', 'ministry_clean_Finance', 'is_amendment', 'year', 'passed_ls_seen']
+
+
+def test_grid_is_every_combination():
+    grid = scenario_grid({'year': [2020, 2024], 'is_amendment': [0, 1]})
+    assert grid.columns.tolist() == ['scenario', 'year', 'is_amendment']
+    assert grid[['year', 'is_amendment']].values.tolist() == [[2020, 0], [2020, 1], [2024, 0], [2024, 1]]
+
+
+def test_grid_rejects_unknown_features():
+    with pytest.raises(ValueError):
+        scenario_grid({'colour': ['red']})
+
+
+def test_overrides_broadcast_over_bills():
+    base = np.array([[1, 0, 0, 2019, 0],
+                     [0, 1, 1, 2021, 1]], dtype=float)
+    scenarios = pd.DataFrame({'year': [2024, None], 'ministry': [None, 'Ministry of Finance'],
+                              'passed_ls': [None, 1]})
+    X = variant_matrix(base, COLUMNS, scenarios)
+    assert X.shape == (2, 2, len(COLUMNS))
+    # Scenario 0 only moves the year
+    assert X[0, :, 3].tolist() == [2024, 2024]
+    assert np.array_equal(np.delete(X[0], 3, axis=1), np.delete(base, 3, axis=1))
+    # Scenario 1 switches both bills to Finance and marks them passed in the Lok Sabha
+    assert X[1, :, :2].tolist() == [[0, 1], [0, 1]]
+    assert X[1, :, 4].tolist() == [1, 1]
+    assert X[1, :, 3].tolist() == [2019, 2021]
+
+
+def test_unknown_ministry_clears_the_one_hot():
+    base = np.array([[1, 0, 0, 2019, 0]], dtype=float)
+    X = variant_matrix(base, COLUMNS, pd.DataFrame({'ministry': ['Ministry of Space Exploration']}))
+    assert X[0, 0, :2].tolist() == [0, 0]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import similar_bills
+from similar_bills import build_index, index_version, load_index, top_neighbors
+
+
+def corpus():
+    titles = ['The Income Tax (Amendment) Bill', 'The Income Tax Bill', 'The Customs Tariff Bill',
+              'The Customs Tariff (Amendment) Bill', 'The Forest Rights Bill', 'The Forest Conservation Bill',
+              'The Railways Appropriation Bill', 'The Railways (Amendment) Bill']
+    return pd.DataFrame({
+        'bill_id': range(1, 9), 'title': titles,
+        'ministry': ['Finance', 'Finance', 'Finance', 'Finance', 'Environment', 'Environment', 'Railways',
+                     'Railways'],
+        'year': [2001, 2003, 2010, 2012, 2006, 2008, 2015, 2016],
+        'status': ['Assented', 'Lapsed', 'Assented', 'Pending', 'Assented', 'Withdrawn', 'Assented', 'Pending'],
+        'is_amendment': [1, 0, 0, 1, 0, 0, 0, 1], 'is_appropriation': [0, 0, 0, 0, 0, 0, 1, 0],
+        'is_finance': [1, 1, 1, 1, 0, 0, 0, 0],
+    })
+
+
+def test_blocked_top_neighbors_match_brute_force(monkeypatch):
+    rng = np.random.default_rng(0)
+    matrix = sparse.random(40, 15, density=0.3, random_state=1, format='csr')
+    candidates = np.sort(rng.choice(40, 25, replace=False))
+    monkeypatch.setattr(similar_bills, 'BLOCK_CELLS', 100)
+    neighbors, scores = top_neighbors(matrix, candidates, k=3)
+
+    sims = (matrix @ matrix[candidates].T).toarray()
+    sims[candidates, np.arange(len(candidates))] = -np.inf
+    expected = -np.sort(-sims, axis=1)[:, :3]
+    assert np.allclose(scores, expected, atol=1e-6)
+    assert all(row not in neighbors[row] for row in range(40))
+
+
+def test_neighbors_are_decided_bills_of_the_same_kind():
+    index = build_index(corpus(), k=3)
+    similar = index.for_bill(4, k=2)
+    assert similar['bill_id'].tolist()[0] == 3
+    assert set(similar['status']) <= {'Assented', 'Lapsed', 'Withdrawn'}
+    assert (np.diff(similar['similarity']) <= 0).all()
+    assert index.for_bill(404).empty
+
+
+def test_query_scores_an_unindexed_bill():
+    index = build_index(corpus(), k=3)
+    new = pd.DataFrame({'title': ['The Forest (Amendment) Bill'], 'ministry': ['Environment'], 'year': [2007],
+                        'is_amendment': [1], 'is_appropriation': [0], 'is_finance': [0]})
+    assert index.query(new, k=2)['bill_id'].tolist()[0] in (5, 6)
+
+
+def test_saved_index_reloads_and_versions_change(tmp_path):
+    path = str(tmp_path / 'similar.pkl')
+    assert index_version(path) is None and load_index(path) is None
+    index = build_index(corpus(), k=3)
+    index.save(path)
+    first = index_version(path)
+    assert load_index(path).for_bill(4, k=2)['bill_id'].tolist() == index.for_bill(4, k=2)['bill_id'].tolist()
+    build_index(corpus().iloc[:6], k=2).save(path)
+    assert index_version(path) != first
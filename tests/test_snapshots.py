@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+import snapshots
+from stage_router import train_stage_models_as_of
+
+
+def bills(status, assent=None, passed_ls=None):
+    return pd.DataFrame({'bill_id': [1, 2], 'year': [2020, 2020], 'title': ['A Bill', 'B Bill'], 'ministry': 'Law',
+                         'status': status, 'introduction_date': ['2020-01-10', '2020-02-01'],
+                         'Debate/Date Passed in LS': passed_ls or [None, None],
+                         'Assent Date': assent or [None, None],
+                         'is_amendment': 0, 'is_appropriation': 0, 'is_finance': 0})
+
+
+def test_as_of_join_takes_the_last_earlier_snapshot():
+    key = ['k', 'k', 'k']
+    history = pd.DataFrame({'bill_key': key, 'status': ['Pending', 'Passed', 'Assented'],
+                            'snapshot_at': pd.to_datetime(['2020-01-01', '2020-02-01', '2020-03-01']).as_unit('ns')})
+    queries = pd.DataFrame({'bill_key': ['k', 'k', 'k', 'k', 'other'],
+                            'as_of': ['2020-02-15', '2020-02-01', '2019-12-31', None, '2020-02-15']})
+    joined = snapshots.as_of_join(queries, history)
+    # Strictly before as_of, in query order; nothing known -> NaN
+    assert joined['status'].tolist()[:2] == ['Passed', 'Pending']
+    assert joined['status'].iloc[2:].isna().all()
+
+
+def test_training_set_only_sees_the_past(tmp_path):
+    root = str(tmp_path)
+    snapshots.append_snapshot(bills(['Pending', 'Pending']), 'lok_sabha', root, snapshot_at='2020-02-05')
+    final = bills(['Assented', 'Lapsed'], assent=['2020-03-01', None], passed_ls=['2020-01-20', None])
+    snapshots.append_snapshot(final, 'lok_sabha', root, snapshot_at='2020-04-01')
+
+    rows = snapshots.training_set(cutoff='2020-03-15', root=root)
+    # Features come from the February snapshot, labels from the April one
+    assert rows.set_index('bill_id')['status_as_of'].to_dict() == {'1': 'Pending', '2': 'Pending'}
+    assert rows.set_index('bill_id')['status'].to_dict() == {'1': 'Assented', '2': 'Lapsed'}
+    assert rows['passed_ls_date'].isna().all()
+    assert snapshots.training_set(cutoff='2020-03-15', label_as_of='2020-03-01', root=root).empty
+
+
+def test_backfill_after_the_first_ingest(tmp_path):
+    root = str(tmp_path)
+    final = bills(['Assented', 'Lapsed'], assent=['2020-03-01', None], passed_ls=['2020-01-20', None])
+    snapshots.append_snapshot(final, 'lok_sabha', root, snapshot_at='2024-01-01')
+    assert snapshots.training_set(day=1, root=root).empty
+
+    assert snapshots.backfill(final, 'lok_sabha', root) > 0
+    assert snapshots.backfill(final, 'lok_sabha', root) == 0
+    rows = snapshots.training_set(day=1, root=root)
+    assert sorted(rows['bill_id']) == ['1', '2']
+    assert (rows['status_as_of'] == 'Pending').all()
+    # By day 30 bill 1 has passed the Lok Sabha, which day-30 rows may see
+    day30 = snapshots.training_set(day=30, root=root).set_index('bill_id')
+    assert day30.loc['1', 'days_to_passed_ls'] == 10
+
+
+def test_empty_training_set_fails_clearly(tmp_path):
+    with pytest.raises(ValueError, match='backfill'):
+        train_stage_models_as_of(str(tmp_path))
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+import warmup
+
+
+@pytest.fixture
+def resource(monkeypatch):
+    """A fake versioned 'model' resource whose current version the test controls"""
+    state = {'version': 'v1', 'loads': []}
+
+    def load(version=None):
+        state['loads'].append(version)
+        return f'model@{version}'
+
+    monkeypatch.setitem(warmup.LOADERS, 'model', load)
+    monkeypatch.setitem(warmup.VERSION_SOURCES, 'model', lambda: state['version'])
+    monkeypatch.setattr(warmup, 'RELOAD_INTERVAL', 0)
+    monkeypatch.setattr(warmup, '_values', {})
+    monkeypatch.setattr(warmup, '_versions', {})
+    monkeypatch.setattr(warmup, '_last_check', {})
+    return state
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_loaded_once_per_version(resource):
+    assert warmup.get('model') == 'model@v1'
+    assert warmup.get('model') == 'model@v1'
+    assert resource['loads'] == ['v1']
+    assert warmup.version('model') == 'v1'
+
+
+def test_new_version_is_swapped_in(resource):
+    warmup.get('model')
+    resource['version'] = 'v2'
+    # The request that notices the change starts the reload without waiting for it
+    assert warmup.get('model') in ('model@v1', 'model@v2')
+    assert wait_for(lambda: warmup.version('model') == 'v2')
+    assert warmup.get('model') == 'model@v2'
+    assert resource['loads'] == ['v1', 'v2']
+
+
+def test_missing_version_keeps_the_loaded_one(resource):
+    warmup.get('model')
+    resource['version'] = None
+    warmup.get('model')
+    time.sleep(0.05)
+    assert warmup.version('model') == 'v1'
+    assert resource['loads'] == ['v1']